@@ -0,0 +1,81 @@
+"""
+Перенос прошедших бронирований в архив.
+
+Переносит брони, начавшиеся раньше `ARCHIVE_HORIZON_DAYS` дней назад,
+из `reservations` в `reservations_archive` пакетами по
+`ARCHIVE_BATCH_SIZE` с паузой `ARCHIVE_PAUSE_SECONDS` между ними (см.
+`ReservationArchiveService.archive`). Прерванный запуск можно просто
+повторить: каждый пакет переносится атомарно. Запускается по
+расписанию (cron, Kubernetes CronJob) против основной БД.
+
+Запуск:
+    python -m app.cli.archive
+    python -m app.cli.archive --horizon-days 365 --batch-size 5000 --max-batches 100
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from app.core.config import db_settings
+from app.core.database import async_engine, async_session
+# Модели связей бронирований должны быть зарегистрированы до первого запроса.
+from app.models.table import Table  # noqa: F401
+from app.repositories.reservation_archive_repo import ReservationArchiveRepository
+from app.services.reservation_archive_service import ReservationArchiveService
+
+
+async def main(args: argparse.Namespace) -> None:
+    before = datetime.now() - timedelta(days=args.horizon_days)
+    try:
+        async with async_session() as session:
+            service = ReservationArchiveService(ReservationArchiveRepository(session))
+            archived = await service.archive(
+                before,
+                args.batch_size,
+                args.pause_seconds,
+                args.lock_timeout_seconds,
+                args.max_batches,
+            )
+    finally:
+        await async_engine.dispose()
+    print(f"archived {archived} reservations started before {before:%Y-%m-%d %H:%M}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Move past reservations to the archive.")
+    parser.add_argument(
+        "--horizon-days",
+        type=int,
+        default=db_settings.archive_horizon_days,
+        help="архивировать брони старше стольких дней",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=db_settings.archive_batch_size,
+        help="число броней в одной транзакции",
+    )
+    parser.add_argument(
+        "--pause-seconds",
+        type=float,
+        default=db_settings.archive_pause_seconds,
+        help="пауза между пакетами",
+    )
+    parser.add_argument(
+        "--lock-timeout-seconds",
+        type=float,
+        default=db_settings.archive_lock_timeout_seconds,
+        help="сколько пакет ждет блокировки",
+    )
+    parser.add_argument(
+        "--max-batches", type=int, help="остановиться после стольких пакетов"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(format="%(asctime)s %(message)s")
+    logging.getLogger("app").setLevel(logging.INFO)
+    asyncio.run(main(parse_args()))
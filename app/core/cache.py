@@ -0,0 +1,87 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+# Признак отсутствия значения в кэше (None может быть закэшированным значением).
+MISSING = object()
+
+
+class CacheBackend(ABC):
+    """
+    Интерфейс хранилища кэша.
+
+    Позволяет подменить хранилище (например, на общий для воркеров
+    Redis) без изменения кода, который кэш использует.
+    """
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Any:
+        """
+        Возвращает значение по ключу.
+
+        Возвращает:
+            Значение или `MISSING`, если ключа нет или срок его жизни истек.
+        """
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any) -> None:
+        """Сохраняет значение по ключу."""
+
+    @abstractmethod
+    def delete(self, key: Hashable) -> None:
+        """Удаляет значение по ключу, если оно есть."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Удаляет все значения."""
+
+
+class TTLCache(CacheBackend):
+    """
+    In-memory кэш с ограничением по размеру (LRU) и сроку жизни записей.
+
+    Атрибуты:
+        max_size (int): Максимальное число записей; при переполнении
+            вытесняется запись, к которой дольше всего не обращались.
+        ttl_seconds (float): Срок жизни записи.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        """
+        Инициализирует пустой кэш.
+
+        Аргументы:
+            max_size: Максимальное число записей.
+            ttl_seconds: Срок жизни записи в секундах.
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
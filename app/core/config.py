@@ -21,6 +21,64 @@ class DatabaseSettings(BaseSettings):
         test_db_user (str): Имя пользователя для тестовой базы данных.
         test_db_pass (str): Пароль для тестовой базы данных.
         test_db_name (str): Имя тестовой базы данных.
+        availability_index_enabled (bool): Включает in-memory индекс доступности
+            столиков для проверки конфликтов без запросов к БД.
+        availability_index_ttl_seconds (float): Как долго индекс столика считается
+            актуальным без сверки его версии с БД.
+        db_pool_size (int): Число постоянных соединений в пуле.
+        db_max_overflow (int): Сколько соединений пул может открыть сверх `db_pool_size`
+            под пиковую нагрузку.
+        db_pool_timeout (float): Сколько секунд запрос ждет свободное соединение,
+            прежде чем получить ошибку.
+        db_pool_recycle (int): Через сколько секунд соединение пересоздается
+            (-1 — без ограничения).
+        db_pool_pre_ping (bool): Проверять ли соединение перед выдачей из пула.
+        db_pgbouncer (bool): Режим работы через PgBouncer в transaction pooling:
+            отключает кэш подготовленных выражений asyncpg.
+        replica_database_url (str | None): URL реплики для чтения. Если не задан,
+            чтение идет с основной базы данных.
+        read_your_writes_seconds (int): Сколько секунд после записи чтения клиента
+            выполняются на основной базе данных, пока реплика догоняет изменения.
+        table_cache_enabled (bool): Включает in-memory кэш столиков.
+        table_cache_max_size (int): Максимальное число столиков в кэше
+            (полный список столиков хранится отдельно и не вытесняется ими).
+        table_cache_ttl_seconds (float): Срок жизни записи в кэше столиков.
+        table_cache_check_seconds (float): Как часто кэш столиков сверяет
+            поколение столиков с БД.
+        metrics_enabled (bool): Включает сбор метрик запросов и SQL для `/metrics`.
+        profiling_enabled (bool): Включает профилирование SQL-запросов каждого
+            HTTP-запроса (`ProfilingMiddleware`).
+        profiling_max_queries (int): Бюджет числа SQL-запросов на HTTP-запрос.
+        profiling_max_seconds (float): Бюджет длительности HTTP-запроса.
+        profiling_slow_query_seconds (float): Длительность, с которой SQL-запрос
+            считается медленным.
+        profiling_repeat_threshold (int): Сколько выполнений одного SQL-запроса
+            за HTTP-запрос считать N+1.
+        idempotency_enabled (bool): Включает поддержку заголовка `Idempotency-Key`
+            для POST-запросов создания (`IdempotencyMiddleware`).
+        idempotency_ttl_seconds (float): Сколько хранится ключ идемпотентности
+            и сохраненный ответ.
+        idempotency_lease_seconds (float): Через сколько секунд ключ
+            незавершенного запроса считается брошенным.
+        idempotency_wait_seconds (float): Сколько повтор запроса ждет
+            завершения первого запроса с тем же ключом.
+        idempotency_sweep_seconds (float): Интервал удаления устаревших ключей.
+        reservation_partitions_ahead_months (int): На сколько месяцев вперед
+            приложение заранее создает партиции броней.
+        reservation_partitions_check_seconds (float): Как часто проверяется
+            наличие партиций броней.
+        archive_horizon_days (int): Брони, начавшиеся раньше стольких дней
+            назад, переносятся в архив (`python -m app.cli.archive`).
+        archive_batch_size (int): Сколько броней переносится в архив одной
+            транзакцией.
+        archive_pause_seconds (float): Пауза между пакетами переноса в архив.
+        archive_lock_timeout_seconds (float): Сколько пакет переноса в архив
+            ждет блокировки, прежде чем откатиться и повториться.
+        reservation_batching_enabled (bool): Включает групповое создание броней
+            `POST /reservations/` (`ReservationWriteBatcher`).
+        reservation_batch_max_size (int): Максимальное число броней в пачке.
+        reservation_batch_max_delay_seconds (float): Сколько первый запрос
+            пачки ждет следующих.
 
     Методы:
         database_url: Возвращает URL для подключения к основной базе данных.
@@ -39,6 +97,50 @@ class DatabaseSettings(BaseSettings):
     test_db_pass: str
     test_db_name: str
 
+    availability_index_enabled: bool = False
+    availability_index_ttl_seconds: float = 1.0
+
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = True
+    db_pgbouncer: bool = False
+
+    replica_database_url: str | None = None
+    read_your_writes_seconds: int = 5
+
+    table_cache_enabled: bool = False
+    table_cache_max_size: int = 1024
+    table_cache_ttl_seconds: float = 60.0
+    table_cache_check_seconds: float = 1.0
+
+    metrics_enabled: bool = True
+
+    profiling_enabled: bool = False
+    profiling_max_queries: int = 10
+    profiling_max_seconds: float = 0.5
+    profiling_slow_query_seconds: float = 0.1
+    profiling_repeat_threshold: int = 5
+
+    idempotency_enabled: bool = True
+    idempotency_ttl_seconds: float = 86400.0
+    idempotency_lease_seconds: float = 60.0
+    idempotency_wait_seconds: float = 10.0
+    idempotency_sweep_seconds: float = 600.0
+
+    reservation_partitions_ahead_months: int = 3
+    reservation_partitions_check_seconds: float = 3600.0
+
+    archive_horizon_days: int = 180
+    archive_batch_size: int = 1000
+    archive_pause_seconds: float = 0.1
+    archive_lock_timeout_seconds: float = 0.5
+
+    reservation_batching_enabled: bool = False
+    reservation_batch_max_size: int = 100
+    reservation_batch_max_delay_seconds: float = 0.002
+
     @property
     def database_url(self) -> str:
         """
@@ -1,21 +1,159 @@
+import time
+from uuid import uuid4
+
+from fastapi import Depends, Request
+
+from sqlalchemy import exc
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+    async_sessionmaker,
+)
 
-from .config import db_settings
+from .config import DatabaseSettings, db_settings
 
 
 class Base(DeclarativeBase):
     pass
 
 
-async_engine = create_async_engine(
-    db_settings.database_url, pool_pre_ping=True, echo=False
-)
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, который учитывает время ожидания свободного соединения.
+
+    Открытие нового соединения ожиданием не считается: его время
+    учитывается отдельно, чтобы холодный старт и пересоздание соединений
+    не выглядели как нехватка пула.
+
+    Атрибуты:
+        checkouts (int): Сколько раз соединение было выдано из пула.
+        timeouts (int): Сколько раз ожидание завершилось по `pool_timeout`.
+        wait_seconds_total (float): Суммарное время ожидания соединения.
+        wait_seconds_max (float): Наибольшее время ожидания соединения.
+        connects (int): Сколько соединений пул открыл.
+        connect_seconds_total (float): Суммарное время открытия соединений.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.connects = 0
+        self.connect_seconds_total = 0.0
+
+    def _create_connection(self):
+        started = time.perf_counter()
+        entry = super()._create_connection()
+        connected = time.perf_counter() - started
+        self.connects += 1
+        self.connect_seconds_total += connected
+        # Забирается в _do_get, чтобы вычесть открытие из времени ожидания.
+        entry._connect_seconds = connected
+        return entry
+
+    def _record_wait(self, waited: float) -> None:
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            self._record_wait(time.perf_counter() - started)
+            raise
+        connected = entry.__dict__.pop("_connect_seconds", 0.0)
+        self._record_wait(max(time.perf_counter() - started - connected, 0.0))
+        self.checkouts += 1
+        return entry
+
+    def stats(self) -> dict:
+        """
+        Возвращает текущее состояние пула.
+
+        Возвращает:
+            Словарь с размером пула, числом выданных, простаивающих и
+            сверхлимитных соединений, статистикой ожидания и открытия
+            соединений.
+        """
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_max": self.wait_seconds_max,
+            "connects": self.connects,
+            "connect_seconds_total": self.connect_seconds_total,
+        }
+
+
+def create_engine(url: str, settings: DatabaseSettings = db_settings) -> AsyncEngine:
+    """
+    Создает асинхронный движок с пулом соединений из настроек.
+
+    В режиме PgBouncer (transaction pooling) соседние транзакции клиента
+    попадают на разные серверные соединения, поэтому подготовленные
+    выражения asyncpg не кэшируются, а их имена делаются уникальными.
+
+    Аргументы:
+        url: URL для подключения к базе данных.
+        settings: Настройки пула соединений.
+
+    Возвращает:
+        Асинхронный движок SQLAlchemy.
+    """
+    connect_args = {}
+    if settings.db_pgbouncer:
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=connect_args,
+        echo=False,
+    )
+
+
+async_engine = create_engine(db_settings.database_url)
 
 async_session = async_sessionmaker(
     bind=async_engine, class_=AsyncSession, expire_on_commit=False
 )
 
+# Без реплики чтение идет с основной базы данных.
+replica_engine = (
+    create_engine(db_settings.replica_database_url)
+    if db_settings.replica_database_url
+    else async_engine
+)
+
+replica_session = async_sessionmaker(
+    bind=replica_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+# Cookie, которую получает клиент после успешной записи, и заголовок,
+# которым клиент может сам запросить чтение с основной базы данных.
+PRIMARY_PIN_COOKIE = "read_primary"
+PRIMARY_PIN_HEADER = "x-read-primary"
+
 
 async def get_db():
     """
@@ -35,3 +173,44 @@ async def get_db():
             raise
         finally:
             await session.aclose()
+
+
+def get_read_sessionmaker(request: Request) -> async_sessionmaker[AsyncSession]:
+    """
+    Возвращает фабрику сессий для чтения.
+
+    Используется как зависимость и там, где сессия должна жить дольше
+    обработчика запроса — например, при потоковой выдаче ответа
+    (`StreamingResponse`), который отправляется уже после закрытия
+    зависимостей, включая сессию из `get_read_db`.
+
+    Запросы на чтение обслуживает реплика, кроме клиентов, которые недавно
+    выполняли запись (cookie `read_primary`, см. `ReadYourWritesMiddleware`)
+    или явно передали заголовок `X-Read-Primary`: они читают с основной
+    базы данных и видят свои изменения, даже если реплика отстает.
+    """
+    if (
+        PRIMARY_PIN_COOKIE in request.cookies
+        or PRIMARY_PIN_HEADER in request.headers
+    ):
+        return async_session
+    return replica_session
+
+
+async def get_read_db(
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_read_sessionmaker),
+):
+    """
+    Возвращает асинхронную сессию базы данных только для чтения.
+
+    Аналог `get_db` для GET-маршрутов: сессия открывается на реплике
+    (или на основной базе данных, см. `get_read_sessionmaker`).
+    """
+    async with session_factory() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.aclose()
@@ -0,0 +1,102 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts) -> str:
+    """
+    Собирает строгий ETag из частей версии ресурса.
+
+    Пример:
+        >>> make_etag(5, 1234)
+        '"5.1234"'
+    """
+    return '"' + ".".join(str(part) for part in parts) + '"'
+
+
+def collection_etag(name: str, version: str, request: Request) -> str:
+    """
+    Собирает ETag страницы коллекции.
+
+    Представление страницы определяется версией коллекции и параметрами
+    запроса (курсор, лимит, фильтры), поэтому в ETag входит и хэш строки
+    запроса.
+
+    Аргументы:
+        name: Имя коллекции.
+        version: Версия коллекции.
+        request: Текущий запрос.
+
+    Возвращает:
+        Строгий ETag.
+    """
+    query = hashlib.blake2b(request.url.query.encode(), digest_size=8).hexdigest()
+    return make_etag(name, version, query)
+
+
+def parse_etags(header: str) -> list[str]:
+    """
+    Разбирает значение заголовка If-Match / If-None-Match.
+
+    Возвращает:
+        Список ETag в кавычках (префикс слабого ETag `W/` отбрасывается)
+        или ["*"].
+    """
+    tags = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            tags.append(tag)
+    return tags
+
+
+def not_modified(request: Request, etag: str) -> Response | None:
+    """
+    Проверяет If-None-Match запроса.
+
+    Аргументы:
+        request: Текущий запрос.
+        etag: Текущий ETag ресурса.
+
+    Возвращает:
+        Ответ 304 Not Modified, если у клиента актуальная версия ресурса,
+        иначе None.
+    """
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return None
+    tags = parse_etags(header)
+    if "*" in tags or etag in tags:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
+
+
+def if_match_versions(request: Request, obj_id: int) -> list[int] | None:
+    """
+    Извлекает из If-Match версии записи для условного изменения.
+
+    ETag записи имеет вид `"<id>.<версия>"` (см. `make_etag`).
+
+    Аргументы:
+        request: Текущий запрос.
+        obj_id: Идентификатор изменяемой записи.
+
+    Возвращает:
+        None если заголовка нет или он равен `*` (достаточно существования
+        записи), иначе список версий записи из заголовка (пустой, если ни
+        один ETag к записи не относится).
+    """
+    header = request.headers.get("if-match")
+    if header is None:
+        return None
+    tags = parse_etags(header)
+    if "*" in tags:
+        return None
+    versions = []
+    for tag in tags:
+        prefix, _, version = tag.strip('"').partition(".")
+        if prefix == str(obj_id) and version.isdigit():
+            versions.append(int(version))
+    return versions
@@ -0,0 +1,277 @@
+import time
+from bisect import bisect_left
+from typing import Iterable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+# Границы корзин гистограмм длительности (в секундах).
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """
+    Базовый класс метрики с метками.
+
+    Атрибуты:
+        name (str): Имя метрики.
+        help (str): Описание метрики.
+        labelnames (tuple[str, ...]): Имена меток.
+    """
+
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def render(self) -> list[str]:
+        """Возвращает строки метрики в текстовом формате Prometheus."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for labels, value in self._values.items():
+            lines.append(
+                f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            )
+        return lines
+
+
+class Counter(Metric):
+    """Монотонно растущий счетчик."""
+
+    type = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def set_total(self, value: float, *labels) -> None:
+        """Задает значение счетчика, который ведется вне реестра (например, пулом)."""
+        self._values[labels] = value
+
+
+class Gauge(Metric):
+    """Значение, которое может расти и уменьшаться."""
+
+    type = "gauge"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, value: float, *labels) -> None:
+        self._values[labels] = value
+
+
+class Histogram(Metric):
+    """
+    Гистограмма наблюдений с фиксированными корзинами.
+
+    Наблюдение стоит одного бинарного поиска по корзинам; накопительные
+    суммы по корзинам считаются только при выдаче метрик.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        # Для каждого набора меток: [счетчики корзин..., +Inf, сумма].
+        self._series: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), series):
+                cumulative += count
+                bucket_labels = _format_labels(
+                    self.labelnames, labels, f'le="{_format_value(bound)}"'
+                )
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Набор метрик процесса, выдаваемый эндпоинтом `/metrics`."""
+
+    def __init__(self) -> None:
+        self._metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Возвращает все метрики в текстовом формате Prometheus 0.0.4."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUEST_DURATION = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route.",
+        ("method", "route", "status"),
+    )
+)
+HTTP_REQUESTS_IN_FLIGHT = registry.register(
+    Gauge("http_requests_in_flight", "HTTP requests currently being processed.")
+)
+DB_STATEMENT_DURATION = registry.register(
+    Histogram(
+        "db_statement_duration_seconds",
+        "SQL statement execution time by statement type.",
+        ("operation",),
+    )
+)
+DB_STATEMENT_ERRORS = registry.register(
+    Counter("db_statement_errors_total", "SQL statements that raised an error.")
+)
+RESERVATION_CONFLICTS = registry.register(
+    Counter(
+        "reservation_conflicts_total",
+        "Reservations rejected with 409 because the slot is taken.",
+        ("source",),
+    )
+)
+RESERVATION_BATCH_SIZE = registry.register(
+    Histogram(
+        "reservation_batch_size",
+        "Reservations created together by the write batcher.",
+        buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+    )
+)
+DB_POOL_CONNECTIONS = registry.register(
+    Gauge(
+        "db_pool_connections",
+        "Connections of the primary database pool by state.",
+        ("state",),
+    )
+)
+DB_POOL_CHECKOUTS = registry.register(
+    Counter("db_pool_checkouts_total", "Connections handed out by the primary pool.")
+)
+DB_POOL_TIMEOUTS = registry.register(
+    Counter(
+        "db_pool_timeouts_total",
+        "Waits for a primary pool connection that ended with a timeout.",
+    )
+)
+DB_POOL_WAIT_SECONDS = registry.register(
+    Counter(
+        "db_pool_wait_seconds_total",
+        "Total time spent waiting for a connection from the primary pool.",
+    )
+)
+DB_POOL_CONNECT_SECONDS = registry.register(
+    Counter(
+        "db_pool_connect_seconds_total",
+        "Total time spent opening new connections of the primary pool.",
+    )
+)
+
+# Ключ в conn.info со стеком времен начала выполняемых запросов.
+_STARTED_AT = "metrics_started_at"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_STARTED_AT, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info[_STARTED_AT].pop()
+    operation = statement.split(None, 1)[0].upper()
+    DB_STATEMENT_DURATION.observe(time.perf_counter() - started, operation)
+
+
+def _handle_error(exception_context) -> None:
+    conn = exception_context.connection
+    if conn is not None and conn.info.get(_STARTED_AT):
+        conn.info[_STARTED_AT].pop()
+    DB_STATEMENT_ERRORS.inc()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Подключает учет времени и числа SQL-запросов движка.
+
+    Повторный вызов для того же движка ничего не делает.
+
+    Аргументы:
+        engine: Асинхронный движок SQLAlchemy.
+    """
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+def uninstrument_engine(engine: AsyncEngine) -> None:
+    """Отключает учет SQL-запросов движка, подключенный `instrument_engine`."""
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.remove(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.remove(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.remove(sync_engine, "handle_error", _handle_error)
+
+
+def collect_pool(stats: dict) -> None:
+    """
+    Переносит состояние пула соединений в метрики перед их выдачей.
+
+    Аргументы:
+        stats: Результат `InstrumentedQueuePool.stats()`.
+    """
+    for state in ("checked_out", "idle", "overflow"):
+        DB_POOL_CONNECTIONS.set(stats[state], state)
+    DB_POOL_CHECKOUTS.set_total(stats["checkouts"])
+    DB_POOL_TIMEOUTS.set_total(stats["timeouts"])
+    DB_POOL_WAIT_SECONDS.set_total(stats["wait_seconds_total"])
+    DB_POOL_CONNECT_SECONDS.set_total(stats["connect_seconds_total"])
+
@@ -0,0 +1,325 @@
+import hashlib
+import json
+import logging
+import time
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.idempotency_service import (
+    IdempotencyKeyInProgressError,
+    IdempotencyKeyReusedError,
+    IdempotencyService,
+)
+
+from .config import db_settings
+from .database import PRIMARY_PIN_COOKIE
+from .metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT
+from .profiling import QueryProfile, profile_queries
+
+logger = logging.getLogger(__name__)
+
+# Методы, которые не изменяют данные и не требуют закрепления за основной БД.
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Маршруты создания, которые принимают заголовок `Idempotency-Key`.
+IDEMPOTENT_PATHS = frozenset({"/tables/", "/reservations/", "/reservations/bulk"})
+IDEMPOTENCY_KEY_HEADER = "idempotency-key"
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+
+class ReadYourWritesMiddleware:
+    """
+    Закрепляет клиента за основной базой данных после записи.
+
+    На успешный ответ на изменяющий запрос (POST, DELETE и т.п.) выставляет
+    cookie `read_primary` со сроком жизни `read_your_writes_seconds`. Пока
+    cookie жива, `get_read_sessionmaker` направляет чтения клиента на
+    основную базу данных, и он не увидит отстающую реплику.
+    """
+
+    def __init__(
+        self, app: ASGIApp, seconds: int = db_settings.read_your_writes_seconds
+    ) -> None:
+        self.app = app
+        self.cookie = (
+            f"{PRIMARY_PIN_COOKIE}=1; Max-Age={seconds}; Path=/; HttpOnly; SameSite=Lax"
+        ).encode()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_pin(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"set-cookie", self.cookie),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
+
+
+class MetricsMiddleware:
+    """
+    Учитывает длительность и число одновременных HTTP-запросов.
+
+    Длительность записывается в гистограмму с меткой шаблона маршрута
+    (например, `/tables/{table_id}`), а не фактического пути, чтобы число
+    рядов метрики не зависело от ID в запросах. Запросы, не совпавшие ни
+    с одним маршрутом, учитываются под меткой `unmatched`.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # Маршрутизатор дописывает найденный маршрут в общий scope.
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status_code,
+            )
+
+
+class ProfilingMiddleware:
+    """
+    Профилирует SQL-запросы каждого HTTP-запроса.
+
+    Если запрос превысил бюджет по числу SQL-запросов или по времени,
+    выполнил медленный SQL-запрос или повторил один запрос
+    `repeat_threshold` и более раз (N+1), в лог `app.core.middleware`
+    пишется предупреждение — одна строка JSON с маршрутом, статусом,
+    длительностью и списком проблемных запросов.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_queries: int = db_settings.profiling_max_queries,
+        max_seconds: float = db_settings.profiling_max_seconds,
+        slow_query_seconds: float = db_settings.profiling_slow_query_seconds,
+        repeat_threshold: int = db_settings.profiling_repeat_threshold,
+    ) -> None:
+        self.app = app
+        self.max_queries = max_queries
+        self.max_seconds = max_seconds
+        self.slow_query_seconds = slow_query_seconds
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        with profile_queries() as profile:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                self.report(scope, status_code, time.perf_counter() - started, profile)
+
+    def report(
+        self, scope: Scope, status_code: int, seconds: float, profile: QueryProfile
+    ) -> None:
+        """Пишет в лог профиль запроса, вышедшего за бюджет."""
+        problems = []
+        if profile.count > self.max_queries:
+            problems.append("query_count")
+        if seconds > self.max_seconds:
+            problems.append("latency")
+        slow = profile.slow(self.slow_query_seconds)
+        if slow:
+            problems.append("slow_query")
+        repeated = profile.repeated(self.repeat_threshold)
+        if repeated:
+            problems.append("n_plus_one")
+        if not problems:
+            return
+
+        route = scope.get("route")
+        logger.warning(
+            json.dumps(
+                {
+                    "event": "request_over_budget",
+                    "problems": problems,
+                    "method": scope["method"],
+                    "route": route.path if route is not None else "unmatched",
+                    "path": scope["path"],
+                    "status": status_code,
+                    "ms": round(seconds * 1000, 3),
+                    "query_count": profile.count,
+                    "query_ms": round(profile.seconds * 1000, 3),
+                    "slow_queries": [statement.to_dict() for statement in slow],
+                    "repeated_queries": repeated,
+                },
+                ensure_ascii=False,
+            )
+        )
+
+
+class IdempotencyMiddleware:
+    """
+    Делает POST-запросы создания идемпотентными по заголовку `Idempotency-Key`.
+
+    Первый запрос с ключом занимает его (`IdempotencyService.begin`),
+    выполняется как обычно, и его ответ сохраняется вместе с ключом.
+    Повтор с тем же ключом и тем же телом получает сохраненный ответ с
+    заголовком `Idempotent-Replayed: true`, не доходя до обработчика.
+    Повтор, пришедший, пока первый запрос еще выполняется, ждет его
+    ответа. Ответы 5xx не сохраняются: ключ освобождается, и повтор
+    выполняется заново.
+
+    Ответы middleware:
+        400: Пустой или слишком длинный ключ.
+        409: Первый запрос с ключом не завершился за `wait_seconds`.
+        422: Ключ уже использован с другим методом, путем или телом запроса.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        service: IdempotencyService,
+        paths: frozenset[str] = IDEMPOTENT_PATHS,
+    ) -> None:
+        self.app = app
+        self.service = service
+        self.paths = paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key = Headers(scope=scope).get(IDEMPOTENCY_KEY_HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            await JSONResponse(
+                {"detail": "Invalid Idempotency-Key header"}, status_code=400
+            )(scope, receive, send)
+            return
+
+        body = await read_body(receive)
+        route = f"{scope['method']} {scope['path']}"
+        fingerprint = hashlib.sha256(
+            b"\0".join(
+                (
+                    scope["method"].encode(),
+                    scope["path"].encode(),
+                    scope["query_string"],
+                    body,
+                )
+            )
+        ).hexdigest()
+
+        try:
+            record = await self.service.begin(key, route, fingerprint)
+        except IdempotencyKeyReusedError:
+            await JSONResponse(
+                {"detail": "Idempotency-Key is already used with a different request"},
+                status_code=422,
+            )(scope, receive, send)
+            return
+        except IdempotencyKeyInProgressError:
+            await JSONResponse(
+                {"detail": "A request with this Idempotency-Key is still in progress"},
+                status_code=409,
+                headers={"Retry-After": "1"},
+            )(scope, receive, send)
+            return
+
+        if record.status_code is not None:
+            headers = [(b"idempotent-replayed", b"true")]
+            if record.content_type is not None:
+                headers.append((b"content-type", record.content_type.encode()))
+            headers.append((b"content-length", str(len(record.body)).encode()))
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": record.status_code,
+                    "headers": headers,
+                }
+            )
+            await send({"type": "http.response.body", "body": record.body})
+            return
+
+        body_sent = False
+
+        async def receive_body() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status_code = None
+        content_type = None
+        chunks = []
+
+        async def send_capturing(message: Message) -> None:
+            nonlocal status_code, content_type
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = Headers(raw=message.get("headers", [])).get("content-type")
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, send_capturing)
+        except Exception:
+            await self.service.release(record)
+            raise
+        if status_code is None or status_code >= 500:
+            await self.service.release(record)
+        else:
+            await self.service.complete(
+                record, status_code, content_type, b"".join(chunks)
+            )
+
+
+async def read_body(receive: Receive) -> bytes:
+    """Читает тело запроса целиком."""
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
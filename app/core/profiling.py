@@ -0,0 +1,143 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class ProfiledStatement:
+    """
+    Выполненный SQL-запрос.
+
+    Атрибуты:
+        statement (str): Текст запроса с плейсхолдерами параметров.
+        seconds (float): Время выполнения.
+        rows (int): Число строк, которое вернул или изменил запрос
+            (-1 для DDL и других запросов без счетчика строк).
+    """
+
+    def __init__(self, statement: str, seconds: float, rows: int) -> None:
+        self.statement = statement
+        self.seconds = seconds
+        self.rows = rows
+
+    def to_dict(self) -> dict:
+        return {
+            "statement": self.statement,
+            "ms": round(self.seconds * 1000, 3),
+            "rows": self.rows,
+        }
+
+
+class QueryProfile:
+    """
+    SQL-запросы, выполненные в рамках одного HTTP-запроса или блока кода.
+
+    Атрибуты:
+        statements (list[ProfiledStatement]): Запросы в порядке выполнения.
+    """
+
+    def __init__(self) -> None:
+        self.statements: list[ProfiledStatement] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def seconds(self) -> float:
+        """Суммарное время выполнения запросов."""
+        return sum(statement.seconds for statement in self.statements)
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        """
+        Находит запросы, выполненные много раз с разными параметрами, —
+        признак N+1.
+
+        Аргументы:
+            threshold: Сколько выполнений одного запроса считать N+1.
+
+        Возвращает:
+            Словарь {текст запроса: число выполнений} для запросов,
+            выполненных не менее `threshold` раз.
+        """
+        counts = Counter(statement.statement for statement in self.statements)
+        return {sql: count for sql, count in counts.items() if count >= threshold}
+
+    def slow(self, seconds: float) -> list[ProfiledStatement]:
+        """Возвращает запросы, выполнявшиеся не менее `seconds` секунд."""
+        return [statement for statement in self.statements if statement.seconds >= seconds]
+
+
+# Профиль текущего запроса; None, если запросы не профилируются.
+_current_profile: ContextVar[QueryProfile | None] = ContextVar(
+    "current_profile", default=None
+)
+
+# Ключ в conn.info со стеком времен начала выполняемых запросов.
+_STARTED_AT = "profiling_started_at"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        conn.info.setdefault(_STARTED_AT, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    if profile is None or not conn.info.get(_STARTED_AT):
+        return
+    started = conn.info[_STARTED_AT].pop()
+    profile.statements.append(
+        ProfiledStatement(statement, time.perf_counter() - started, cursor.rowcount)
+    )
+
+
+def _handle_error(exception_context) -> None:
+    conn = exception_context.connection
+    if conn is not None and conn.info.get(_STARTED_AT):
+        conn.info[_STARTED_AT].pop()
+
+
+def install_profiler(engine: AsyncEngine) -> None:
+    """
+    Подключает запись SQL-запросов движка в профиль текущего запроса.
+
+    Пока профиль не открыт (`profile_queries`), слушатели ничего не
+    записывают. Повторный вызов для того же движка ничего не делает.
+
+    Аргументы:
+        engine: Асинхронный движок SQLAlchemy.
+    """
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+@contextmanager
+def profile_queries() -> Iterator[QueryProfile]:
+    """
+    Записывает SQL-запросы, выполненные внутри блока, в новый профиль.
+
+    Запросы учитываются только на движках, к которым подключен
+    `install_profiler`.
+
+    Пример:
+        >>> with profile_queries() as profile:
+        ...     await service.get_all()
+        >>> profile.count
+        1
+    """
+    profile = QueryProfile()
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
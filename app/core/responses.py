@@ -0,0 +1,18 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON-ответ, сериализуемый напрямую в байты сериализатором pydantic-core.
+
+    Предназначен для обработчиков, которые возвращают уже готовые
+    к выдаче данные (словари со строками, числами, datetime): содержимое
+    не проходит через валидацию response_model и `jsonable_encoder`,
+    а сразу кодируется в JSON на стороне Rust.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
@@ -2,15 +2,52 @@ from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
-from app.core.database import get_db
+from app.core.cache import TTLCache
+from app.core.config import db_settings
+from app.core.database import async_session, get_db, get_read_db
 from app.repositories.table_repo import TableRepository
 from app.repositories.reservation_repo import ReservationRepository
+from app.repositories.reservation_archive_repo import ReservationArchiveRepository
+from app.repositories.occupancy_repo import OccupancyRepository
 from app.services.table_service import TableService
 from app.services.reservation_service import ReservationService
+from app.services.reservation_archive_service import ReservationArchiveService
+from app.services.occupancy_service import OccupancyService
+from app.services.reservation_batcher import ReservationWriteBatcher
+from app.services.availability_index import AvailabilityIndex
+from app.services.idempotency_service import IdempotencyService
+from app.services.table_cache import TableCache
+
+
+# Общий для всех запросов воркера индекс доступности столиков.
+availability_index = AvailabilityIndex(db_settings.availability_index_ttl_seconds)
+
+# Общий для всех запросов воркера кэш столиков.
+table_cache = TableCache(
+    TTLCache(db_settings.table_cache_max_size, db_settings.table_cache_ttl_seconds),
+    db_settings.table_cache_check_seconds,
+    TTLCache(1, db_settings.table_cache_ttl_seconds),
+)
+
+# Ключи идемпотентности POST-запросов (см. IdempotencyMiddleware).
+idempotency_service = IdempotencyService(
+    async_session,
+    db_settings.idempotency_ttl_seconds,
+    db_settings.idempotency_lease_seconds,
+    db_settings.idempotency_wait_seconds,
+)
+
+
+def get_table_cache() -> TableCache | None:
+    """
+    Возвращает кэш столиков воркера или None, если кэш выключен в настройках.
+    """
+    return table_cache if db_settings.table_cache_enabled else None
 
 
 def get_table_service(
     session: AsyncSession = Depends(get_db),
+    cache: TableCache | None = Depends(get_table_cache),
 ) -> TableService:
     """
     Фабрика для создания экземпляра TableService.
@@ -20,26 +57,128 @@ def get_table_service(
 
     Аргументы:
         session (AsyncSession): Асинхронная сессия базы данных (автоматически внедряется через Depends).
+        cache (TableCache | None): Кэш столиков, если он включен.
 
     Возвращает:
         TableService: Экземпляр сервиса для работы со столиками.
     """
-    return TableService(TableRepository(session))
+    return TableService(TableRepository(session), cache)
 
 
 def get_reservation_service(
     session: AsyncSession = Depends(get_db),
+    cache: TableCache | None = Depends(get_table_cache),
 ) -> ReservationService:
     """
     Фабрика для создания экземпляра ReservationService.
 
     Используется как зависимость в FastAPI для предоставления сервиса управления бронированиями.
     Создает ReservationService с репозиторием, использующим предоставленную сессию базы данных.
+    Если в настройках включен `availability_index_enabled`, сервис получает
+    общий для воркера индекс доступности столиков, а при включенном кэше
+    столиков — сервис столиков, по кэшу которого проверяется table_id.
 
     Аргументы:
         session (AsyncSession): Асинхронная сессия базы данных (автоматически внедряется через Depends).
+        cache (TableCache | None): Кэш столиков, если он включен.
 
     Возвращает:
         ReservationService: Экземпляр сервиса для работы с бронированиями.
     """
+    return ReservationService(
+        ReservationRepository(session),
+        availability_index if db_settings.availability_index_enabled else None,
+        TableService(TableRepository(session), cache) if cache is not None else None,
+    )
+
+
+# Очередь группового создания броней воркера. Брони пачки создаются
+# в собственной сессии, с тем же индексом доступности и кэшем столиков,
+# что и у обычных запросов.
+reservation_batcher = ReservationWriteBatcher(
+    async_session,
+    lambda session: get_reservation_service(session, get_table_cache()),
+    db_settings.reservation_batch_max_size,
+    db_settings.reservation_batch_max_delay_seconds,
+)
+
+
+def get_reservation_batcher() -> ReservationWriteBatcher | None:
+    """
+    Возвращает очередь группового создания броней или None, если
+    групповое создание выключено в настройках.
+    """
+    return reservation_batcher if db_settings.reservation_batching_enabled else None
+
+
+def get_table_read_service(
+    session: AsyncSession = Depends(get_read_db),
+    cache: TableCache | None = Depends(get_table_cache),
+) -> TableService:
+    """
+    Фабрика TableService для GET-маршрутов.
+
+    В отличие от `get_table_service`, сервис работает с сессией только
+    для чтения, открытой на реплике базы данных.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для чтения (автоматически внедряется через Depends).
+        cache (TableCache | None): Кэш столиков, если он включен.
+
+    Возвращает:
+        TableService: Экземпляр сервиса для чтения столиков.
+    """
+    return TableService(TableRepository(session), cache)
+
+
+def get_reservation_read_service(
+    session: AsyncSession = Depends(get_read_db),
+) -> ReservationService:
+    """
+    Фабрика ReservationService для GET-маршрутов.
+
+    В отличие от `get_reservation_service`, сервис работает с сессией
+    только для чтения, открытой на реплике базы данных. Индекс доступности
+    ему не передается: он нужен только при создании броней.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для чтения (автоматически внедряется через Depends).
+
+    Возвращает:
+        ReservationService: Экземпляр сервиса для чтения бронирований.
+    """
     return ReservationService(ReservationRepository(session))
+
+
+def get_reservation_archive_read_service(
+    session: AsyncSession = Depends(get_read_db),
+) -> ReservationArchiveService:
+    """
+    Фабрика ReservationArchiveService для GET-маршрутов архива.
+
+    Архив читается с реплики базы данных, как и остальные списки.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для чтения (автоматически внедряется через Depends).
+
+    Возвращает:
+        ReservationArchiveService: Экземпляр сервиса для чтения архива бронирований.
+    """
+    return ReservationArchiveService(ReservationArchiveRepository(session))
+
+
+def get_occupancy_read_service(
+    session: AsyncSession = Depends(get_read_db),
+) -> OccupancyService:
+    """
+    Фабрика OccupancyService для отчетов о загрузке столиков.
+
+    Отчеты читаются с реплики базы данных, как и остальные списки.
+
+    Аргументы:
+        session (AsyncSession): Асинхронная сессия для чтения (автоматически внедряется через Depends).
+
+    Возвращает:
+        OccupancyService: Экземпляр сервиса отчетов о загрузке.
+    """
+    return OccupancyService(OccupancyRepository(session))
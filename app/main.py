@@ -1,14 +1,79 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 
+from app.core.config import db_settings
+from app.core.database import async_engine, async_session, replica_engine
+from app.core.metrics import instrument_engine
+from app.core.middleware import (
+    IdempotencyMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    ReadYourWritesMiddleware,
+)
+from app.core.profiling import install_profiler
+from app.dependencies.services import idempotency_service, reservation_batcher
+from app.services.partition_maintenance import maintain_reservation_partitions
+from app.routers import health, metrics, tables, reservations, stats
+
 
-from app.routers import tables, reservations
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Запускает фоновые задачи обслуживания БД: создание партиций броней
+    наперед и очистку устаревших ключей идемпотентности. При остановке
+    дожидается создания броней, уже принятых в групповую очередь.
+    """
+    tasks = [
+        asyncio.create_task(
+            maintain_reservation_partitions(
+                async_session,
+                db_settings.reservation_partitions_ahead_months,
+                db_settings.reservation_partitions_check_seconds,
+            )
+        )
+    ]
+    if db_settings.idempotency_enabled:
+        tasks.append(
+            asyncio.create_task(
+                idempotency_service.sweep_forever(db_settings.idempotency_sweep_seconds)
+            )
+        )
+    yield
+    await reservation_batcher.close()
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
 
 
 app = FastAPI(
     title="Reserver",
+    lifespan=lifespan,
     description="REST API for restaurant table reservations. The service allow creating, viewing, and deleting reservations, as well as managing tables and time slots.",
 )
 
 
+# Первым добавленный middleware — самый внутренний: повторы запросов
+# проходят через остальные middleware (метрики, read-your-writes).
+if db_settings.idempotency_enabled:
+    app.add_middleware(IdempotencyMiddleware, service=idempotency_service)
+
+app.add_middleware(ReadYourWritesMiddleware)
+
+if db_settings.metrics_enabled:
+    instrument_engine(async_engine)
+    instrument_engine(replica_engine)
+    app.add_middleware(MetricsMiddleware)
+
+if db_settings.profiling_enabled:
+    install_profiler(async_engine)
+    install_profiler(replica_engine)
+    app.add_middleware(ProfilingMiddleware)
+
 app.include_router(tables.router)
 app.include_router(reservations.router)
+app.include_router(stats.router)
+app.include_router(health.router)
+app.include_router(metrics.router)
@@ -0,0 +1,24 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import BigInteger, String
+
+
+from app.core.database import Base
+
+
+class CacheGeneration(Base):
+    """
+    Счетчик поколений кэшируемых данных.
+
+    Триггеры БД увеличивают поколение при каждом изменении данных, а
+    воркеры сверяют с ним свои in-memory кэши (см. app/services/table_cache.py).
+    """
+
+    __tablename__ = "cache_generations"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    generation: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default="0"
+    )
+
+    def __repr__(self) -> str:
+        return f"<CacheGeneration(name='{self.name}', generation={self.generation})>"
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DateTime, Index, Integer, LargeBinary, String, func
+
+
+from app.core.database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Ключ идемпотентности изменяющего запроса и сохраненный ответ на него.
+
+    Строка создается при первом запросе с заголовком `Idempotency-Key`
+    (см. `IdempotencyMiddleware`); пока запрос выполняется, `status_code`
+    пуст. Повтор запроса с тем же ключом получает сохраненный ответ.
+    Ключ уникален в пределах маршрута (`route`, например `POST /tables/`).
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    route: Mapped[str] = mapped_column(String(100), primary_key=True)
+    # SHA-256 метода, пути и тела запроса: тот же ключ с другим телом — ошибка клиента.
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    content_type: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    body: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now()
+    )
+
+    # Для удаления устаревших ключей (`IdempotencyRepository.sweep`).
+    __table_args__ = (Index("ix_idempotency_keys_created_at", "created_at"),)
+
+    def __repr__(self) -> str:
+        return (
+            f"<IdempotencyKey(key='{self.key}', route='{self.route}', "
+            f"status_code={self.status_code})>"
+        )
@@ -1,24 +1,101 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, DateTime, Integer, String
-from datetime import datetime
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy import (
+    DDL,
+    CheckConstraint,
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Interval,
+    String,
+    event,
+    func,
+)
+from sqlalchemy.dialects.postgresql import TSRANGE
+from datetime import datetime, timedelta
 
 
 from app.core.database import Base
 
 
+# Наибольшая длительность брони. Ограничивает, насколько раньше начала
+# интервала может начаться пересекающаяся с ним бронь: по этой границе
+# запросы конфликтов отсекают лишние партиции, а триггер
+# check_reservation_partition_overlap находит пересечения через границу месяца.
+MAX_DURATION_MINUTES = 1440
+MAX_DURATION = timedelta(minutes=MAX_DURATION_MINUTES)
+
+
 class Reservation(Base):
+    """
+    Бронь столика.
+
+    Таблица секционирована по месяцам `reservation_time`
+    (`PARTITION BY RANGE`): партиции `reservations_YYYY_MM` создает функция
+    БД `create_reservation_partition` (см. `ReservationRepository.create_partitions`),
+    а брони вне созданных месяцев попадают в `reservations_default`.
+    Запросы с условием на `reservation_time` читают только нужные партиции.
+
+    Первичный ключ партиционированной таблицы обязан включать ключ
+    секционирования, поэтому в БД он (id, reservation_time), а ORM
+    идентифицирует бронь по одному `id` (id уникален благодаря sequence).
+    EXCLUDE-ограничение на пересечения также создается в каждой партиции
+    отдельно; пересечения броней из соседних партиций проверяет триггер.
+    """
+
     __tablename__ = "reservations"
+    __table_args__ = (
+        Index("ix_reservations_table_id_reservation_time", "table_id", "reservation_time"),
+        Index("ix_reservations_reservation_time_id", "reservation_time", "id"),
+        CheckConstraint(
+            f"duration_minutes BETWEEN 1 AND {MAX_DURATION_MINUTES}",
+            name="reservations_duration_range",
+        ),
+        {"postgresql_partition_by": "RANGE (reservation_time)"},
+    )
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True, index=True)
     customer_name: Mapped[str] = mapped_column(String(100), nullable=False)
     table_id: Mapped[int] = mapped_column(
         ForeignKey("tables.id", ondelete="CASCADE"), nullable=False
     )
-    reservation_time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    reservation_time: Mapped[datetime] = mapped_column(
+        DateTime, primary_key=True, autoincrement=False, nullable=False
+    )
     duration_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
+    period = mapped_column(
+        TSRANGE,
+        Computed(
+            "tsrange(reservation_time, "
+            "reservation_time + make_interval(mins => duration_minutes))",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+    # Системный столбец PostgreSQL: меняется при каждом изменении строки
+    # и служит версией брони для ETag (в DDL не попадает). INSERT в
+    # партиционированную таблицу не может вернуть системный столбец через
+    # RETURNING, поэтому xmin загружается только при чтении брони.
+    xmin: Mapped[int] = mapped_column(system=True)
 
     table: Mapped["Table"] = relationship(back_populates="reservations")
 
+    __mapper_args__ = {"primary_key": [id]}
+
+    @hybrid_property
+    def end_time(self) -> datetime:
+        """Время окончания бронирования (reservation_time + duration_minutes)."""
+        return self.reservation_time + timedelta(minutes=self.duration_minutes)
+
+    @end_time.inplace.expression
+    @classmethod
+    def _end_time_expression(cls):
+        return cls.reservation_time + func.make_interval(
+            0, 0, 0, 0, 0, cls.duration_minutes, type_=Interval
+        )
+
     def __str__(self) -> str:
         return (
             f"Reservation(customer='{self.customer_name}', "
@@ -29,3 +106,158 @@ class Reservation(Base):
 
     def __repr__(self) -> str:
         return f"<Reservation(id={self.id}, customer='{self.customer_name}')>"
+
+
+# EXCLUDE-ограничение по (table_id WITH =) требует GiST-оператор для integer.
+event.listen(
+    Reservation.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist"),
+)
+
+# Партиция по умолчанию для броней вне созданных месяцев. Партиции
+# наследуют индексы родителя, а EXCLUDE-ограничение каждой партиции
+# создается отдельно: на партиционированной таблице оно возможно только
+# с ключом секционирования под оператором "=".
+CREATE_DEFAULT_PARTITION = (
+    "CREATE TABLE reservations_default PARTITION OF reservations DEFAULT",
+    "ALTER TABLE reservations_default ADD CONSTRAINT reservations_default_no_overlap "
+    "EXCLUDE USING gist (table_id WITH =, period WITH &&)",
+)
+
+# Создает партицию месяца `month` с EXCLUDE-ограничением. Брони этого
+# месяца, попавшие в партицию по умолчанию, переносятся в новую партицию
+# (иначе PostgreSQL не даст ее создать). Под advisory-блокировкой, чтобы
+# воркеры, одновременно создающие партиции, не мешали друг другу.
+CREATE_RESERVATION_PARTITION = """
+CREATE OR REPLACE FUNCTION create_reservation_partition(month timestamp) RETURNS text AS $$
+DECLARE
+    lower_bound timestamp := date_trunc('month', month);
+    upper_bound timestamp := date_trunc('month', month) + interval '1 month';
+    partition text := 'reservations_' || to_char(lower_bound, 'YYYY_MM');
+    has_default_rows boolean;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('create_reservation_partition'));
+    IF to_regclass(partition) IS NOT NULL THEN
+        RETURN partition;
+    END IF;
+
+    SELECT EXISTS (
+        SELECT 1 FROM reservations_default
+        WHERE reservation_time >= lower_bound AND reservation_time < upper_bound
+    ) INTO has_default_rows;
+    IF has_default_rows THEN
+        ALTER TABLE reservations DETACH PARTITION reservations_default;
+    END IF;
+
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF reservations FOR VALUES FROM (%L) TO (%L)',
+        partition, lower_bound, upper_bound
+    );
+    EXECUTE format(
+        'ALTER TABLE %I ADD CONSTRAINT %I '
+        'EXCLUDE USING gist (table_id WITH =, period WITH &&)',
+        partition, partition || '_no_overlap'
+    );
+
+    IF has_default_rows THEN
+        EXECUTE format(
+            'WITH moved AS ('
+            '    DELETE FROM reservations_default'
+            '    WHERE reservation_time >= %L AND reservation_time < %L'
+            '    RETURNING *'
+            ') INSERT INTO %I (id, customer_name, table_id, reservation_time, duration_minutes) '
+            'SELECT id, customer_name, table_id, reservation_time, duration_minutes FROM moved',
+            lower_bound, upper_bound, partition
+        );
+        ALTER TABLE reservations ATTACH PARTITION reservations_default DEFAULT;
+    END IF;
+    RETURN partition;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# Брони из разных партиций EXCLUDE-ограничения не видят друг друга.
+# Пересечься через границу месяца могут только бронь, пересекающая
+# границу, и бронь, начинающаяся не позже MAX_DURATION после нее: такие
+# брони берут advisory-блокировку (столик, граница), поэтому параллельные
+# вставки по обе стороны границы проверяются по очереди, и проверяют
+# пересечения по всей таблице. Нарушение сообщается с SQLSTATE
+# EXCLUDE-ограничения (23P01), как и пересечение внутри партиции.
+CHECK_RESERVATION_PARTITION_OVERLAP = f"""
+CREATE OR REPLACE FUNCTION check_reservation_partition_overlap() RETURNS trigger AS $$
+DECLARE
+    starts_at timestamp := lower(NEW.period);
+    ends_at timestamp := upper(NEW.period);
+    boundary timestamp := date_trunc('month', upper(NEW.period));
+BEGIN
+    IF NOT (starts_at < boundary AND boundary < ends_at) THEN
+        boundary := date_trunc('month', starts_at);
+        IF starts_at >= boundary + interval '{MAX_DURATION_MINUTES} minutes' THEN
+            RETURN NULL;
+        END IF;
+    END IF;
+
+    PERFORM pg_advisory_xact_lock(
+        NEW.table_id, (extract(epoch FROM boundary) / 86400)::integer
+    );
+    IF EXISTS (
+        SELECT 1 FROM reservations
+        WHERE table_id = NEW.table_id
+          AND id <> NEW.id
+          AND reservation_time > starts_at - interval '{MAX_DURATION_MINUTES} minutes'
+          AND reservation_time < ends_at
+          AND period && NEW.period
+    ) THEN
+        RAISE EXCEPTION 'conflicting key value violates exclusion constraint "reservations_no_overlap"'
+            USING ERRCODE = 'exclusion_violation',
+                  CONSTRAINT = 'reservations_no_overlap',
+                  TABLE = 'reservations';
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+for statement in (
+    *CREATE_DEFAULT_PARTITION,
+    CREATE_RESERVATION_PARTITION,
+    CHECK_RESERVATION_PARTITION_OVERLAP,
+    "CREATE TRIGGER reservations_partition_overlap "
+    "AFTER INSERT OR UPDATE OF table_id, reservation_time, duration_minutes "
+    "ON reservations "
+    "FOR EACH ROW EXECUTE FUNCTION check_reservation_partition_overlap()",
+):
+    # DDL подставляет в текст %(table)s и т.п., поэтому % функций format() удваивается.
+    event.listen(
+        Reservation.__table__, "after_create", DDL(statement.replace("%", "%%"))
+    )
+
+# Каждая вставка/удаление броней увеличивает tables.reservations_version
+# затронутых столиков — по этой версии воркеры сверяют свои
+# in-memory индексы доступности (см. app/services/availability_index.py).
+# Строки столиков блокируются по одному разу на запрос и в порядке id,
+# как и перед записью броней в ReservationRepository, чтобы запросы,
+# затрагивающие несколько столиков, не ждали друг друга по кругу.
+BUMP_RESERVATIONS_VERSION = """
+CREATE OR REPLACE FUNCTION bump_reservations_version() RETURNS trigger AS $$
+BEGIN
+    PERFORM 1 FROM tables WHERE id IN (SELECT table_id FROM changed)
+    ORDER BY id FOR NO KEY UPDATE;
+    UPDATE tables SET reservations_version = reservations_version + 1
+    WHERE id IN (SELECT DISTINCT table_id FROM changed);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+for statement in (
+    BUMP_RESERVATIONS_VERSION,
+    "CREATE TRIGGER reservations_version_insert AFTER INSERT ON reservations "
+    "REFERENCING NEW TABLE AS changed "
+    "FOR EACH STATEMENT EXECUTE FUNCTION bump_reservations_version()",
+    "CREATE TRIGGER reservations_version_delete AFTER DELETE ON reservations "
+    "REFERENCING OLD TABLE AS changed "
+    "FOR EACH STATEMENT EXECUTE FUNCTION bump_reservations_version()",
+):
+    event.listen(Reservation.__table__, "after_create", DDL(statement))
@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DateTime, Index, Integer, String, func
+
+
+from app.core.database import Base
+
+
+class ReservationArchive(Base):
+    """
+    Прошедшее бронирование, перенесенное из `reservations` в архив.
+
+    Строки переносит `ReservationArchiveService.archive` (CLI
+    `python -m app.cli.archive`) с теми же `id`, что были у броней.
+    Архив только для чтения: с ним не сверяются новые брони, поэтому у
+    него нет ни EXCLUDE-ограничения, ни партиций. `table_id` не ссылается
+    на `tables`: история остается и после удаления столика.
+    """
+
+    __tablename__ = "reservations_archive"
+    __table_args__ = (
+        Index(
+            "ix_reservations_archive_table_id_reservation_time",
+            "table_id",
+            "reservation_time",
+        ),
+        Index("ix_reservations_archive_reservation_time_id", "reservation_time", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    customer_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    table_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    reservation_time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    duration_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<ReservationArchive(id={self.id}, customer='{self.customer_name}', "
+            f"time={self.reservation_time})>"
+        )
@@ -1,8 +1,9 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer
+from sqlalchemy import DDL, BigInteger, FetchedValue, String, Integer, event
 
 
 from app.core.database import Base
+from app.models.cache_generation import CacheGeneration
 
 
 class Table(Base):
@@ -12,9 +13,19 @@ class Table(Base):
     name: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
     seats: Mapped[int] = mapped_column(Integer, nullable=False)
     location: Mapped[str] = mapped_column(String(255), nullable=True)
+    reservations_version: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default="0"
+    )
+    # Системный столбец PostgreSQL: меняется при каждом изменении строки
+    # (в том числе reservations_version) и служит версией столика для ETag.
+    xmin: Mapped[int] = mapped_column(
+        system=True, server_default=FetchedValue(), server_onupdate=FetchedValue()
+    )
 
+    # Брони удаляются каскадом на стороне БД (ondelete="CASCADE"),
+    # без загрузки и поштучного удаления через ORM.
     reservations: Mapped[list["Reservation"]] = relationship(
-        back_populates="table", cascade="all, delete-orphan"
+        back_populates="table", cascade="all, delete-orphan", passive_deletes=True
     )
 
     def __str__(self) -> str:
@@ -24,3 +35,27 @@ class Table(Base):
 
     def __repr__(self) -> str:
         return f"<Table(id={self.id}, name='{self.name}')>"
+
+
+# Каждое изменение списка столиков увеличивает поколение "tables" в
+# cache_generations — по нему воркеры сбрасывают свои кэши столиков
+# (см. app/services/table_cache.py). Обновление reservations_version
+# поколение не меняет.
+BUMP_TABLES_GENERATION = """
+CREATE OR REPLACE FUNCTION bump_tables_generation() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO cache_generations (name, generation) VALUES ('tables', 1)
+    ON CONFLICT (name) DO UPDATE
+    SET generation = cache_generations.generation + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+for statement in (
+    BUMP_TABLES_GENERATION,
+    "CREATE TRIGGER tables_generation AFTER INSERT OR DELETE "
+    "OR UPDATE OF name, seats, location ON tables "
+    "FOR EACH STATEMENT EXECUTE FUNCTION bump_tables_generation()",
+):
+    event.listen(Table.__table__, "after_create", DDL(statement))
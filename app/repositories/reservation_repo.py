@@ -1,9 +1,29 @@
 from datetime import datetime, timedelta
+from typing import AsyncIterator, Sequence
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    Integer,
+    Select,
+    any_,
+    bindparam,
+    column,
+    exists,
+    func,
+    insert,
+    or_,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import Row
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 
-from app.models.reservation import Reservation
+from app.models.cache_generation import CacheGeneration
+from app.models.reservation import MAX_DURATION, Reservation
+from app.models.table import Table
 from app.repositories.base import BaseRepository
 
 
@@ -19,6 +39,12 @@ class ReservationRepository(BaseRepository[Reservation]):
         model (Type[Reservation]): Модель бронирования
     """
 
+    # Запросы вставки броней по наборам столбцов и условие удаления строятся
+    # один раз: построение выражения стоит дороже, чем его выполнение из
+    # кэша компиляции.
+    _locked_inserts: dict[tuple[str, ...], Select] = {}
+    _delete_conditions: tuple | None = None
+
     def __init__(self, session: AsyncSession) -> None:
         """
         Инициализирует репозиторий бронирований.
@@ -28,6 +54,275 @@ class ReservationRepository(BaseRepository[Reservation]):
         """
         super().__init__(session, Reservation)
 
+    def keyset_columns(self) -> tuple:
+        """Бронирования листаются в хронологическом порядке: (reservation_time, id)."""
+        return (self.model.reservation_time, self.model.id)
+
+    def returning_columns(self) -> tuple:
+        """
+        Столбцы новой брони без `xmin`: INSERT в партиционированную таблицу
+        не может вернуть системный столбец через RETURNING.
+        """
+        return (
+            self.model.id,
+            self.model.customer_name,
+            self.model.table_id,
+            self.model.reservation_time,
+            self.model.duration_minutes,
+        )
+
+    async def create(self, obj: Reservation) -> Reservation:
+        """
+        Создает бронь одним запросом, заранее блокируя строку ее столика.
+
+        Аргументы:
+            obj: Объект бронирования для сохранения.
+
+        Возвращает:
+            Созданное бронирование.
+
+        Исключения:
+            sqlalchemy.exc.SQLAlchemyError: При ошибках работы с БД.
+        """
+        created = await self._insert_locked([self.column_values(obj)])
+        return created[0]
+
+    async def create_many(self, values: list[dict]) -> list[Reservation]:
+        """
+        Создает несколько броней одним запросом INSERT ... SELECT ... RETURNING,
+        заранее блокируя строки их столиков (см. `_lock_tables`).
+
+        Аргументы:
+            values: Значения столбцов для каждой новой брони.
+
+        Возвращает:
+            Созданные бронирования в порядке `values`.
+
+        Исключения:
+            sqlalchemy.exc.SQLAlchemyError: При ошибках работы с БД
+                (ни одна бронь не создается).
+        """
+        return await self._insert_locked(values)
+
+    async def delete_returning_table(
+        self, obj_id: int, versions: Sequence[int] | None = None
+    ) -> int | None:
+        """
+        Удаляет бронь тем же запросом, что и `delete`, но возвращает ID ее столика.
+
+        Аргументы:
+            obj_id: Идентификатор брони
+            versions: Допустимые версии брони или None без проверки версии
+
+        Возвращает:
+            ID столика удаленной брони или None, если бронь (с такой версией)
+            не найдена.
+        """
+        return await self._delete(obj_id, versions, self.model.table_id)
+
+    def delete_conditions(self) -> tuple:
+        """Удаление брони тоже сначала блокирует строку ее столика."""
+        if self._delete_conditions is None:
+            target = aliased(Reservation)
+            table_id = (
+                select(target.table_id)
+                .where(target.id == bindparam("obj_id"))
+                .scalar_subquery()
+            )
+            type(self)._delete_conditions = (self._lock_tables(Table.id == table_id),)
+        return self._delete_conditions
+
+    @staticmethod
+    def _lock_tables(criterion: ColumnElement[bool]) -> ColumnElement[bool]:
+        """
+        Условие, которое блокирует строки столиков до записи их броней.
+
+        Параллельные вставки пересекающихся броней проверяют
+        EXCLUDE-ограничение по индексным записям друг друга, а триггер
+        reservations_partition_overlap берет advisory-блокировки столика
+        в порядке строк запроса; такие вставки ждут друг друга, и PostgreSQL
+        прерывает одну из них взаимной блокировкой лишь через
+        `deadlock_timeout`. Триггер reservations_version_* блокирует строку
+        столика только после вставки, поэтому INSERT и DELETE броней
+        блокируют ее (FOR NO KEY UPDATE, в порядке id) заранее. Подзапрос
+        не зависит от строк запроса, и PostgreSQL выполняет его один раз
+        до первой строки (InitPlan), так что запись остается одним запросом,
+        а брони одного столика пишутся по очереди.
+        """
+        locked = (
+            select(Table.id)
+            .where(criterion)
+            .order_by(Table.id)
+            .with_for_update(key_share=True)
+            .subquery()
+        )
+        return select(func.count()).select_from(locked).scalar_subquery() >= 0
+
+    async def _insert_locked(self, rows: list[dict]) -> list[Reservation]:
+        names = tuple(rows[0])
+        params = {name: [row[name] for row in rows] for name in names}
+        params["positions"] = list(range(len(rows)))
+        params["lock_table_ids"] = sorted(set(params["table_id"]))
+        result = await self.session.scalars(
+            self._locked_insert_statement(names), params
+        )
+        # Строки вставляются в порядке position, и id растут в том же порядке.
+        created = sorted(result.all(), key=lambda reservation: reservation.id)
+        await self.session.commit()
+        return created
+
+    def _locked_insert_statement(self, names: tuple[str, ...]) -> Select:
+        """
+        INSERT ... SELECT броней, переданных массивами по столбцам `names`.
+
+        Текст запроса не зависит от числа броней, а сам запрос строится
+        один раз для набора столбцов.
+        """
+        statement = self._locked_inserts.get(names)
+        if statement is not None:
+            return statement
+        columns = self.model.__table__.c
+        source = func.unnest(
+            bindparam("positions", type_=ARRAY(Integer)),
+            *(bindparam(name, type_=ARRAY(columns[name].type)) for name in names),
+        ).table_valued(
+            column("position", Integer),
+            *(column(name, columns[name].type) for name in names),
+        ).render_derived(name="source")
+        table_ids = bindparam("lock_table_ids", type_=ARRAY(Integer))
+        query = insert(self.model).from_select(
+            names,
+            select(*(source.c[name] for name in names))
+            .where(self._lock_tables(Table.id == any_(table_ids)))
+            .order_by(source.c.position),
+        )
+        statement = select(self.model).from_statement(
+            query.returning(*self.returning_columns())
+        )
+        self._locked_inserts[names] = statement
+        return statement
+
+    async def get_filtered_page(
+        self,
+        limit: int,
+        cursor: str | None = None,
+        table_id: int | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        customer_name: str | None = None,
+    ) -> tuple[list[Reservation], str | None]:
+        """
+        Получает страницу бронирований с фильтрацией на стороне БД.
+
+        Аргументы:
+            limit: Максимальное число бронирований на странице
+            cursor: Курсор предыдущей страницы или None для первой
+            table_id: Только брони указанного столика
+            start: Только брони, начинающиеся не раньше start
+            end: Только брони, начинающиеся раньше end
+            customer_name: Только брони на указанное имя (точное совпадение)
+
+        Возвращает:
+            Кортеж (бронирования страницы, курсор следующей страницы или None).
+
+        Исключения:
+            ValueError: Если курсор поврежден.
+
+        Пример:
+            >>> page, next_cursor = await repo.get_filtered_page(limit=50, table_id=1)
+        """
+        return await self.get_page(
+            limit, cursor, self._list_filters(table_id, start, end, customer_name)
+        )
+
+    async def get_filtered_page_rows(
+        self,
+        limit: int,
+        columns: Sequence[str],
+        cursor: str | None = None,
+        table_id: int | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        customer_name: str | None = None,
+    ) -> tuple[list[dict], str | None]:
+        """
+        То же, что `get_filtered_page`, но возвращает словари столбцов
+        без создания ORM-объектов (см. `BaseRepository.get_page_rows`).
+
+        Аргументы:
+            limit: Максимальное число бронирований на странице
+            columns: Имена выбираемых столбцов
+            cursor: Курсор предыдущей страницы или None для первой
+            table_id: Только брони указанного столика
+            start: Только брони, начинающиеся не раньше start
+            end: Только брони, начинающиеся раньше end
+            customer_name: Только брони на указанное имя (точное совпадение)
+
+        Возвращает:
+            Кортеж (строки страницы, курсор следующей страницы или None).
+
+        Исключения:
+            ValueError: Если курсор поврежден.
+        """
+        return await self.get_page_rows(
+            limit,
+            columns,
+            cursor,
+            self._list_filters(table_id, start, end, customer_name),
+        )
+
+    def _list_filters(
+        self,
+        table_id: int | None,
+        start: datetime | None,
+        end: datetime | None,
+        customer_name: str | None,
+    ) -> list:
+        filters = []
+        if table_id is not None:
+            filters.append(self.model.table_id == table_id)
+        if start is not None:
+            filters.append(self.model.reservation_time >= start)
+        if end is not None:
+            filters.append(self.model.reservation_time < end)
+        if customer_name is not None:
+            filters.append(self.model.customer_name == customer_name)
+        return filters
+
+    async def stream_rows(self, batch_size: int) -> AsyncIterator[Sequence[Row]]:
+        """
+        Потоково читает все бронирования пачками через серверный курсор.
+
+        Выбираются только столбцы (без ORM-объектов), а БД отдает строки
+        порциями по batch_size, поэтому потребление памяти не зависит
+        от общего числа бронирований.
+
+        Аргументы:
+            batch_size: Число строк в одной порции
+
+        Возвращает:
+            Асинхронный итератор порций строк
+            (id, customer_name, table_id, reservation_time, duration_minutes)
+            в порядке id.
+
+        Пример:
+            >>> async for rows in repo.stream_rows(batch_size=1000):
+            ...     process(rows)
+        """
+        result = await self.session.stream(
+            select(
+                self.model.id,
+                self.model.customer_name,
+                self.model.table_id,
+                self.model.reservation_time,
+                self.model.duration_minutes,
+            )
+            .order_by(self.model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for partition in result.partitions():
+            yield partition
+
     async def get_reservations_by_table(
         self, table_id: int, exclude_id: int | None = None
     ) -> list[Reservation]:
@@ -53,6 +348,133 @@ class ReservationRepository(BaseRepository[Reservation]):
         result = await self.session.execute(query)
         return result.scalars().all()
 
+    async def get_intervals_by_table(
+        self, table_id: int, since: datetime
+    ) -> list[tuple[int, datetime, datetime]]:
+        """
+        Получает интервалы занятости столика без загрузки ORM-объектов.
+
+        Загружаются только брони, которые могут заканчиваться после `since`:
+        как и в `has_conflict`, бронь не длится дольше MAX_DURATION, поэтому
+        достаточно условия `reservation_time > since - MAX_DURATION` по
+        индексу (table_id, reservation_time). Закончившиеся к `since` брони
+        отбрасываются.
+
+        Аргументы:
+            table_id: Идентификатор столика
+            since: Момент, раньше которого интервалы не нужны
+
+        Возвращает:
+            Список кортежей (id, начало, окончание), отсортированный по началу.
+
+        Пример:
+            >>> intervals = await repo.get_intervals_by_table(1, datetime.now())
+        """
+        result = await self.session.execute(
+            select(self.model.id, self.model.reservation_time, self.model.end_time)
+            .where(
+                self.model.table_id == table_id,
+                self.model.reservation_time > since - MAX_DURATION,
+                self.model.end_time > since,
+            )
+            .order_by(self.model.reservation_time)
+        )
+        return [tuple(row) for row in result]
+
+    async def get_reservations_version(self, table_id: int) -> int | None:
+        """
+        Получает версию набора бронирований столика.
+
+        Версия увеличивается триггером БД при каждой вставке или удалении
+        бронирований столика.
+
+        Аргументы:
+            table_id: Идентификатор столика
+
+        Возвращает:
+            Текущая версия, или None если столик не существует.
+        """
+        result = await self.session.execute(
+            select(Table.reservations_version).where(Table.id == table_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_collection_version(self) -> str:
+        """
+        Получает версию набора всех бронирований для ETag одним запросом.
+
+        Каждая вставка или удаление броней увеличивает reservations_version
+        столика, поэтому сумма версий по столикам растет при любом изменении
+        броней. Удаление столика уменьшает сумму, но увеличивает поколение
+        столиков, так что пара (поколение, сумма) не повторяется.
+
+        Возвращает:
+            Строка вида "<поколение столиков>.<сумма версий броней>".
+        """
+        result = await self.session.execute(
+            select(
+                select(CacheGeneration.generation)
+                .where(CacheGeneration.name == "tables")
+                .scalar_subquery(),
+                select(func.coalesce(func.sum(Table.reservations_version), 0))
+                .scalar_subquery(),
+            )
+        )
+        generation, total = result.one()
+        return f"{generation or 0}.{total}"
+
+    async def find_conflicting(
+        self, intervals: list[tuple[int, datetime, datetime]]
+    ) -> set[int]:
+        """
+        Проверяет набор интервалов на пересечения с бронями одним запросом.
+
+        Интервалы передаются четырьмя массивами и разворачиваются в БД
+        через unnest, после чего каждый проверяется на пересечение `period`
+        по GiST-индексу. Число параметров запроса не зависит от размера набора.
+
+        Аргументы:
+            intervals: Кортежи (table_id, начало, окончание)
+
+        Возвращает:
+            Множество позиций интервалов (индексов в списке intervals),
+            пересекающихся с существующими бронями.
+
+        Пример:
+            >>> await repo.find_conflicting([(1, start, end), (2, start, end)])
+            {0}
+        """
+        if not intervals:
+            return set()
+
+        table_ids, starts, ends = zip(*intervals)
+        batch = func.unnest(
+            bindparam("positions", list(range(len(intervals))), ARRAY(Integer)),
+            bindparam("table_ids", list(table_ids), ARRAY(Integer)),
+            bindparam("starts", list(starts), ARRAY(DateTime)),
+            bindparam("ends", list(ends), ARRAY(DateTime)),
+        ).table_valued(
+            column("position", Integer),
+            column("table_id", Integer),
+            column("starts_at", DateTime),
+            column("ends_at", DateTime),
+        ).render_derived(name="batch")
+
+        result = await self.session.execute(
+            select(batch.c.position).where(
+                exists().where(
+                    self.model.table_id == batch.c.table_id,
+                    # Границы по reservation_time отсекают партиции при выполнении.
+                    self.model.reservation_time > batch.c.starts_at - MAX_DURATION,
+                    self.model.reservation_time < batch.c.ends_at,
+                    self.model.period.op("&&")(
+                        func.tsrange(batch.c.starts_at, batch.c.ends_at)
+                    ),
+                )
+            )
+        )
+        return set(result.scalars().all())
+
     async def has_conflict(
         self,
         table_id: int,
@@ -78,6 +500,18 @@ class ReservationRepository(BaseRepository[Reservation]):
             - Новое бронирование: [start_time, start_time + duration]
             - Существующее бронирование: [reservation_time, reservation_time + duration_minutes]
 
+            Проверка выполняется одним запросом в БД по индексу
+            (table_id, reservation_time) и состоит из двух условий:
+            - существует бронирование, начинающееся внутри нового интервала;
+            - последнее бронирование, начавшееся до start_time, заканчивается
+              позже start_time.
+            Брони одного столика не пересекаются между собой, поэтому среди
+            начавшихся раньше именно последнее заканчивается позже всех —
+            стоимость запроса не зависит от объема истории бронирований.
+            Бронь не длиннее MAX_DURATION, поэтому предыдущая ищется только
+            среди начавшихся не раньше start_time - MAX_DURATION: запрос
+            читает одну-две месячные партиции.
+
         Пример:
             >>> conflict = await repo.has_conflict(
             ...     table_id=1,
@@ -85,15 +519,68 @@ class ReservationRepository(BaseRepository[Reservation]):
             ...     duration=120
             ... )
         """
-        reservations = await self.get_reservations_by_table(table_id, exclude_id)
         new_end = start_time + timedelta(minutes=duration)
 
-        for reservation in reservations:
-            existing_end = reservation.reservation_time + timedelta(
-                minutes=reservation.duration_minutes
+        scope = [self.model.table_id == table_id]
+        if exclude_id:
+            scope.append(self.model.id != exclude_id)
+
+        starts_inside = exists().where(
+            *scope,
+            self.model.reservation_time >= start_time,
+            self.model.reservation_time < new_end,
+        )
+        previous_end = (
+            select(self.model.end_time)
+            .where(
+                *scope,
+                self.model.reservation_time > start_time - MAX_DURATION,
+                self.model.reservation_time < start_time,
             )
+            .order_by(self.model.reservation_time.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
 
-            if start_time < existing_end and new_end > reservation.reservation_time:
-                return True
+        result = await self.session.execute(
+            select(or_(starts_inside, previous_end > start_time))
+        )
+        return bool(result.scalar())
+
+    async def create_partitions(self, start: datetime, months: int) -> list[str]:
+        """
+        Создает месячные партиции броней, начиная с месяца `start`.
 
-        return False
+        Уже существующие партиции не изменяются; брони нового месяца,
+        попавшие в партицию по умолчанию, переносятся в его партицию.
+        Партиции стоит создавать заранее: создание партиции ненадолго
+        блокирует таблицу броней.
+
+        Аргументы:
+            start: Любой момент первого месяца.
+            months: Число месяцев.
+
+        Возвращает:
+            Имена партиций (`reservations_YYYY_MM`) в порядке месяцев.
+
+        Пример:
+            >>> await repo.create_partitions(datetime(2030, 1, 1), months=3)
+            ['reservations_2030_01', 'reservations_2030_02', 'reservations_2030_03']
+        """
+        result = await self.session.execute(
+            text(
+                """
+                SELECT create_reservation_partition(month)
+                FROM generate_series(
+                    date_trunc('month', CAST(:start AS timestamp)),
+                    date_trunc('month', CAST(:start AS timestamp))
+                        + (:months - 1) * interval '1 month',
+                    interval '1 month'
+                ) AS month
+                """
+            ),
+            {"start": start, "months": months},
+        )
+        partitions = list(result.scalars())
+        await self.session.commit()
+        return partitions
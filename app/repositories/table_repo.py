@@ -1,6 +1,14 @@
+from datetime import datetime, timedelta
+from typing import Any, Sequence
+
+from sqlalchemy import ColumnElement, exists, func, true
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
 
 
+from app.models.cache_generation import CacheGeneration
+from app.models.reservation import MAX_DURATION, Reservation
 from app.models.table import Table
 from app.repositories.base import BaseRepository
 
@@ -25,3 +33,112 @@ class TableRepository(BaseRepository[Table]):
             session: Асинхронная сессия для работы с базой данных.
         """
         super().__init__(session, Table)
+
+    async def get_free_slots(
+        self,
+        start: datetime,
+        end: datetime,
+        party_size: int,
+        slot_minutes: int,
+    ) -> list[Row]:
+        """
+        Находит свободные слоты всех подходящих столиков одним запросом.
+
+        Окно [start, end) разбивается на слоты длиной slot_minutes через
+        generate_series, слоты столиков с достаточным числом мест
+        анти-соединяются с бронями по пересечению `period` (через GiST-индекс
+        EXCLUDE-ограничения). Стоимость запроса зависит от размера окна
+        и числа столиков, но не от объема истории бронирований: брони
+        ищутся только в границах окна (с запасом MAX_DURATION до его начала),
+        поэтому читаются лишь партиции броней этих месяцев.
+
+        Аргументы:
+            start: Начало окна поиска.
+            end: Окончание окна поиска (слоты, не помещающиеся целиком, отбрасываются).
+            party_size: Минимальное число мест за столиком.
+            slot_minutes: Длина слота в минутах.
+
+        Возвращает:
+            Строки (id, name, seats, location, slot_start), упорядоченные
+            по столику и времени слота.
+
+        Пример:
+            >>> rows = await repo.get_free_slots(start, end, party_size=4, slot_minutes=30)
+        """
+        slot_length = timedelta(minutes=slot_minutes)
+        slots = (
+            func.generate_series(start, end - slot_length, slot_length)
+            .table_valued("slot_start")
+            .render_derived(name="slots")
+        )
+        slot_start = slots.c.slot_start
+
+        is_reserved = exists().where(
+            Reservation.table_id == self.model.id,
+            Reservation.reservation_time > start - MAX_DURATION,
+            Reservation.reservation_time < end,
+            Reservation.period.op("&&")(
+                func.tsrange(slot_start, slot_start + slot_length)
+            ),
+        )
+
+        result = await self.session.execute(
+            select(
+                self.model.id,
+                self.model.name,
+                self.model.seats,
+                self.model.location,
+                slot_start,
+            )
+            .select_from(self.model)
+            .join(slots, true())
+            .where(self.model.seats >= party_size, ~is_reserved)
+            .order_by(self.model.id, slot_start)
+        )
+        return result.all()
+
+    async def get_rows(
+        self,
+        columns: Sequence[str],
+        filters: Sequence[ColumnElement[bool]] = (),
+    ) -> list[dict[str, Any]]:
+        """
+        Получает столики в виде словарей столбцов, упорядоченных по ID.
+
+        Аргументы:
+            columns: Имена выбираемых столбцов.
+            filters: Дополнительные условия WHERE.
+
+        Возвращает:
+            Список словарей столбцов.
+        """
+        result = await self.session.execute(
+            select(*(getattr(self.model, name) for name in columns))
+            .where(*filters)
+            .order_by(self.model.id)
+        )
+        return [dict(zip(columns, row)) for row in result]
+
+    async def get_generation(self) -> int:
+        """
+        Получает поколение списка столиков.
+
+        Поколение увеличивает триггер БД при каждом изменении столиков;
+        по нему воркеры сверяют свои кэши.
+
+        Возвращает:
+            Текущее поколение (0, если столики еще не изменялись).
+        """
+        result = await self.session.execute(
+            select(CacheGeneration.generation).where(CacheGeneration.name == "tables")
+        )
+        return result.scalar_one_or_none() or 0
+
+    async def get_collection_version(self) -> str:
+        """
+        Получает версию списка столиков для ETag.
+
+        Возвращает:
+            Строка, меняющаяся при каждом изменении списка столиков.
+        """
+        return str(await self.get_generation())
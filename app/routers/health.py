@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+
+from app.core.database import async_engine
+from app.schemas.health import PoolStatus
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/pool", response_model=PoolStatus)
+async def get_pool_status():
+    """
+    Получить состояние пула соединений с базой данных.
+
+    Показывает, сколько соединений сейчас выдано обработчикам, сколько
+    простаивает в пуле и сколько открыто сверх `db_pool_size`, а также
+    сколько времени запросы ждали свободное соединение. Рост ожидания
+    и таймаутов означает, что пул мал для текущей нагрузки.
+
+    Возвращает:
+        PoolStatus: Текущее состояние пула соединений воркера.
+    """
+    return async_engine.pool.stats()
@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.database import async_engine
+from app.core.metrics import collect_pool, registry
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Получить метрики процесса в текстовом формате Prometheus.
+
+    Содержит гистограммы длительности запросов по маршрутам, число
+    запросов в обработке, время и число SQL-запросов по типам, состояние
+    пула соединений и число отклоненных из-за конфликтов броней. Метрики
+    собираются внутри процесса, по одному набору на воркер.
+
+    Возвращает:
+        PlainTextResponse: Метрики в формате Prometheus 0.0.4.
+    """
+    collect_pool(async_engine.pool.stats())
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,38 +1,279 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import Literal
 
-from app.schemas.reservation import ReservationCreate, ReservationRead
-from app.services.reservation_service import ReservationService
-from app.dependencies.services import get_reservation_service
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import get_read_sessionmaker
+from app.core.etag import collection_etag, if_match_versions, make_etag, not_modified
+from app.core.responses import FastJSONResponse
+from app.models.reservation import MAX_DURATION_MINUTES
+from app.repositories.reservation_repo import ReservationRepository
+from app.schemas.page import Page
+from app.schemas.reservation import (
+    ReservationArchiveRead,
+    ReservationAvailability,
+    ReservationBulkCreate,
+    ReservationBulkResult,
+    ReservationCreate,
+    ReservationRead,
+)
+from app.services.reservation_archive_service import ReservationArchiveService
+from app.services.reservation_batcher import ReservationWriteBatcher
+from app.services.reservation_service import (
+    ConcurrentWriteError,
+    ReservationService,
+    TableNotFoundError,
+)
+from app.dependencies.services import (
+    get_reservation_archive_read_service,
+    get_reservation_batcher,
+    get_reservation_read_service,
+    get_reservation_service,
+)
 
 router = APIRouter(prefix="/reservations", tags=["Reservations"])
 
+# Число строк, которые читаются из БД и отправляются клиенту за один фрагмент.
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
 
-@router.get("/", response_model=list[ReservationRead])
+@router.get(
+    "/", response_model=Page[ReservationRead], response_class=FastJSONResponse
+)
 async def get_reservations(
+    request: Request,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    table_id: int | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    customer_name: str | None = None,
+    service: ReservationService = Depends(get_reservation_read_service),
+):
+    """
+    Получить страницу бронирований.
+
+    Возвращает бронирования в хронологическом порядке (по времени начала)
+    с keyset-пагинацией: для следующей страницы передайте `next_cursor`
+    из ответа в параметр `cursor`. Фильтры применяются на стороне БД.
+    Столбцы `ReservationRead` выбираются без ORM-объектов и сериализуются
+    в JSON напрямую, без повторной валидации каждой строки.
+
+    Ответ содержит ETag по версии набора бронирований. Если клиент передал
+    его в If-None-Match и брони не изменились, возвращается 304 Not Modified
+    без выборки бронирований.
+
+    Аргументы:
+        limit (int): Максимальное число бронирований на странице.
+        cursor (str | None): Курсор следующей страницы из предыдущего ответа.
+        table_id (int | None): Только брони указанного столика.
+        start (datetime | None): Только брони, начинающиеся не раньше start.
+        end (datetime | None): Только брони, начинающиеся раньше end.
+        customer_name (str | None): Только брони на указанное имя.
+
+    Возвращает:
+        Page[ReservationRead]: Страница бронирований и курсор следующей страницы.
+
+    Исключения:
+        HTTPException(400): Если курсор поврежден.
+    """
+    etag = collection_etag(
+        "reservations", await service.get_collection_version(), request
+    )
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    try:
+        items, next_cursor = await service.get_filtered_page_rows(
+            limit,
+            list(ReservationRead.model_fields),
+            cursor,
+            table_id,
+            start,
+            end,
+            customer_name,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return FastJSONResponse(
+        {"items": items, "next_cursor": next_cursor}, headers={"ETag": etag}
+    )
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_reservations(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_read_sessionmaker),
+):
+    """
+    Выгрузить все бронирования потоком в формате NDJSON или CSV.
+
+    Бронирования читаются из БД серверным курсором и отправляются клиенту
+    фрагментами по `EXPORT_BATCH_SIZE` строк, не накапливаясь в памяти.
+    Ответ отправляется уже после завершения зависимостей запроса, поэтому
+    выгрузка открывает собственную сессию на время передачи.
+
+    Аргументы:
+        format (str): Формат выгрузки: `ndjson` (по умолчанию) или `csv`.
+
+    Возвращает:
+        StreamingResponse: Поток строк выгрузки.
+    """
+
+    async def stream():
+        async with session_factory() as session:
+            service = ReservationService(ReservationRepository(session))
+            async for chunk in service.export(format, EXPORT_BATCH_SIZE):
+                yield chunk
+
+    return StreamingResponse(
+        stream(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="reservations.{format}"'
+        },
+    )
+
+
+@router.get(
+    "/archive",
+    response_model=Page[ReservationArchiveRead],
+    response_class=FastJSONResponse,
+)
+async def get_archived_reservations(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    table_id: int | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    customer_name: str | None = None,
+    service: ReservationArchiveService = Depends(get_reservation_archive_read_service),
+):
+    """
+    Получить страницу архивных бронирований.
+
+    Прошедшие брони старше `archive_horizon_days` переносятся из основной
+    таблицы в архив (`python -m app.cli.archive`) и дальше доступны только
+    здесь. Порядок, фильтры и курсор те же, что у `GET /reservations/`.
+
+    Аргументы:
+        limit (int): Максимальное число бронирований на странице.
+        cursor (str | None): Курсор следующей страницы из предыдущего ответа.
+        table_id (int | None): Только брони указанного столика.
+        start (datetime | None): Только брони, начинающиеся не раньше start.
+        end (datetime | None): Только брони, начинающиеся раньше end.
+        customer_name (str | None): Только брони на указанное имя.
+
+    Возвращает:
+        Page[ReservationArchiveRead]: Страница архивных бронирований и курсор
+        следующей страницы.
+
+    Исключения:
+        HTTPException(400): Если курсор поврежден.
+    """
+    try:
+        items, next_cursor = await service.get_filtered_page_rows(
+            limit,
+            list(ReservationArchiveRead.model_fields),
+            cursor,
+            table_id,
+            start,
+            end,
+            customer_name,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return FastJSONResponse({"items": items, "next_cursor": next_cursor})
+
+
+@router.get("/availability", response_model=ReservationAvailability)
+async def check_availability(
+    table_id: int,
+    start: datetime,
+    duration_minutes: int = Query(..., gt=0, le=MAX_DURATION_MINUTES),
     service: ReservationService = Depends(get_reservation_service),
 ):
     """
-    Получить список всех бронирований.
+    Проверить, свободен ли столик в указанный интервал.
+
+    При включенном `availability_index_enabled` ответ дается из in-memory
+    индекса доступности без запроса броней к БД. Ответ не резервирует слот:
+    окончательно его подтверждает только создание брони.
 
-    Возвращает список всех существующих бронирований в системе.
-    Использует сервис `ReservationService` для выполнения запроса к базе данных.
+    Аргументы:
+        table_id (int): Идентификатор столика.
+        start (datetime): Время начала бронирования.
+        duration_minutes (int): Длительность бронирования в минутах.
 
     Возвращает:
-        list[ReservationRead]: Список бронирований в формате `ReservationRead`.
+        ReservationAvailability: Запрошенный интервал и признак `available`.
+
+    Исключения:
+        HTTPException(404): Если столик не существует.
     """
-    return await service.get_all()
+    try:
+        available = await service.is_slot_available(table_id, start, duration_minutes)
+    except TableNotFoundError:
+        raise HTTPException(status_code=404, detail="Table not found")
+    return ReservationAvailability(
+        table_id=table_id,
+        reservation_time=start,
+        duration_minutes=duration_minutes,
+        available=available,
+    )
+
+
+@router.get("/{reservation_id}", response_model=ReservationRead)
+async def get_reservation(
+    reservation_id: int,
+    request: Request,
+    response: Response,
+    service: ReservationService = Depends(get_reservation_read_service),
+):
+    """
+    Получить бронирование по ID.
+
+    Ответ содержит ETag версии бронирования: его можно передать
+    в If-None-Match для проверки изменений или в If-Match при отмене брони.
+
+    Аргументы:
+        reservation_id (int): Идентификатор бронирования.
+
+    Возвращает:
+        ReservationRead: Бронирование в формате `ReservationRead` или 304 Not Modified.
+
+    Исключения:
+        HTTPException(404): Если бронирование с указанным ID не существует.
+    """
+    reservation = await service.get_by_id(reservation_id)
+    if reservation is None:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    etag = make_etag(reservation.id, reservation.xmin)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    response.headers["ETag"] = etag
+    return reservation
 
 
 @router.post("/", response_model=ReservationRead, status_code=status.HTTP_201_CREATED)
 async def create_reservation(
     reservation_in: ReservationCreate,
     service: ReservationService = Depends(get_reservation_service),
+    batcher: ReservationWriteBatcher | None = Depends(get_reservation_batcher),
 ):
     """
     Создать новое бронирование.
 
     Проверяет доступность столика на указанное время и создает бронирование,
     если нет конфликтов. Если столик уже забронирован, возвращает ошибку 409 Conflict.
+    При включенном групповом создании бронь создается вместе с другими
+    бронями, пришедшими за несколько миллисекунд (`ReservationWriteBatcher`).
 
     Аргументы:
         reservation_in (ReservationCreate): Данные для создания нового бронирования.
@@ -41,13 +282,20 @@ async def create_reservation(
         ReservationRead: Созданное бронирование в формате `ReservationRead`.
 
     Исключения:
+        HTTPException(404): Если столик не существует.
         HTTPException(409): Если столик уже забронирован на указанное время.
     """
     from app.models.reservation import Reservation
 
     reservation = Reservation(**reservation_in.model_dump())
 
-    created = await service.create_reservation_if_available(reservation)
+    try:
+        if batcher is not None:
+            created = await batcher.submit(reservation)
+        else:
+            created = await service.create_reservation_if_available(reservation)
+    except TableNotFoundError:
+        raise HTTPException(status_code=404, detail="Table not found")
     if not created:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -56,23 +304,99 @@ async def create_reservation(
     return created
 
 
+@router.post(
+    "/bulk", response_model=ReservationBulkResult, status_code=status.HTTP_201_CREATED
+)
+async def create_reservations_bulk(
+    bulk_in: ReservationBulkCreate,
+    response: Response,
+    service: ReservationService = Depends(get_reservation_service),
+):
+    """
+    Создать пачку бронирований.
+
+    Проверяет всю пачку на пересечения с существующими бронями одним
+    запросом и на пересечения внутри пачки, затем вставляет принятые брони
+    одним запросом. В режиме `all_or_nothing` при любом конфликте не
+    создается ни одна бронь; в режиме `partial` создаются все брони без
+    конфликтов.
+
+    Аргументы:
+        bulk_in (ReservationBulkCreate): Брони и режим создания.
+
+    Возвращает:
+        ReservationBulkResult: Результат по каждой брони в порядке запроса:
+        `created`, `conflict` или `skipped` (не создана из-за конфликтов
+        других броней в режиме `all_or_nothing`). Если не создано ни одной
+        брони, ответ возвращается со статусом 409 Conflict.
+
+    Исключения:
+        HTTPException(404): Если хотя бы одна бронь ссылается на несуществующий столик.
+        HTTPException(503): Если запись пачки прерывали параллельные записи
+            во всех попытках; запрос можно повторить.
+    """
+    from app.models.reservation import Reservation
+
+    reservations = [Reservation(**item.model_dump()) for item in bulk_in.items]
+    try:
+        created, conflicts = await service.create_many_if_available(
+            reservations, all_or_nothing=bulk_in.mode == "all_or_nothing"
+        )
+    except TableNotFoundError:
+        raise HTTPException(status_code=404, detail="Table not found")
+    except ConcurrentWriteError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Reservations are being written concurrently, retry later.",
+            headers={"Retry-After": "1"},
+        )
+
+    results = []
+    for index, reservation in enumerate(created):
+        if reservation is not None:
+            item_status = "created"
+        elif index in conflicts:
+            item_status = "conflict"
+        else:
+            item_status = "skipped"
+        results.append(
+            {"index": index, "status": item_status, "reservation": reservation}
+        )
+
+    created_count = sum(reservation is not None for reservation in created)
+    if not created_count:
+        response.status_code = status.HTTP_409_CONFLICT
+    return {"created": created_count, "results": results}
+
+
 @router.delete("/{reservation_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_reservation(
     reservation_id: int,
+    request: Request,
     service: ReservationService = Depends(get_reservation_service),
 ):
     """
     Удалить бронирование по ID.
 
     Удаляет бронирование с указанным ID. Если бронирование не найдено,
-    возвращает ошибку 404 Not Found.
+    возвращает ошибку 404 Not Found. С заголовком If-Match бронь
+    удаляется, только если она не изменилась с момента получения ETag:
+    из двух одновременных отмен одной брони успешна только одна.
 
     Аргументы:
         reservation_id (int): Идентификатор бронирования для удаления.
 
     Исключения:
         HTTPException(404): Если бронирование с указанным ID не существует.
+        HTTPException(412): Если бронирование изменено или удалено (при If-Match).
     """
-    success = await service.delete(reservation_id)
+    success = await service.delete(
+        reservation_id, if_match_versions(request, reservation_id)
+    )
     if not success:
+        if "if-match" in request.headers:
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Reservation has been modified",
+            )
         raise HTTPException(status_code=404, detail="Reservation not found")
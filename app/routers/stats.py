@@ -0,0 +1,96 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.core.responses import FastJSONResponse
+from app.schemas.stats import DailyOccupancyRead, OccupancyReport, UtilisationHeatmap
+from app.services.occupancy_service import OccupancyService
+from app.services.utilisation_heatmap import BUCKET_MINUTES
+from app.dependencies.services import get_occupancy_read_service
+
+router = APIRouter(prefix="/stats", tags=["Stats"])
+
+
+@router.get(
+    "/occupancy", response_model=OccupancyReport, response_class=FastJSONResponse
+)
+async def get_occupancy(
+    start: date = Query(..., alias="from"),
+    end: date = Query(..., alias="to"),
+    table_id: int | None = None,
+    service: OccupancyService = Depends(get_occupancy_read_service),
+):
+    """
+    Получить загрузку столиков по дням и часам.
+
+    Для каждого столика и дня периода, в который у него были брони:
+    число броней, начавшихся в этот день (`reservations`), занятые минуты
+    (`booked_minutes`) и по 24 значения на часы дня — сколько броней
+    занимает столик в этот час и сколько минут часа он занят. Бронь через
+    полночь учитывается в часах обоих дней. Данные читаются из сводки,
+    которая обновляется в транзакции создания и удаления броней, поэтому
+    отчет не перебирает брони; перенесенные в архив брони в нем остаются.
+
+    Аргументы:
+        start (date): Первый день периода (параметр `from`).
+        end (date): Последний день периода включительно (параметр `to`).
+        table_id (int | None): Только загрузка указанного столика.
+
+    Возвращает:
+        OccupancyReport: Строки загрузки в порядке (day, table_id).
+
+    Исключения:
+        HTTPException(400): Если `to` раньше `from` или период длиннее
+            `MAX_OCCUPANCY_DAYS` дней.
+    """
+    try:
+        items = await service.get_daily_rows(
+            start, end, list(DailyOccupancyRead.model_fields), table_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse({"items": items})
+
+
+@router.get(
+    "/heatmap", response_model=UtilisationHeatmap, response_class=FastJSONResponse
+)
+async def get_heatmap(
+    start: date = Query(..., alias="from"),
+    end: date = Query(..., alias="to"),
+    service: OccupancyService = Depends(get_occupancy_read_service),
+):
+    """
+    Получить тепловую карту загрузки столиков по дням недели.
+
+    Для каждого столика, дня недели (с понедельника) и 15-минутного
+    интервала дня — доля времени, которую столик был занят в этот интервал
+    за все такие дни недели периода (от 0 до 1, четыре знака после
+    запятой). Учитываются текущие и архивные брони, в том числе
+    начавшиеся до периода. Дни недели, которых нет в периоде, заполнены
+    нулями; сколько раз каждый день недели встречается в периоде,
+    показывает `weekday_counts`.
+
+    Аргументы:
+        start (date): Первый день периода (параметр `from`).
+        end (date): Последний день периода включительно (параметр `to`).
+
+    Возвращает:
+        UtilisationHeatmap: ID столиков и их загрузка по дням недели и интервалам.
+
+    Исключения:
+        HTTPException(400): Если `to` раньше `from` или период длиннее
+            `MAX_OCCUPANCY_DAYS` дней.
+    """
+    try:
+        table_ids, occupancy, weekday_counts = await service.get_heatmap(start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(
+        {
+            "bucket_minutes": BUCKET_MINUTES,
+            "table_ids": table_ids.tolist(),
+            "weekday_counts": weekday_counts.tolist(),
+            "occupancy": occupancy.round(4).tolist(),
+        }
+    )
@@ -1,24 +1,137 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
 
-from app.schemas.table import TableCreate, TableRead
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+
+from app.core.etag import collection_etag, if_match_versions, make_etag, not_modified
+from app.core.responses import FastJSONResponse
+from app.schemas.page import Page
+from app.schemas.table import TableAvailability, TableCreate, TableRead
 from app.services.table_service import TableService
-from app.dependencies.services import get_table_service
+from app.dependencies.services import get_table_read_service, get_table_service
 
 router = APIRouter(prefix="/tables", tags=["Tables"])
 
+# Ограничение на число слотов в окне поиска доступности.
+MAX_AVAILABILITY_SLOTS = 2000
+
 
-@router.get("/", response_model=list[TableRead])
-async def get_tables(service: TableService = Depends(get_table_service)):
+@router.get("/", response_model=Page[TableRead], response_class=FastJSONResponse)
+async def get_tables(
+    request: Request,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    service: TableService = Depends(get_table_read_service),
+):
     """
-    Получить список всех столиков.
+    Получить страницу столиков.
+
+    Возвращает столики в порядке ID с keyset-пагинацией: для следующей
+    страницы передайте `next_cursor` из ответа в параметр `cursor`.
+    Столбцы `TableRead` выбираются без ORM-объектов и сериализуются
+    в JSON напрямую, без повторной валидации каждой строки.
 
-    Возвращает список всех существующих столиков в системе.
-    Использует сервис `TableService` для выполнения запроса к базе данных.
+    Ответ содержит ETag по версии списка столиков. Если клиент передал
+    его в If-None-Match и список не изменился, возвращается 304 Not Modified
+    без выборки столиков.
+
+    Аргументы:
+        limit (int): Максимальное число столиков на странице.
+        cursor (str | None): Курсор следующей страницы из предыдущего ответа.
 
     Возвращает:
-        list[TableRead]: Список столиков в формате `TableRead`.
+        Page[TableRead]: Страница столиков и курсор следующей страницы.
+
+    Исключения:
+        HTTPException(400): Если курсор поврежден.
     """
-    return await service.get_all()
+    etag = collection_etag("tables", await service.get_collection_version(), request)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    try:
+        items, next_cursor = await service.get_page_rows(
+            limit, list(TableRead.model_fields), cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return FastJSONResponse(
+        {"items": items, "next_cursor": next_cursor}, headers={"ETag": etag}
+    )
+
+
+@router.get("/availability", response_model=list[TableAvailability])
+async def get_tables_availability(
+    start: datetime,
+    end: datetime,
+    party_size: int = Query(1, ge=1),
+    slot_minutes: int = Query(30, gt=0),
+    service: TableService = Depends(get_table_read_service),
+):
+    """
+    Найти свободные слоты по всем столикам.
+
+    Разбивает окно [start, end) на слоты длиной `slot_minutes` и возвращает
+    для каждого столика, вмещающего `party_size` гостей, слоты без
+    пересечений с существующими бронями. Вычисляется одним запросом к БД.
+
+    Аргументы:
+        start (datetime): Начало окна поиска.
+        end (datetime): Окончание окна поиска.
+        party_size (int): Число гостей.
+        slot_minutes (int): Длина слота в минутах.
+
+    Возвращает:
+        list[TableAvailability]: Столики со списками свободных слотов.
+
+    Исключения:
+        HTTPException(422): Если окно пустое или содержит слишком много слотов.
+    """
+    window_minutes = (end - start).total_seconds() / 60
+    if window_minutes < slot_minutes:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Window must fit at least one slot.",
+        )
+    if window_minutes / slot_minutes > MAX_AVAILABILITY_SLOTS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Window must not exceed {MAX_AVAILABILITY_SLOTS} slots.",
+        )
+    return await service.get_availability(start, end, party_size, slot_minutes)
+
+
+@router.get("/{table_id}", response_model=TableRead)
+async def get_table(
+    table_id: int,
+    request: Request,
+    response: Response,
+    service: TableService = Depends(get_table_read_service),
+):
+    """
+    Получить столик по ID.
+
+    Ответ содержит ETag версии столика: его можно передать в If-None-Match
+    для проверки изменений или в If-Match при удалении столика.
+
+    Аргументы:
+        table_id (int): Идентификатор столика.
+
+    Возвращает:
+        TableRead: Столик в формате `TableRead` или 304 Not Modified.
+
+    Исключения:
+        HTTPException(404): Если столик с указанным ID не существует.
+    """
+    table = await service.get_by_id(table_id)
+    if table is None:
+        raise HTTPException(status_code=404, detail="Table not found")
+    etag = make_etag(table.id, table.xmin)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    response.headers["ETag"] = etag
+    return table
 
 
 @router.post("/", response_model=TableRead, status_code=status.HTTP_201_CREATED)
@@ -46,20 +159,28 @@ async def create_table(
 @router.delete("/{table_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_table(
     table_id: int,
+    request: Request,
     service: TableService = Depends(get_table_service),
 ):
     """
     Удалить столик по ID.
 
     Удаляет столик с указанным ID. Если столик не найден,
-    возвращает ошибку 404 Not Found.
+    возвращает ошибку 404 Not Found. С заголовком If-Match столик
+    удаляется, только если он не изменился с момента получения ETag.
 
     Аргументы:
         table_id (int): Идентификатор столика для удаления.
 
     Исключения:
         HTTPException(404): Если столик с указанным ID не существует.
+        HTTPException(412): Если столик изменился или удален (при If-Match).
     """
-    success = await service.delete(table_id)
+    success = await service.delete(table_id, if_match_versions(request, table_id))
     if not success:
+        if "if-match" in request.headers:
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Table has been modified",
+            )
         raise HTTPException(status_code=404, detail="Table not found")
@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+
+
+class PoolStatus(BaseModel):
+    size: int = Field(..., example=5)
+    checked_out: int = Field(..., example=2)
+    idle: int = Field(..., example=3)
+    overflow: int = Field(..., example=0)
+    max_overflow: int = Field(..., example=10)
+    checkouts: int = Field(..., example=1024)
+    timeouts: int = Field(..., example=0)
+    wait_seconds_total: float = Field(..., example=0.042)
+    wait_seconds_max: float = Field(..., example=0.005)
+    connects: int = Field(..., example=7)
+    connect_seconds_total: float = Field(..., example=0.031)
@@ -0,0 +1,11 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel, Field
+
+
+ItemType = TypeVar("ItemType")
+
+
+class Page(BaseModel, Generic[ItemType]):
+    items: list[ItemType]
+    next_cursor: str | None = Field(None, example="WyIyMDI1LTA0LTA3VDE5OjAwOjAwIiwgNDJd")
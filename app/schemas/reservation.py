@@ -1,12 +1,15 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import Literal
+
+from app.models.reservation import MAX_DURATION_MINUTES
 
 
 class ReservationBase(BaseModel):
     customer_name: str = Field(..., example="Иван Иванов")
     table_id: int = Field(..., example=1)
     reservation_time: datetime = Field(..., example="2025-04-07T19:00:00")
-    duration_minutes: int = Field(..., gt=0, example=90)
+    duration_minutes: int = Field(..., gt=0, le=MAX_DURATION_MINUTES, example=90)
 
 
 class ReservationCreate(ReservationBase):
@@ -18,3 +21,32 @@ class ReservationRead(ReservationBase):
 
     class Config:
         from_attributes = True
+
+
+class ReservationAvailability(BaseModel):
+    table_id: int
+    reservation_time: datetime
+    duration_minutes: int
+    available: bool
+
+
+class ReservationArchiveRead(ReservationRead):
+    archived_at: datetime
+
+
+class ReservationBulkCreate(BaseModel):
+    items: list[ReservationCreate] = Field(..., min_length=1, max_length=1000)
+    mode: Literal["all_or_nothing", "partial"] = Field(
+        "all_or_nothing", example="partial"
+    )
+
+
+class ReservationBulkItemResult(BaseModel):
+    index: int
+    status: Literal["created", "conflict", "skipped"]
+    reservation: ReservationRead | None = None
+
+
+class ReservationBulkResult(BaseModel):
+    created: int
+    results: list[ReservationBulkItemResult]
@@ -0,0 +1,25 @@
+from datetime import date
+
+from pydantic import BaseModel, Field
+
+
+class DailyOccupancyRead(BaseModel):
+    day: date = Field(..., example="2025-04-07")
+    table_id: int = Field(..., example=1)
+    reservations: int = Field(..., example=3)
+    booked_minutes: int = Field(..., example=240)
+    hourly_reservations: list[int] = Field(..., min_length=24, max_length=24)
+    hourly_minutes: list[int] = Field(..., min_length=24, max_length=24)
+
+
+class OccupancyReport(BaseModel):
+    items: list[DailyOccupancyRead]
+
+
+class UtilisationHeatmap(BaseModel):
+    bucket_minutes: int = Field(..., example=15)
+    table_ids: list[int] = Field(..., example=[1, 2])
+    # Сколько раз каждый день недели (с понедельника) встречается в периоде.
+    weekday_counts: list[int] = Field(..., min_length=7, max_length=7)
+    # [столик][день недели с понедельника][интервал дня] -> доля занятого времени.
+    occupancy: list[list[list[float]]]
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel, Field
 
 
@@ -16,3 +18,12 @@ class TableRead(TableBase):
 
     class Config:
         from_attributes = True
+
+
+class TimeSlot(BaseModel):
+    start: datetime = Field(..., example="2025-04-07T19:00:00")
+    end: datetime = Field(..., example="2025-04-07T19:30:00")
+
+
+class TableAvailability(TableRead):
+    free_slots: list[TimeSlot]
@@ -0,0 +1,246 @@
+import asyncio
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+
+
+from app.models.reservation import Reservation
+from app.repositories.reservation_repo import ReservationRepository
+
+
+class TableIntervals:
+    """
+    Интервалы занятости одного столика в памяти процесса.
+
+    Интервалы хранятся в отсортированных по началу параллельных массивах.
+    Брони одного столика не пересекаются (это гарантирует EXCLUDE-ограничение
+    в БД), поэтому окончания тоже отсортированы, и проверка свободного слота
+    сводится к одному бинарному поиску.
+
+    Индекс хранит только брони, заканчивающиеся после `horizon`: прошедшие
+    брони отбрасываются при загрузке и при сверке версии (`prune`), поэтому
+    объем индекса не растет вместе с историей бронирований.
+
+    Атрибуты:
+        version (int): Версия бронирований столика в БД, которой соответствует индекс.
+        horizon (datetime): Момент, до которого интервалы в индексе не хранятся.
+        checked_at (float): Момент (time.monotonic) последней сверки версии с БД.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        intervals: list[tuple[int, datetime, datetime]],
+        horizon: datetime = datetime.min,
+    ) -> None:
+        """
+        Инициализирует индекс столика.
+
+        Аргументы:
+            version: Версия бронирований столика в БД.
+            intervals: Кортежи (id, начало, окончание), отсортированные по началу
+                и заканчивающиеся после `horizon`.
+            horizon: Момент, до которого интервалы не хранятся.
+        """
+        self.version = version
+        self.horizon = horizon
+        self.checked_at = time.monotonic()
+        self.ids: list[int] = [interval[0] for interval in intervals]
+        self.starts: list[datetime] = [interval[1] for interval in intervals]
+        self.ends: list[datetime] = [interval[2] for interval in intervals]
+        self.start_by_id: dict[int, datetime] = dict(zip(self.ids, self.starts))
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        """
+        Проверяет, свободен ли столик в интервале [start, end), за O(log n).
+
+        Аргументы:
+            start: Начало интервала.
+            end: Окончание интервала.
+
+        Возвращает:
+            True если интервал не пересекается ни с одной бронью.
+        """
+        position = bisect_left(self.starts, end)
+        return position == 0 or self.ends[position - 1] <= start
+
+    def add(self, reservation_id: int, start: datetime, end: datetime) -> None:
+        """Добавляет интервал брони, сохраняя порядок массивов."""
+        if reservation_id in self.start_by_id or end <= self.horizon:
+            return
+        position = bisect_right(self.starts, start)
+        self.ids.insert(position, reservation_id)
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+        self.start_by_id[reservation_id] = start
+
+    def remove(self, reservation_id: int) -> bool:
+        """
+        Удаляет интервал брони.
+
+        Возвращает:
+            True если бронь была в индексе, иначе False.
+        """
+        start = self.start_by_id.pop(reservation_id, None)
+        if start is None:
+            return False
+        position = bisect_left(self.starts, start)
+        while self.ids[position] != reservation_id:
+            position += 1
+        del self.ids[position], self.starts[position], self.ends[position]
+        return True
+
+    def prune(self, horizon: datetime) -> None:
+        """
+        Отбрасывает интервалы, закончившиеся к `horizon`, и сдвигает горизонт.
+
+        Окончания отсортированы, поэтому закончившиеся брони образуют
+        префикс массивов.
+        """
+        count = bisect_right(self.ends, horizon)
+        for reservation_id in self.ids[:count]:
+            del self.start_by_id[reservation_id]
+        del self.ids[:count], self.starts[:count], self.ends[:count]
+        self.horizon = max(self.horizon, horizon)
+
+
+class AvailabilityIndex:
+    """
+    In-memory индекс доступности столиков, общий для всех запросов воркера.
+
+    Интервалы столика загружаются лениво при первом обращении и далее
+    поддерживаются при создании и удалении броней через ReservationService.
+    Изменения, сделанные другими воркерами, обнаруживаются по версии
+    `tables.reservations_version`, которую увеличивает триггер БД: индекс
+    столика сверяет версию не чаще одного раза в `ttl_seconds` и
+    перезагружается при расхождении.
+
+    Индекс не заменяет проверку в БД: итоговую запись по-прежнему
+    подтверждает EXCLUDE-ограничение, а индекс лишь избавляет от запросов
+    при проверке доступности слотов. Хранятся только текущие и будущие
+    брони; слоты, начинающиеся раньше горизонта индекса столика,
+    проверяются запросом `has_conflict`.
+
+    Атрибуты:
+        ttl_seconds (float): Максимальный возраст сверки версии столика с БД.
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        """
+        Инициализирует пустой индекс.
+
+        Аргументы:
+            ttl_seconds: Максимальный возраст сверки версии столика с БД.
+        """
+        self.ttl_seconds = ttl_seconds
+        self._tables: dict[int, TableIntervals] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+
+    async def is_available(
+        self,
+        repo: ReservationRepository,
+        table_id: int,
+        start_time: datetime,
+        duration: int,
+        max_age: float | None = None,
+    ) -> bool | None:
+        """
+        Проверяет, свободен ли столик в запрашиваемом интервале.
+
+        Аргументы:
+            repo: Репозиторий для загрузки интервалов и сверки версии.
+            table_id: Идентификатор столика.
+            start_time: Время начала бронирования.
+            duration: Длительность бронирования в минутах.
+            max_age: Допустимый возраст сверки версии в секундах
+                (по умолчанию `ttl_seconds`; 0 — сверить с БД немедленно).
+
+        Возвращает:
+            True если интервал свободен, False если он пересекается
+            с существующей бронью, None если столик не найден.
+        """
+        if max_age is None:
+            max_age = self.ttl_seconds
+        intervals = await self._get_fresh(repo, table_id, max_age)
+        if intervals is None:
+            return None
+        if start_time < intervals.horizon:
+            return not await repo.has_conflict(table_id, start_time, duration)
+        return intervals.is_free(start_time, start_time + timedelta(minutes=duration))
+
+    def record_created(self, reservations: list[Reservation]) -> None:
+        """
+        Учитывает брони, созданные этим воркером одним INSERT.
+
+        Вставка увеличила версию каждого затронутого столика в БД ровно
+        на единицу (триггер уровня оператора); если за это время версию
+        изменил кто-то еще, расхождение обнаружится при следующей сверке
+        и индекс столика будет перезагружен.
+        """
+        touched = set()
+        for reservation in reservations:
+            intervals = self._tables.get(reservation.table_id)
+            if intervals is None:
+                continue
+            intervals.add(
+                reservation.id, reservation.reservation_time, reservation.end_time
+            )
+            touched.add(reservation.table_id)
+        for table_id in touched:
+            self._tables[table_id].version += 1
+
+    def record_deleted(self, table_id: int, reservation_id: int) -> None:
+        """
+        Учитывает бронь столика `table_id`, удаленную этим воркером.
+
+        Удаление увеличило версию столика в БД на единицу, даже если бронь
+        уже отброшена из индекса как прошедшая.
+        """
+        intervals = self._tables.get(table_id)
+        if intervals is None:
+            return
+        intervals.remove(reservation_id)
+        intervals.version += 1
+
+    def invalidate(self, table_id: int) -> None:
+        """Сбрасывает индекс столика; он будет перезагружен при следующем обращении."""
+        self._tables.pop(table_id, None)
+
+    def clear(self) -> None:
+        """Сбрасывает индекс всех столиков."""
+        self._tables.clear()
+
+    async def _get_fresh(
+        self, repo: ReservationRepository, table_id: int, max_age: float
+    ) -> TableIntervals | None:
+        intervals = self._tables.get(table_id)
+        if intervals is not None and time.monotonic() - intervals.checked_at < max_age:
+            return intervals
+
+        async with self._locks.setdefault(table_id, asyncio.Lock()):
+            intervals = self._tables.get(table_id)
+            if (
+                intervals is not None
+                and time.monotonic() - intervals.checked_at < max_age
+            ):
+                return intervals
+
+            version = await repo.get_reservations_version(table_id)
+            if version is None:
+                self.invalidate(table_id)
+                return None
+
+            now = datetime.now()
+            if intervals is not None and intervals.version == version:
+                intervals.prune(now)
+                intervals.checked_at = time.monotonic()
+                return intervals
+
+            # Версию читаем до интервалов: если между запросами кто-то
+            # изменит брони, версия индекса окажется устаревшей и он
+            # перезагрузится при следующей сверке.
+            intervals = TableIntervals(
+                version, await repo.get_intervals_by_table(table_id, now), now
+            )
+            self._tables[table_id] = intervals
+            return intervals
@@ -1,4 +1,4 @@
-from typing import Generic, TypeVar
+from typing import Any, Generic, Sequence, TypeVar
 
 
 from app.repositories.base import BaseRepository
@@ -37,6 +37,41 @@ class BaseService(Generic[ModelType]):
         """
         return await self.repository.get_all()
 
+    async def get_page(
+        self, limit: int, cursor: str | None = None
+    ) -> tuple[list[ModelType], str | None]:
+        """Получает страницу экземпляров модели с keyset-пагинацией.
+
+        Аргументы:
+            limit: Максимальное число экземпляров на странице.
+            cursor: Курсор предыдущей страницы или None для первой.
+
+        Возвращает:
+            Кортеж (экземпляры страницы, курсор следующей страницы или None).
+
+        Исключения:
+            ValueError: Если курсор поврежден.
+        """
+        return await self.repository.get_page(limit, cursor)
+
+    async def get_page_rows(
+        self, limit: int, columns: Sequence[str], cursor: str | None = None
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """Получает страницу в виде словарей столбцов, без ORM-объектов.
+
+        Аргументы:
+            limit: Максимальное число записей на странице.
+            columns: Имена выбираемых столбцов.
+            cursor: Курсор предыдущей страницы или None для первой.
+
+        Возвращает:
+            Кортеж (строки страницы, курсор следующей страницы или None).
+
+        Исключения:
+            ValueError: Если курсор поврежден.
+        """
+        return await self.repository.get_page_rows(limit, columns, cursor)
+
     async def get_by_id(self, obj_id: int) -> ModelType | None:
         """Получает один экземпляр модели по его ID.
 
@@ -48,16 +83,17 @@ class BaseService(Generic[ModelType]):
         """
         return await self.repository.get_by_id(obj_id)
 
-    async def delete(self, obj_id: int) -> bool:
+    async def delete(self, obj_id: int, versions: Sequence[int] | None = None) -> bool:
         """Удаляет экземпляр модели по его ID.
 
         Аргументы:
             obj_id: Уникальный идентификатор модели для удаления.
+            versions: Допустимые версии экземпляра (из If-Match) или None.
 
         Возвращает:
-            True если удаление успешно, False если модель не найдена.
+            True если удаление успешно, False если модель (с такой версией) не найдена.
         """
-        return await self.repository.delete(obj_id)
+        return await self.repository.delete(obj_id, versions)
 
     async def create(self, obj: ModelType) -> ModelType:
         """Создает новый экземпляр модели.
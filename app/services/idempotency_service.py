@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+from app.models.idempotency_key import IdempotencyKey
+from app.repositories.idempotency_repo import IdempotencyRepository
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyKeyReusedError(ValueError):
+    """Ключ идемпотентности повторно использован с другим запросом."""
+
+
+class IdempotencyKeyInProgressError(RuntimeError):
+    """Запрос с тем же ключом идемпотентности еще выполняется."""
+
+
+class IdempotencyService:
+    """
+    Сервис ключей идемпотентности изменяющих запросов.
+
+    В отличие от остальных сервисов, работает не с одной сессией запроса,
+    а с фабрикой сессий: каждый шаг (занять ключ, проверить его, сохранить
+    ответ) — отдельная короткая транзакция. Так ключ сразу виден
+    параллельным запросам, а соединение не удерживается на время
+    выполнения самого запроса, которому нужно свое соединение из пула.
+
+    Атрибуты:
+        session_factory (async_sessionmaker[AsyncSession]): Фабрика сессий БД.
+        ttl (timedelta): Срок хранения ключа и ответа.
+        lease (timedelta): Сколько незавершенный запрос удерживает ключ.
+        wait_seconds (float): Сколько повтор ждет завершения первого запроса.
+        poll_seconds (float): Как часто повтор проверяет первый запрос.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        ttl_seconds: float,
+        lease_seconds: float,
+        wait_seconds: float,
+        poll_seconds: float = 0.05,
+    ) -> None:
+        """
+        Инициализирует сервис.
+
+        Аргументы:
+            session_factory: Фабрика сессий основной базы данных.
+            ttl_seconds: Срок хранения ключа и ответа в секундах.
+            lease_seconds: Через сколько секунд ключ незавершенного запроса
+                считается брошенным (воркер упал) и может быть занят заново.
+                Должен превышать время выполнения самого долгого запроса.
+            wait_seconds: Сколько секунд повтор ждет завершения первого запроса.
+            poll_seconds: Интервал проверки первого запроса в секундах.
+        """
+        self.session_factory = session_factory
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.lease = timedelta(seconds=lease_seconds)
+        self.wait_seconds = wait_seconds
+        self.poll_seconds = poll_seconds
+
+    async def begin(self, key: str, route: str, fingerprint: str) -> IdempotencyKey:
+        """
+        Занимает ключ или получает сохраненный ответ.
+
+        Если ключ занят параллельным запросом, ждет его завершения не
+        дольше `wait_seconds`, проверяя ключ каждые `poll_seconds`. Если
+        первый запрос завершился ошибкой и освободил ключ, ключ занимает
+        этот запрос.
+
+        Аргументы:
+            key: Значение заголовка `Idempotency-Key`.
+            route: Метод и путь запроса.
+            fingerprint: Отпечаток запроса.
+
+        Возвращает:
+            Ключ без ответа (`status_code` пуст), если ключ занят этим
+            запросом и его нужно выполнить, — его передают в `complete`
+            или `release`; иначе завершенный ключ с сохраненным ответом.
+
+        Исключения:
+            IdempotencyKeyReusedError: Ключ уже использован с другим запросом.
+            IdempotencyKeyInProgressError: Первый запрос не завершился
+                за `wait_seconds`.
+        """
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            async with self.session_factory() as session:
+                repo = IdempotencyRepository(session)
+                claim = await repo.claim(key, route, fingerprint, self.ttl, self.lease)
+                if claim is not None:
+                    return claim
+                record = await repo.get(key, route)
+
+            if record is not None:
+                if record.fingerprint != fingerprint:
+                    raise IdempotencyKeyReusedError(key)
+                if record.status_code is not None:
+                    return record
+            if time.monotonic() >= deadline:
+                raise IdempotencyKeyInProgressError(key)
+            await asyncio.sleep(self.poll_seconds)
+
+    async def complete(
+        self,
+        claim: IdempotencyKey,
+        status_code: int,
+        content_type: str | None,
+        body: bytes,
+    ) -> bool:
+        """
+        Сохраняет ответ запроса, занявшего ключ.
+
+        Если запрос выполнялся дольше `lease` и ключ успел занять другой
+        запрос, ответ не сохраняется: ключ принадлежит новому владельцу.
+
+        Аргументы:
+            claim: Ключ, занятый этим запросом (результат `begin`).
+            status_code: HTTP-статус ответа.
+            content_type: Заголовок `Content-Type` ответа.
+            body: Тело ответа.
+
+        Возвращает:
+            True, если ответ сохранен; False, если ключ потерян.
+        """
+        async with self.session_factory() as session:
+            completed = await IdempotencyRepository(session).complete(
+                claim.key,
+                claim.route,
+                claim.created_at,
+                status_code,
+                content_type,
+                body,
+            )
+        if not completed:
+            logger.warning(
+                "idempotency key %r for %s was re-claimed before the response was stored",
+                claim.key,
+                claim.route,
+            )
+        return completed
+
+    async def release(self, claim: IdempotencyKey) -> None:
+        """
+        Освобождает ключ запроса, завершившегося ошибкой сервера.
+
+        Аргументы:
+            claim: Ключ, занятый этим запросом (результат `begin`).
+        """
+        async with self.session_factory() as session:
+            await IdempotencyRepository(session).release(
+                claim.key, claim.route, claim.created_at
+            )
+
+    async def sweep(self) -> int:
+        """
+        Удаляет устаревшие ключи.
+
+        Возвращает:
+            Число удаленных ключей.
+        """
+        async with self.session_factory() as session:
+            return await IdempotencyRepository(session).sweep(self.ttl)
+
+    async def sweep_forever(self, interval_seconds: float) -> None:
+        """
+        Периодически удаляет устаревшие ключи (фоновая задача приложения).
+
+        Ошибки очистки пишутся в лог и не останавливают задачу.
+
+        Аргументы:
+            interval_seconds: Интервал между очистками в секундах.
+        """
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                swept = await self.sweep()
+            except Exception:
+                logger.exception("idempotency keys sweep failed")
+            else:
+                if swept:
+                    logger.info("swept %d expired idempotency keys", swept)
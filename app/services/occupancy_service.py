@@ -0,0 +1,110 @@
+from datetime import date, datetime, timedelta
+from typing import Sequence
+
+import numpy as np
+
+
+from app.repositories.occupancy_repo import OccupancyRepository
+from app.services.utilisation_heatmap import utilisation_heatmap, weekday_counts
+
+# Наибольшая длина периода отчета о загрузке в днях.
+MAX_OCCUPANCY_DAYS = 366
+
+
+class OccupancyService:
+    """
+    Сервис отчетов о загрузке столиков.
+
+    Читает сводку `table_daily_occupancy`, которую триггеры ведут вместе
+    с бронями, строит тепловую карту загрузки по дням недели и
+    ограничивает длину запрашиваемого периода.
+
+    Атрибуты:
+        occupancy_repo (OccupancyRepository): Репозиторий сводки загрузки.
+    """
+
+    def __init__(self, occupancy_repo: OccupancyRepository) -> None:
+        """
+        Инициализирует сервис отчетов о загрузке.
+
+        Аргументы:
+            occupancy_repo: Репозиторий сводки загрузки.
+        """
+        self.occupancy_repo = occupancy_repo
+
+    async def get_daily_rows(
+        self,
+        start: date,
+        end: date,
+        columns: Sequence[str],
+        table_id: int | None = None,
+    ) -> list[dict]:
+        """
+        Получает загрузку столиков по дням с `start` по `end` включительно.
+
+        Дни, в которые у столика не было броней, в результат не входят.
+
+        Аргументы:
+            start: Первый день периода.
+            end: Последний день периода.
+            columns: Имена выбираемых столбцов.
+            table_id: Только загрузка указанного столика.
+
+        Возвращает:
+            Строки сводки в порядке (day, table_id).
+
+        Исключения:
+            ValueError: Если `end` раньше `start` или период длиннее
+                `MAX_OCCUPANCY_DAYS` дней.
+        """
+        check_period(start, end)
+        return await self.occupancy_repo.get_daily_rows(start, end, columns, table_id)
+
+    async def get_heatmap(
+        self, start: date, end: date
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Строит тепловую карту загрузки столиков за дни с `start` по `end` включительно.
+
+        Брони периода (текущие и архивные) загружаются одним запросом
+        в массивы NumPy и раскладываются по 15-минутным интервалам дней
+        недели без перебора броней в Python (см. `utilisation_heatmap`).
+
+        Аргументы:
+            start: Первый день периода.
+            end: Последний день периода.
+
+        Возвращает:
+            Кортеж (ID столиков по возрастанию, доли занятого времени формы
+            (столики, 7, 96), число каждого дня недели в периоде).
+
+        Исключения:
+            ValueError: Если `end` раньше `start` или период длиннее
+                `MAX_OCCUPANCY_DAYS` дней.
+        """
+        check_period(start, end)
+        days = (end - start).days + 1
+        period_start = datetime.combine(start, datetime.min.time())
+        table_ids, reservation_table_ids, starts, durations = (
+            await self.occupancy_repo.get_reservation_columns(
+                period_start, period_start + timedelta(days=days)
+            )
+        )
+        occupancy = utilisation_heatmap(
+            table_ids, reservation_table_ids, starts, durations, start, days
+        )
+        return table_ids, occupancy, weekday_counts(start, days)
+
+
+def check_period(start: date, end: date) -> None:
+    """
+    Проверяет период отчета.
+
+    Исключения:
+        ValueError: Если `end` раньше `start` или период длиннее
+            `MAX_OCCUPANCY_DAYS` дней.
+    """
+    if end < start:
+        raise ValueError("'to' must not be earlier than 'from'")
+    if (end - start).days >= MAX_OCCUPANCY_DAYS:
+        raise ValueError(f"period must not exceed {MAX_OCCUPANCY_DAYS} days")
@@ -0,0 +1,54 @@
+import asyncio
+import logging
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+from app.repositories.reservation_repo import ReservationRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def create_reservation_partitions(
+    session_factory: async_sessionmaker[AsyncSession], months_ahead: int
+) -> list[str]:
+    """
+    Создает партиции броней текущего месяца и `months_ahead` следующих.
+
+    Аргументы:
+        session_factory: Фабрика сессий основной базы данных.
+        months_ahead: Сколько месяцев после текущего должно иметь партиции.
+
+    Возвращает:
+        Имена партиций этих месяцев (в том числе уже существовавших).
+    """
+    async with session_factory() as session:
+        return await ReservationRepository(session).create_partitions(
+            datetime.now(), months_ahead + 1
+        )
+
+
+async def maintain_reservation_partitions(
+    session_factory: async_sessionmaker[AsyncSession],
+    months_ahead: int,
+    interval_seconds: float,
+) -> None:
+    """
+    Периодически создает партиции броней на `months_ahead` месяцев вперед
+    (фоновая задача приложения).
+
+    Новые брони ближайших месяцев попадают в свои партиции, а не в
+    партицию по умолчанию. Ошибки пишутся в лог и не останавливают задачу.
+
+    Аргументы:
+        session_factory: Фабрика сессий основной базы данных.
+        months_ahead: Сколько месяцев после текущего должно иметь партиции.
+        interval_seconds: Интервал между проверками в секундах.
+    """
+    while True:
+        try:
+            await create_reservation_partitions(session_factory, months_ahead)
+        except Exception:
+            logger.exception("reservation partitions maintenance failed")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy.exc import DBAPIError
+
+
+from app.models.reservation_archive import ReservationArchive
+from app.repositories.reservation_archive_repo import ReservationArchiveRepository
+from app.services.base import BaseService
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE истечения lock_timeout.
+LOCK_NOT_AVAILABLE = "55P03"
+
+# Сколько пакетов подряд может не дождаться блокировок, прежде чем
+# перенос прервется ошибкой.
+ARCHIVE_LOCK_ATTEMPTS = 10
+
+
+class ReservationArchiveService(BaseService[ReservationArchive]):
+    """
+    Сервис архива прошедших бронирований.
+
+    Переносит старые брони из `reservations` в `reservations_archive`
+    ограниченными пакетами и читает архив.
+
+    Атрибуты:
+        archive_repo (ReservationArchiveRepository): Репозиторий архива.
+    """
+
+    def __init__(self, archive_repo: ReservationArchiveRepository) -> None:
+        """
+        Инициализирует сервис архива.
+
+        Аргументы:
+            archive_repo: Репозиторий архива.
+        """
+        super().__init__(archive_repo)
+        self.archive_repo = archive_repo
+
+    async def get_filtered_page_rows(
+        self,
+        limit: int,
+        columns: Sequence[str],
+        cursor: str | None = None,
+        table_id: int | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        customer_name: str | None = None,
+    ) -> tuple[list[dict], str | None]:
+        """
+        Получает страницу архивных броней в хронологическом порядке с фильтрами.
+
+        Аргументы:
+            limit: Максимальное число броней на странице.
+            columns: Имена выбираемых столбцов.
+            cursor: Курсор предыдущей страницы или None для первой.
+            table_id: Только брони указанного столика.
+            start: Только брони, начинающиеся не раньше start.
+            end: Только брони, начинающиеся раньше end.
+            customer_name: Только брони на указанное имя.
+
+        Возвращает:
+            Кортеж (строки страницы, курсор следующей страницы или None).
+
+        Исключения:
+            ValueError: Если курсор поврежден.
+        """
+        return await self.archive_repo.get_filtered_page_rows(
+            limit, columns, cursor, table_id, start, end, customer_name
+        )
+
+    async def archive(
+        self,
+        before: datetime,
+        batch_size: int,
+        pause_seconds: float,
+        lock_timeout_seconds: float,
+        max_batches: int | None = None,
+    ) -> int:
+        """
+        Переносит в архив все брони, начавшиеся до `before`.
+
+        Брони переносятся пакетами по `batch_size` от самых старых, каждый
+        пакет — отдельная транзакция. Между пакетами перенос делает паузу
+        `pause_seconds`, чтобы не занимать БД и столики подряд: пока пакет
+        не зафиксирован, бронирования его столиков ждут. Пакет, не
+        дождавшийся блокировок за `lock_timeout_seconds`, откатывается
+        и повторяется после паузы.
+
+        Аргументы:
+            before: Переносятся брони, начавшиеся раньше этого момента.
+            batch_size: Максимальное число броней в пакете.
+            pause_seconds: Пауза между пакетами в секундах.
+            lock_timeout_seconds: Сколько пакет ждет блокировки.
+            max_batches: Максимальное число пакетов (в том числе
+                неудавшихся) или None без ограничения.
+
+        Возвращает:
+            Число перенесенных броней.
+
+        Исключения:
+            sqlalchemy.exc.DBAPIError: Если `ARCHIVE_LOCK_ATTEMPTS` пакетов
+                подряд не дождались блокировок, и при прочих ошибках БД.
+
+        Пример:
+            >>> archived = await service.archive(
+            ...     datetime(2025, 1, 1), batch_size=1000,
+            ...     pause_seconds=0.1, lock_timeout_seconds=0.5,
+            ... )
+        """
+        archived = 0
+        batches = 0
+        failed_attempts = 0
+        while max_batches is None or batches < max_batches:
+            if batches:
+                await asyncio.sleep(pause_seconds)
+            batches += 1
+            try:
+                moved = await self.archive_repo.archive_batch(
+                    before, batch_size, lock_timeout_seconds
+                )
+            except DBAPIError as e:
+                await self.archive_repo.rollback()
+                failed_attempts += 1
+                if (
+                    getattr(e.orig, "sqlstate", None) != LOCK_NOT_AVAILABLE
+                    or failed_attempts >= ARCHIVE_LOCK_ATTEMPTS
+                ):
+                    raise
+                logger.warning("archive batch timed out waiting for locks, retrying")
+                continue
+
+            failed_attempts = 0
+            archived += moved
+            logger.info("archived %d reservations (%d total)", moved, archived)
+            if moved < batch_size:
+                break
+        return archived
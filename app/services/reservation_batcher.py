@@ -0,0 +1,184 @@
+import asyncio
+import logging
+from typing import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+from app.core.metrics import RESERVATION_BATCH_SIZE, RESERVATION_CONFLICTS
+from app.models.reservation import Reservation
+from app.services.reservation_service import (
+    ConcurrentWriteError,
+    ReservationService,
+    TableNotFoundError,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ReservationWriteBatcher:
+    """
+    Групповое создание броней (group commit) для пиков `POST /reservations/`.
+
+    Запросы на бронь встают в очередь воркера. Фоновая задача собирает из
+    нее пачку: все, что уже ждет в очереди, и все, что придет за
+    `max_delay_seconds` после первого запроса, но не больше
+    `max_batch_size` броней. Пачка создается
+    `ReservationService.create_many_if_available` в режиме `partial`:
+    одна проверка конфликтов для всей пачки, один INSERT и одна фиксация
+    вместо транзакции на каждый запрос. Каждый запрос получает свой
+    результат: созданную бронь или None при конфликте.
+
+    Пока пачка создается, следующие запросы копятся в очереди, поэтому
+    под нагрузкой пачки растут сами даже при `max_delay_seconds=0`, а
+    одиночный запрос ждет не дольше `max_delay_seconds` и создается
+    обычным INSERT. Из пересекающихся броней одной пачки создается
+    пришедшая раньше. Если вставку пачки во всех попытках прервали
+    параллельные записи, брони пачки создаются по одной, как без очереди.
+
+    Атрибуты:
+        session_factory (async_sessionmaker[AsyncSession]): Фабрика сессий БД.
+        service_factory (Callable[[AsyncSession], ReservationService]): Создает
+            сервис бронирований для сессии пачки.
+        max_batch_size (int): Максимальное число броней в пачке.
+        max_delay_seconds (float): Сколько первый запрос пачки ждет следующих.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        service_factory: Callable[[AsyncSession], ReservationService],
+        max_batch_size: int,
+        max_delay_seconds: float,
+    ) -> None:
+        """
+        Инициализирует очередь. Фоновая задача запускается первым запросом.
+
+        Аргументы:
+            session_factory: Фабрика сессий основной базы данных.
+            service_factory: Создает сервис бронирований для сессии пачки.
+            max_batch_size: Максимальное число броней в пачке.
+            max_delay_seconds: Сколько секунд первый запрос пачки ждет следующих.
+        """
+        self.session_factory = session_factory
+        self.service_factory = service_factory
+        self.max_batch_size = max_batch_size
+        self.max_delay_seconds = max_delay_seconds
+        self._queue: asyncio.Queue[tuple[Reservation, asyncio.Future]] | None = None
+        self._task: asyncio.Task | None = None
+
+    async def submit(self, reservation: Reservation) -> Reservation | None:
+        """
+        Ставит бронь в очередь и ждет результата ее пачки.
+
+        Аргументы:
+            reservation: Объект бронирования для создания.
+
+        Возвращает:
+            Созданное бронирование или None, если слот занят (существующей
+            бронью или пришедшей раньше бронью той же пачки).
+
+        Исключения:
+            TableNotFoundError: Если столик не существует.
+            sqlalchemy.exc.DBAPIError: При прочих ошибках БД при создании пачки.
+        """
+        if self._task is None or self._task.done():
+            # Очередь создается в цикле событий, в котором работает задача.
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((reservation, future))
+        return await future
+
+    async def close(self) -> None:
+        """Дожидается создания уже принятых броней и останавливает фоновую задачу."""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay_seconds
+            while len(batch) < self.max_batch_size:
+                # Накопившиеся, пока создавалась прошлая пачка, берутся сразу.
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except TimeoutError:
+                    break
+            try:
+                await self._create(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _create(self, batch: list[tuple[Reservation, asyncio.Future]]) -> None:
+        # Запросы, отмененные клиентом, пока ждали в очереди, не создаются.
+        batch = [(reservation, future) for reservation, future in batch if not future.done()]
+        if not batch:
+            return
+        RESERVATION_BATCH_SIZE.observe(len(batch))
+        reservations = [reservation for reservation, _ in batch]
+
+        try:
+            try:
+                if len(reservations) == 1:
+                    # Одиночной брони хватает INSERT с проверкой ограничением.
+                    results = [await self._create_one(reservations[0])]
+                else:
+                    results = await self._create_many(reservations)
+            except (TableNotFoundError, ConcurrentWriteError):
+                # Бронь на несуществующий столик не должна отклонять
+                # остальные, а сбой из-за параллельных записей — выдаваться
+                # за конфликт: пачка создается по одной брони.
+                results = [await self._create_one(r) for r in reservations]
+        except Exception as e:
+            logger.exception("reservation batch of %d failed", len(batch))
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _create_many(
+        self, reservations: list[Reservation]
+    ) -> list[Reservation | None]:
+        async with self.session_factory() as session:
+            results, conflicts = await self.service_factory(
+                session
+            ).create_many_if_available(reservations, all_or_nothing=False)
+        RESERVATION_CONFLICTS.inc("batch", amount=len(conflicts))
+        return results
+
+    async def _create_one(
+        self, reservation: Reservation
+    ) -> Reservation | None | TableNotFoundError:
+        # Своя сессия на каждую бронь: откат после ошибки одной брони не
+        # должен сбрасывать загруженные атрибуты уже созданных.
+        async with self.session_factory() as session:
+            try:
+                return await self.service_factory(
+                    session
+                ).create_reservation_if_available(reservation)
+            except TableNotFoundError as e:
+                return e
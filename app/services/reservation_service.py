@@ -1,6 +1,94 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy.exc import DBAPIError
+
+
+from app.core.metrics import RESERVATION_CONFLICTS
 from app.models.reservation import Reservation
 from app.repositories.reservation_repo import ReservationRepository
+from app.services.availability_index import AvailabilityIndex, TableIntervals
 from app.services.base import BaseService
+from app.services.table_service import TableService
+
+
+# SQLSTATE нарушения EXCLUDE-ограничения партиции броней; с ним же
+# триггер reservations_partition_overlap сообщает о пересечении через
+# границу месяца.
+EXCLUSION_VIOLATION = "23P01"
+
+# SQLSTATE нарушения внешнего ключа (несуществующий table_id).
+FOREIGN_KEY_VIOLATION = "23503"
+
+# SQLSTATE взаимной блокировки. Брони одного столика пишутся по очереди
+# (ReservationRepository блокирует строку столика до записи), но
+# конфликтующие записи в обход репозитория все еще могут ждать друг друга;
+# PostgreSQL тогда прерывает одну из них с этой ошибкой вместо нарушения
+# ограничения.
+DEADLOCK_DETECTED = "40P01"
+
+# Столбцы выгрузки бронирований (порядок совпадает со stream_rows).
+EXPORT_COLUMNS = (
+    "id",
+    "customer_name",
+    "table_id",
+    "reservation_time",
+    "duration_minutes",
+)
+
+# Сколько раз пачка броней перепроверяется, если ее вставку опередил
+# параллельный запрос на тот же слот.
+BULK_CREATE_ATTEMPTS = 3
+
+
+def find_batch_overlaps(
+    intervals: list[tuple[int, datetime, datetime]], skip: set[int] = frozenset()
+) -> set[int]:
+    """
+    Находит пересечения внутри набора интервалов в порядке их позиций.
+
+    Интервалы просматриваются по порядку: интервал принимается, если он
+    не пересекается с уже принятыми интервалами своего столика, иначе
+    считается пересечением. Поэтому из пересекающихся интервалов остается
+    стоящий раньше в наборе, а не начинающийся раньше. Принятые интервалы
+    столика хранятся в TableIntervals, и каждая проверка — бинарный поиск.
+
+    Аргументы:
+        intervals: Кортежи (table_id, начало, окончание).
+        skip: Позиции интервалов, которые не участвуют в проверке.
+
+    Возвращает:
+        Позиции интервалов, пересекающихся с интервалами того же столика
+        на более ранних позициях.
+    """
+    accepted: dict[int, TableIntervals] = {}
+    overlaps = set()
+    for i, (table_id, start, end) in enumerate(intervals):
+        if i in skip:
+            continue
+        table = accepted.get(table_id)
+        if table is None:
+            table = accepted[table_id] = TableIntervals(0, [])
+        if table.is_free(start, end):
+            table.add(i, start, end)
+        else:
+            overlaps.add(i)
+    return overlaps
+
+
+class TableNotFoundError(LookupError):
+    """Бронь ссылается на несуществующий столик."""
+
+    def __init__(self, table_id: int | None = None) -> None:
+        super().__init__(table_id)
+        self.table_id = table_id
+
+
+class ConcurrentWriteError(RuntimeError):
+    """Все попытки записать пачку броней прервали параллельные записи (не конфликт слота)."""
 
 
 class ReservationService(BaseService[Reservation]):
@@ -13,17 +101,187 @@ class ReservationService(BaseService[Reservation]):
     Атрибуты:
         reservation_repo (ReservationRepository): Репозиторий для работы
             с бронированиями в базе данных.
+        availability_index (AvailabilityIndex | None): Необязательный
+            in-memory индекс доступности столиков.
+        table_service (TableService | None): Необязательный сервис столиков
+            для проверки table_id до обращения к бронированиям.
     """
 
-    def __init__(self, reservation_repo: ReservationRepository) -> None:
+    def __init__(
+        self,
+        reservation_repo: ReservationRepository,
+        availability_index: AvailabilityIndex | None = None,
+        table_service: TableService | None = None,
+    ) -> None:
         """
         Инициализирует сервис бронирований.
 
         Аргументы:
             reservation_repo: Репозиторий для работы с бронированиями.
+            availability_index: In-memory индекс доступности; если не задан,
+                проверки доступности выполняются запросами к БД.
+            table_service: Сервис столиков (обычно с кэшем), по которому
+                проверяется table_id новых броней; если не задан,
+                несуществующий столик обнаруживает внешний ключ в БД.
         """
         super().__init__(reservation_repo)
         self.reservation_repo = reservation_repo
+        self.availability_index = availability_index
+        self.table_service = table_service
+
+    async def get_filtered_page(
+        self,
+        limit: int,
+        cursor: str | None = None,
+        table_id: int | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        customer_name: str | None = None,
+    ) -> tuple[list[Reservation], str | None]:
+        """
+        Получает страницу бронирований в хронологическом порядке с фильтрами.
+
+        Аргументы:
+            limit: Максимальное число бронирований на странице.
+            cursor: Курсор предыдущей страницы или None для первой.
+            table_id: Только брони указанного столика.
+            start: Только брони, начинающиеся не раньше start.
+            end: Только брони, начинающиеся раньше end.
+            customer_name: Только брони на указанное имя.
+
+        Возвращает:
+            Кортеж (бронирования страницы, курсор следующей страницы или None).
+
+        Исключения:
+            ValueError: Если курсор поврежден.
+        """
+        return await self.reservation_repo.get_filtered_page(
+            limit, cursor, table_id, start, end, customer_name
+        )
+
+    async def get_filtered_page_rows(
+        self,
+        limit: int,
+        columns: Sequence[str],
+        cursor: str | None = None,
+        table_id: int | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        customer_name: str | None = None,
+    ) -> tuple[list[dict], str | None]:
+        """
+        То же, что `get_filtered_page`, но возвращает словари столбцов
+        без создания ORM-объектов.
+
+        Аргументы:
+            limit: Максимальное число бронирований на странице.
+            columns: Имена выбираемых столбцов.
+            cursor: Курсор предыдущей страницы или None для первой.
+            table_id: Только брони указанного столика.
+            start: Только брони, начинающиеся не раньше start.
+            end: Только брони, начинающиеся раньше end.
+            customer_name: Только брони на указанное имя.
+
+        Возвращает:
+            Кортеж (строки страницы, курсор следующей страницы или None).
+
+        Исключения:
+            ValueError: Если курсор поврежден.
+        """
+        return await self.reservation_repo.get_filtered_page_rows(
+            limit, columns, cursor, table_id, start, end, customer_name
+        )
+
+    async def get_collection_version(self) -> str:
+        """
+        Получает версию набора всех бронирований для ETag.
+
+        Возвращает:
+            Строка, меняющаяся при каждом изменении бронирований.
+        """
+        return await self.reservation_repo.get_collection_version()
+
+    async def export(self, fmt: str, batch_size: int) -> AsyncIterator[bytes]:
+        """
+        Выгружает все бронирования в формате NDJSON или CSV.
+
+        Строки читаются из БД серверным курсором, и каждая порция
+        из batch_size строк кодируется в отдельный фрагмент ответа, так что
+        память не зависит от числа бронирований, а первый фрагмент готов
+        сразу после первой порции.
+
+        Аргументы:
+            fmt: Формат выгрузки: "ndjson" или "csv".
+            batch_size: Число строк во фрагменте.
+
+        Возвращает:
+            Асинхронный итератор байтовых фрагментов.
+        """
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+            yield buffer.getvalue().encode()
+
+        async for rows in self.reservation_repo.stream_rows(batch_size):
+            if fmt == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows(
+                    (id_, name, table_id, time.isoformat(), duration)
+                    for id_, name, table_id, time, duration in rows
+                )
+                yield buffer.getvalue().encode()
+            else:
+                yield "".join(
+                    json.dumps(
+                        dict(zip(EXPORT_COLUMNS, row)),
+                        default=datetime.isoformat,
+                        ensure_ascii=False,
+                    )
+                    + "\n"
+                    for row in rows
+                ).encode()
+
+    async def is_slot_available(
+        self, table_id: int, start_time: datetime, duration: int
+    ) -> bool:
+        """
+        Проверяет, свободен ли столик в указанный интервал.
+
+        При включенном индексе доступности ответ дается из памяти
+        (версия столика сверяется с БД не чаще раза в ttl_seconds),
+        иначе выполняется запрос `has_conflict`. Существование столика
+        проверяется по кэшу столиков или индексу, а без них — запросом
+        версии столика.
+
+        Аргументы:
+            table_id: Идентификатор столика.
+            start_time: Время начала бронирования.
+            duration: Длительность бронирования в минутах.
+
+        Возвращает:
+            True если столик свободен, иначе False.
+
+        Исключения:
+            TableNotFoundError: Если столик не существует.
+        """
+        await self._check_tables_exist([table_id])
+        if self.availability_index is not None:
+            available = await self.availability_index.is_available(
+                self.reservation_repo, table_id, start_time, duration
+            )
+            if available is None:
+                raise TableNotFoundError(table_id)
+            return available
+        if (
+            self.table_service is None
+            and await self.reservation_repo.get_reservations_version(table_id) is None
+        ):
+            raise TableNotFoundError(table_id)
+        return not await self.reservation_repo.has_conflict(
+            table_id=table_id, start_time=start_time, duration=duration
+        )
 
     async def create_reservation_if_available(
         self, reservation: Reservation
@@ -31,8 +289,18 @@ class ReservationService(BaseService[Reservation]):
         """
         Создает новое бронирование, если нет конфликтов по времени.
 
-        Проверяет наличие существующих броней на указанный стол
-        в запрашиваемый временной интервал перед созданием.
+        Непересечение броней одного столика гарантируется самой БД
+        (EXCLUDE-ограничения месячных партиций и триггер
+        `reservations_partition_overlap` на границах месяцев), поэтому отдельная
+        проверка перед вставкой не выполняется: бронь создается одним INSERT,
+        а нарушение ограничения трактуется как конфликт. Это исключает гонку
+        между параллельными запросами на один и тот же слот. Взаимная
+        блокировка при вставке также означает, что параллельно вставлялась
+        пересекающаяся бронь, и трактуется как конфликт.
+
+        При включенном индексе доступности заведомо занятый слот отклоняется
+        без попытки вставки; перед отказом версия столика сверяется с БД,
+        чтобы не отказать из-за устаревшего индекса.
 
         Аргументы:
             reservation: Объект бронирования для создания.
@@ -41,19 +309,151 @@ class ReservationService(BaseService[Reservation]):
             Созданное бронирование если нет конфликтов,
             None если есть пересечение с существующими бронями.
 
+        Исключения:
+            TableNotFoundError: Если столик не существует.
+            sqlalchemy.exc.DBAPIError: При нарушении других ограничений и
+                прочих ошибках БД.
+
         Пример:
             >>> reservation = Reservation(...)
             >>> created = await service.create_reservation_if_available(reservation)
             >>> if created:
             ...     print("Бронь создана")
         """
-        has_conflict = await self.reservation_repo.has_conflict(
-            table_id=reservation.table_id,
-            start_time=reservation.reservation_time,
-            duration=reservation.duration_minutes,
-        )
+        await self._check_tables_exist([reservation.table_id])
 
-        if has_conflict:
-            return None
+        index = self.availability_index
+        if index is not None:
+            args = (
+                self.reservation_repo,
+                reservation.table_id,
+                reservation.reservation_time,
+                reservation.duration_minutes,
+            )
+            # None (столик не найден) не отказ: такую бронь отклонит БД.
+            if (
+                await index.is_available(*args) is False
+                and await index.is_available(*args, max_age=0) is False
+            ):
+                RESERVATION_CONFLICTS.inc("index")
+                return None
+
+        try:
+            created = await self.reservation_repo.create(reservation)
+        except DBAPIError as e:
+            await self.reservation_repo.rollback()
+            sqlstate = getattr(e.orig, "sqlstate", None)
+            if sqlstate in (EXCLUSION_VIOLATION, DEADLOCK_DETECTED):
+                if index is not None:
+                    index.invalidate(reservation.table_id)
+                RESERVATION_CONFLICTS.inc("constraint")
+                return None
+            if sqlstate == FOREIGN_KEY_VIOLATION:
+                raise TableNotFoundError(reservation.table_id) from e
+            raise
+
+        if index is not None:
+            index.record_created([created])
+        return created
+
+    async def create_many_if_available(
+        self, reservations: list[Reservation], all_or_nothing: bool = True
+    ) -> tuple[list[Reservation | None], set[int]]:
+        """
+        Создает пачку бронирований с проверкой конфликтов для всей пачки сразу.
+
+        Пересечения с существующими бронями проверяются одним запросом,
+        пересечения внутри пачки — проходом по броням в порядке `reservations`
+        (из пересекающихся броней одного столика остается стоящая раньше).
+        Принятые брони вставляются одним многострочным INSERT ... RETURNING.
+        Если между проверкой и вставкой слот занял параллельный запрос
+        (нарушение EXCLUDE-ограничения или взаимная блокировка при
+        вставке), проверка повторяется; если все BULK_CREATE_ATTEMPTS
+        попыток прерваны, брони не отклоняются как конфликтные, а
+        выбрасывается ConcurrentWriteError.
+
+        Аргументы:
+            reservations: Брони для создания.
+            all_or_nothing: Если True, при любом конфликте не создается
+                ни одна бронь; иначе создаются все брони без конфликтов.
+
+        Возвращает:
+            Кортеж (результаты в порядке `reservations`: созданная бронь или
+            None; множество позиций броней, отклоненных из-за конфликтов).
+
+        Исключения:
+            TableNotFoundError: Если хотя бы одна бронь ссылается на
+                несуществующий столик.
+            ConcurrentWriteError: Если вставку прервали параллельные записи
+                во всех попытках.
+        """
+        await self._check_tables_exist({r.table_id for r in reservations})
+
+        intervals = [
+            (r.table_id, r.reservation_time, r.end_time) for r in reservations
+        ]
+        results: list[Reservation | None] = [None] * len(reservations)
+
+        for _ in range(BULK_CREATE_ATTEMPTS):
+            conflicts = await self.reservation_repo.find_conflicting(intervals)
+            conflicts |= find_batch_overlaps(intervals, skip=conflicts)
+            accepted = [i for i in range(len(reservations)) if i not in conflicts]
+            if not accepted or (conflicts and all_or_nothing):
+                return results, conflicts
+
+            try:
+                created = await self.reservation_repo.create_many(
+                    [
+                        {
+                            "customer_name": reservations[i].customer_name,
+                            "table_id": reservations[i].table_id,
+                            "reservation_time": reservations[i].reservation_time,
+                            "duration_minutes": reservations[i].duration_minutes,
+                        }
+                        for i in accepted
+                    ]
+                )
+            except DBAPIError as e:
+                await self.reservation_repo.rollback()
+                sqlstate = getattr(e.orig, "sqlstate", None)
+                if sqlstate == FOREIGN_KEY_VIOLATION:
+                    raise TableNotFoundError() from e
+                if sqlstate not in (EXCLUSION_VIOLATION, DEADLOCK_DETECTED):
+                    raise
+                if self.availability_index is not None:
+                    for i in accepted:
+                        self.availability_index.invalidate(reservations[i].table_id)
+                continue
+
+            for i, reservation in zip(accepted, created):
+                results[i] = reservation
+            if self.availability_index is not None:
+                self.availability_index.record_created(created)
+            return results, conflicts
+
+        raise ConcurrentWriteError()
+
+    async def delete(self, obj_id: int, versions: Sequence[int] | None = None) -> bool:
+        """Удаляет бронирование по ID и обновляет индекс доступности.
+
+        Аргументы:
+            obj_id: Идентификатор бронирования.
+            versions: Допустимые версии бронирования (из If-Match) или None.
+
+        Возвращает:
+            True если удаление успешно, False если бронирование (с такой
+            версией) не найдено.
+        """
+        table_id = await self.reservation_repo.delete_returning_table(obj_id, versions)
+        if table_id is None:
+            return False
+        if self.availability_index is not None:
+            self.availability_index.record_deleted(table_id, obj_id)
+        return True
 
-        return await self.reservation_repo.create(reservation)
+    async def _check_tables_exist(self, table_ids) -> None:
+        if self.table_service is None:
+            return
+        for table_id in table_ids:
+            if not await self.table_service.table_exists(table_id):
+                raise TableNotFoundError(table_id)
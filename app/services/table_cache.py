@@ -0,0 +1,137 @@
+import time
+from typing import Any
+
+
+from app.core.cache import MISSING, CacheBackend
+from app.models.table import Table
+from app.repositories.table_repo import TableRepository
+
+
+# Столбцы столика, которые хранятся в кэше.
+CACHED_COLUMNS = ("id", "name", "seats", "location")
+
+ALL_TABLES_KEY = "tables"
+
+
+class TableCache:
+    """
+    Read-through кэш столиков, общий для всех запросов воркера.
+
+    Хранит отдельные столики по ID и полный список столиков в двух
+    подключаемых хранилищах `CacheBackend`. Список хранится отдельно, чтобы
+    записи отдельных столиков не вытесняли его из LRU при числе столиков,
+    сравнимом с размером кэша. Отсутствие столика не кэшируется: столик,
+    только что созданный другим воркером, виден сразу.
+
+    Запись через TableService сбрасывает кэш сразу; изменения, сделанные
+    другими воркерами, обнаруживаются по поколению `tables` в
+    `cache_generations`, которое увеличивает триггер БД: поколение
+    сверяется не чаще раза в `check_seconds`, и при расхождении кэш
+    сбрасывается.
+
+    Атрибуты:
+        backend (CacheBackend): Хранилище столиков по ID.
+        check_seconds (float): Как часто сверять поколение с БД.
+        list_backend (CacheBackend): Хранилище полного списка столиков.
+        generation (int | None): Поколение, которому соответствует кэш.
+    """
+
+    def __init__(
+        self, backend: CacheBackend, check_seconds: float, list_backend: CacheBackend
+    ) -> None:
+        """
+        Инициализирует пустой кэш.
+
+        Аргументы:
+            backend: Хранилище столиков по ID.
+            check_seconds: Как часто сверять поколение с БД, в секундах.
+            list_backend: Хранилище полного списка столиков (одна запись).
+        """
+        self.backend = backend
+        self.check_seconds = check_seconds
+        self.list_backend = list_backend
+        self.generation: int | None = None
+        self._checked_at = float("-inf")
+        # Растет при каждом сбросе: значение, загруженное до сброса,
+        # не попадает в кэш после него.
+        self._epoch = 0
+
+    async def get_tables(self, repo: TableRepository) -> list[dict[str, Any]]:
+        """
+        Возвращает все столики, упорядоченные по ID.
+
+        Аргументы:
+            repo: Репозиторий для загрузки столиков и сверки поколения.
+
+        Возвращает:
+            Список словарей со столбцами `CACHED_COLUMNS`. Словари общие
+            для всех запросов и не должны изменяться.
+        """
+        await self.sync(repo)
+        rows = self.list_backend.get(ALL_TABLES_KEY)
+        if rows is MISSING:
+            epoch = self._epoch
+            rows = await repo.get_rows(CACHED_COLUMNS)
+            if epoch == self._epoch:
+                self.list_backend.set(ALL_TABLES_KEY, rows)
+                for row in rows:
+                    self.backend.set(("table", row["id"]), row)
+        return rows
+
+    async def get_table(
+        self, repo: TableRepository, table_id: int
+    ) -> dict[str, Any] | None:
+        """
+        Возвращает столик по ID.
+
+        Аргументы:
+            repo: Репозиторий для загрузки столика и сверки поколения.
+            table_id: Идентификатор столика.
+
+        Возвращает:
+            Словарь со столбцами `CACHED_COLUMNS` или None, если столика нет.
+        """
+        await self.sync(repo)
+        key = ("table", table_id)
+        row = self.backend.get(key)
+        if row is MISSING:
+            epoch = self._epoch
+            rows = await repo.get_rows(CACHED_COLUMNS, [Table.id == table_id])
+            if not rows:
+                return None
+            row = rows[0]
+            if epoch == self._epoch:
+                self.backend.set(key, row)
+        return row
+
+    def invalidate(self) -> None:
+        """
+        Сбрасывает кэш после изменения столиков.
+
+        Следующее обращение сверит поколение с БД, чтобы версия кэша
+        (и ETag списка столиков) отразила изменение.
+        """
+        self._epoch += 1
+        self._checked_at = float("-inf")
+        self.backend.clear()
+        self.list_backend.clear()
+
+    async def sync(self, repo: TableRepository) -> int:
+        """
+        Сверяет поколение кэша с БД, если с последней сверки прошло
+        `check_seconds`, и сбрасывает кэш при расхождении.
+
+        Аргументы:
+            repo: Репозиторий для чтения поколения.
+
+        Возвращает:
+            Поколение, которому соответствует кэш.
+        """
+        if time.monotonic() - self._checked_at < self.check_seconds:
+            return self.generation
+        generation = await repo.get_generation()
+        if generation != self.generation:
+            self.invalidate()
+            self.generation = generation
+        self._checked_at = time.monotonic()
+        return generation
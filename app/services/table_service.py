@@ -1,6 +1,13 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from operator import itemgetter
+from typing import Any, Sequence
+
+
 from app.models.table import Table
 from app.repositories.table_repo import TableRepository
 from app.services.base import BaseService
+from app.services.table_cache import TableCache
 
 
 class TableService(BaseService[Table]):
@@ -13,14 +20,153 @@ class TableService(BaseService[Table]):
     Атрибуты:
         table_repo (TableRepository): Репозиторий для работы
             со столиками в базе данных.
+        cache (TableCache | None): Необязательный кэш столиков.
     """
 
-    def __init__(self, table_repo: TableRepository) -> None:
+    def __init__(
+        self, table_repo: TableRepository, cache: TableCache | None = None
+    ) -> None:
         """
         Инициализирует сервис для работы со столиками.
 
         Аргументы:
             table_repo: Репозиторий для операций с данными столиков.
+            cache: Кэш столиков; если не задан, каждый запрос идет в БД.
         """
         super().__init__(table_repo)
         self.table_repo = table_repo
+        self.cache = cache
+
+    async def get_page_rows(
+        self, limit: int, columns: Sequence[str], cursor: str | None = None
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """
+        Получает страницу столиков в виде словарей столбцов.
+
+        При включенном кэше страница вырезается из закэшированного списка
+        столиков с тем же порядком и курсорами, что и при запросе к БД.
+
+        Аргументы:
+            limit: Максимальное число столиков на странице.
+            columns: Имена выбираемых столбцов.
+            cursor: Курсор предыдущей страницы или None для первой.
+
+        Возвращает:
+            Кортеж (строки страницы, курсор следующей страницы или None).
+
+        Исключения:
+            ValueError: Если курсор поврежден.
+        """
+        if self.cache is None:
+            return await super().get_page_rows(limit, columns, cursor)
+
+        rows = await self.cache.get_tables(self.table_repo)
+        start = 0
+        if cursor is not None:
+            (last_id,) = self.table_repo.decode_cursor(cursor)
+            start = bisect_right(rows, last_id, key=itemgetter("id"))
+        page = [
+            {name: row[name] for name in columns}
+            for row in rows[start : start + limit + 1]
+        ]
+        if len(page) <= limit:
+            return page, None
+        page = page[:limit]
+        return page, self.table_repo.encode_cursor(page[-1])
+
+    async def get_collection_version(self) -> str:
+        """Получает версию списка столиков для ETag.
+
+        При включенном кэше версией служит поколение, которому соответствует
+        кэш, — без запроса к БД, пока не пришло время сверки.
+
+        Возвращает:
+            Строка, меняющаяся при каждом изменении списка столиков.
+        """
+        if self.cache is not None:
+            return str(await self.cache.sync(self.table_repo))
+        return await self.table_repo.get_collection_version()
+
+    async def table_exists(self, table_id: int) -> bool:
+        """
+        Проверяет, существует ли столик, — по кэшу, если он включен.
+
+        Аргументы:
+            table_id: Идентификатор столика.
+
+        Возвращает:
+            True если столик существует, иначе False.
+        """
+        if self.cache is not None:
+            return await self.cache.get_table(self.table_repo, table_id) is not None
+        return await self.get_by_id(table_id) is not None
+
+    async def create(self, obj: Table) -> Table:
+        """Создает столик и сбрасывает кэш столиков.
+
+        Аргументы:
+            obj: Столик для создания.
+
+        Возвращает:
+            Созданный столик.
+        """
+        created = await super().create(obj)
+        if self.cache is not None:
+            self.cache.invalidate()
+        return created
+
+    async def delete(self, obj_id: int, versions: Sequence[int] | None = None) -> bool:
+        """Удаляет столик по ID и сбрасывает кэш столиков.
+
+        Аргументы:
+            obj_id: Идентификатор столика.
+            versions: Допустимые версии столика (из If-Match) или None.
+
+        Возвращает:
+            True если удаление успешно, False если столик (с такой версией) не найден.
+        """
+        deleted = await super().delete(obj_id, versions)
+        if deleted and self.cache is not None:
+            self.cache.invalidate()
+        return deleted
+
+    async def get_availability(
+        self,
+        start: datetime,
+        end: datetime,
+        party_size: int,
+        slot_minutes: int,
+    ) -> list[dict]:
+        """
+        Получает свободные слоты по всем столикам с достаточным числом мест.
+
+        Аргументы:
+            start: Начало окна поиска.
+            end: Окончание окна поиска.
+            party_size: Число гостей.
+            slot_minutes: Длина слота в минутах.
+
+        Возвращает:
+            Список столиков (в формате `TableAvailability`) хотя бы с одним
+            свободным слотом. Полностью занятые столики не возвращаются.
+        """
+        slot_length = timedelta(minutes=slot_minutes)
+        rows = await self.table_repo.get_free_slots(
+            start, end, party_size, slot_minutes
+        )
+
+        availability: dict[int, dict] = {}
+        for table_id, name, seats, location, slot_start in rows:
+            table = availability.get(table_id)
+            if table is None:
+                table = availability[table_id] = {
+                    "id": table_id,
+                    "name": name,
+                    "seats": seats,
+                    "location": location,
+                    "free_slots": [],
+                }
+            table["free_slots"].append(
+                {"start": slot_start, "end": slot_start + slot_length}
+            )
+        return list(availability.values())
@@ -0,0 +1,105 @@
+from datetime import date
+
+import numpy as np
+
+
+# Загрузка считается по 15-минутным интервалам дня для каждого дня недели.
+BUCKET_MINUTES = 15
+BUCKETS_PER_DAY = 24 * 60 // BUCKET_MINUTES
+BUCKETS_PER_WEEK = 7 * BUCKETS_PER_DAY
+
+
+def weekday_counts(first_day: date, days: int) -> np.ndarray:
+    """
+    Считает, сколько раз каждый день недели встречается в периоде.
+
+    Аргументы:
+        first_day: Первый день периода.
+        days: Число дней периода.
+
+    Возвращает:
+        Массив из 7 чисел, начиная с понедельника.
+    """
+    return np.bincount((first_day.weekday() + np.arange(days)) % 7, minlength=7)
+
+
+def utilisation_heatmap(
+    table_ids: np.ndarray,
+    reservation_table_ids: np.ndarray,
+    start_minutes: np.ndarray,
+    durations: np.ndarray,
+    first_day: date,
+    days: int,
+) -> np.ndarray:
+    """
+    Строит тепловую карту загрузки столиков по дням недели и 15-минутным интервалам.
+
+    Время периода нумеруется корзинами по `BUCKET_MINUTES` минут, и корзина
+    сразу переводится в корзину недели (день недели × интервал), так что
+    память не зависит от длины периода. Бронь дает:
+
+    - неполные минуты первой и последней своей корзины — одним
+      `np.bincount` с весами;
+    - полные корзины между ними — разностным массивом (+1 в начале
+      диапазона, -1 после конца), который `np.cumsum` превращает в число
+      броней, занимающих корзину целиком. Бронь не длиннее суток, поэтому
+      диапазон может лишь один раз перейти через конец недели; такой
+      диапазон получает еще +1 в начале недели.
+
+    Аргументы:
+        table_ids: Отсортированные уникальные ID столиков — строки карты.
+            Должен содержать все `reservation_table_ids`.
+        reservation_table_ids: ID столиков броней.
+        start_minutes: Начала броней в минутах от полуночи `first_day`;
+            брони, начавшиеся до периода, имеют отрицательное начало.
+        durations: Длительности броней в минутах.
+        first_day: Первый день периода.
+        days: Число дней периода.
+
+    Возвращает:
+        Массив формы (столики, 7, `BUCKETS_PER_DAY`): доля занятого времени
+        от 0 до 1, дни недели начиная с понедельника. Дни недели, которых
+        нет в периоде, заполнены нулями.
+    """
+    period_minutes = days * 24 * 60
+    starts = np.clip(start_minutes, 0, period_minutes)
+    ends = np.clip(start_minutes + durations, 0, period_minutes)
+    inside = ends > starts
+    starts, ends = starts[inside], ends[inside]
+    rows = np.searchsorted(table_ids, reservation_table_ids[inside]) * BUCKETS_PER_WEEK
+
+    first = starts // BUCKET_MINUTES
+    last = ends // BUCKET_MINUTES
+    shift = first_day.weekday() * BUCKETS_PER_DAY
+    size = len(table_ids) * BUCKETS_PER_WEEK
+
+    def week_index(bucket: np.ndarray, row: np.ndarray) -> np.ndarray:
+        return row + (bucket + shift) % BUCKETS_PER_WEEK
+
+    # Неполные корзины: начало брони (или вся бронь в одной корзине) и ее хвост.
+    spans = last > first
+    head = np.where(spans, (first + 1) * BUCKET_MINUTES, ends) - starts
+    tail = ends[spans] - last[spans] * BUCKET_MINUTES
+    minutes = np.bincount(
+        np.concatenate([week_index(first, rows), week_index(last[spans], rows[spans])]),
+        weights=np.concatenate([head, tail]),
+        minlength=size,
+    )
+
+    # Полные корзины first + 1 ... last - 1 броней, занимающих больше одной корзины.
+    full_rows = rows[spans]
+    opens = week_index(first[spans] + 1, full_rows)
+    closes = week_index(last[spans], full_rows)
+    wraps = (closes < opens) & (last[spans] - first[spans] > 1)
+    diff = (
+        np.bincount(np.concatenate([opens, full_rows[wraps]]), minlength=size)
+        - np.bincount(closes, minlength=size)
+    ).reshape(len(table_ids), BUCKETS_PER_WEEK)
+    minutes = minutes.reshape(len(table_ids), BUCKETS_PER_WEEK)
+    minutes += np.cumsum(diff, axis=1) * BUCKET_MINUTES
+
+    capacity = weekday_counts(first_day, days).repeat(BUCKETS_PER_DAY) * BUCKET_MINUTES
+    occupancy = np.divide(
+        minutes, capacity, out=np.zeros(minutes.shape), where=capacity > 0
+    )
+    return occupancy.reshape(len(table_ids), 7, BUCKETS_PER_DAY)
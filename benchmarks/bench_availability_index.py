@@ -0,0 +1,76 @@
+"""
+Бенчмарк in-memory индекса доступности против `has_conflict`.
+
+Для каждого объема истории столика сравнивает задержку проверки слота
+запросом к БД (`ReservationRepository.has_conflict`) и через
+`AvailabilityIndex.is_available` (после прогрева индекса).
+
+Запуск:
+    python -m benchmarks.bench_availability_index
+"""
+
+import asyncio
+import statistics
+import time
+from datetime import timedelta
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import db_settings
+from app.core.database import Base
+from app.models.table import Table
+from app.repositories.reservation_repo import ReservationRepository
+from app.services.availability_index import AvailabilityIndex
+from benchmarks.bench_has_conflict import BOOKING_TIME, seed
+
+
+SIZES = (1_000, 10_000, 100_000)
+ITERATIONS = 1_000
+
+
+async def measure(check) -> tuple[float, float]:
+    timings = []
+    for i in range(ITERATIONS):
+        start = BOOKING_TIME - timedelta(minutes=15 * (i % 400))
+        started = time.perf_counter()
+        await check(start)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95)]
+
+
+async def main() -> None:
+    engine = create_async_engine(db_settings.test_database_url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with session_factory() as session:
+        table = Table(name="bench", seats=4)
+        session.add(table)
+        await session.commit()
+        repo = ReservationRepository(session)
+
+        print(f"{'history':>10} {'path':>12} {'p50, ms':>10} {'p95, ms':>10}")
+        for size in SIZES:
+            await seed(session, table.id, size)
+            index = AvailabilityIndex(ttl_seconds=60)
+            await index.is_available(repo, table.id, BOOKING_TIME, 90)
+
+            paths = {
+                "has_conflict": lambda start: repo.has_conflict(table.id, start, 90),
+                "index": lambda start: index.is_available(repo, table.id, start, 90),
+            }
+            for name, check in paths.items():
+                p50, p95 = await measure(check)
+                print(f"{size:>10} {name:>12} {p50:>10.4f} {p95:>10.4f}")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
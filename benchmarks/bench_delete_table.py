@@ -0,0 +1,84 @@
+"""
+Бенчмарк удаления столика с большой историей бронирований.
+
+Для каждого объема истории удаляет столик двумя путями — через
+`TableRepository.delete` (DELETE ... RETURNING) и через ORM
+(`session.delete`) — и сообщает число SQL-запросов, время и пик памяти
+Python (tracemalloc). Брони удаляются каскадом в БД, поэтому число
+запросов и память не зависят от числа броней. Работает с тестовой БД
+и пересоздает в ней схему.
+
+Запуск:
+    python -m benchmarks.bench_delete_table
+"""
+
+import asyncio
+import time
+import tracemalloc
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import db_settings
+from app.core.database import Base
+from app.models.table import Table
+from app.repositories.table_repo import TableRepository
+from benchmarks.bench_has_conflict import seed
+
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+async def repository_delete(session, table_id: int) -> None:
+    await TableRepository(session).delete(table_id)
+
+
+async def orm_delete(session, table_id: int) -> None:
+    await session.delete(await session.get(Table, table_id))
+    await session.commit()
+
+
+async def main() -> None:
+    engine = create_async_engine(db_settings.test_database_url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    statements = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    print(f"{'history':>10} {'path':>11} {'statements':>11} {'time, s':>8} {'py peak, MB':>12}")
+    for size in SIZES:
+        for name, delete in (("repository", repository_delete), ("orm", orm_delete)):
+            async with session_factory() as session:
+                table = Table(name=f"bench {name} {size}", seats=4)
+                session.add(table)
+                await session.commit()
+                await seed(session, table.id, size)
+
+            async with session_factory() as session:
+                statements.clear()
+                tracemalloc.start()
+                started = time.perf_counter()
+                await delete(session, table.id)
+                elapsed = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(
+                    f"{size:>10} {name:>11} {len(statements):>11} "
+                    f"{elapsed:>8.2f} {peak / 2**20:>12.2f}"
+                )
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""
+Бенчмарк потоковой выгрузки бронирований.
+
+Для растущего числа бронирований замеряет время до первого фрагмента,
+общее время выгрузки GET /reservations/export и прирост пикового RSS
+процесса. Приложение вызывается напрямую как ASGI-приложение, а фрагменты
+ответа только подсчитываются (httpx.ASGITransport буферизует тело целиком
+и исказил бы замеры). Работает с тестовой БД и пересоздает в ней схему.
+
+Запуск:
+    python -m benchmarks.bench_export
+"""
+
+import asyncio
+import resource
+import time
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import db_settings
+from app.core.database import Base, get_read_sessionmaker
+from app.main import app
+from app.models.table import Table
+from benchmarks.bench_has_conflict import seed
+
+
+SIZES = (10_000, 100_000, 1_000_000)
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def export(fmt: str) -> tuple[float, float, int]:
+    """Выполняет выгрузку; возвращает (до первого фрагмента, всего, байт)."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/reservations/export",
+        "raw_path": b"/reservations/export",
+        "query_string": f"format={fmt}".encode(),
+        "headers": [],
+        "client": ("bench", 0),
+        "server": ("bench", 80),
+    }
+    started = time.perf_counter()
+    first_chunk = None
+    size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal first_chunk, size
+        if message["type"] == "http.response.body" and message.get("body"):
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - started
+            size += len(message["body"])
+
+    await app(scope, receive, send)
+    return first_chunk, time.perf_counter() - started, size
+
+
+async def main() -> None:
+    engine = create_async_engine(db_settings.test_database_url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    app.dependency_overrides[get_read_sessionmaker] = lambda: session_factory
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with session_factory() as session:
+        table = Table(name="bench", seats=4)
+        session.add(table)
+        await session.commit()
+        table_id = table.id
+
+    print(f"{'rows':>10} {'format':>7} {'first, ms':>10} {'total, s':>9} {'+rss, MB':>9}")
+    for size in SIZES:
+        async with session_factory() as session:
+            await seed(session, table_id, size)
+
+        for fmt in ("ndjson", "csv"):
+            rss_before = peak_rss_mb()
+            first_chunk, total, _ = await export(fmt)
+            print(
+                f"{size:>10} {fmt:>7} {first_chunk * 1000:>10.1f} "
+                f"{total:>9.2f} {peak_rss_mb() - rss_before:>9.1f}"
+            )
+
+    app.dependency_overrides.clear()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+"""
+Бенчмарк проверки конфликтов бронирования.
+
+Замеряет задержку `ReservationRepository.has_conflict` при росте истории
+бронирований одного столика. Работает с тестовой базой данных
+(`db_settings.test_database_url`) и пересоздает в ней схему.
+
+Запуск:
+    python -m benchmarks.bench_has_conflict
+"""
+
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import db_settings
+from app.core.database import Base
+from app.models.table import Table
+from app.repositories.reservation_repo import ReservationRepository
+
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+ITERATIONS = 200
+BOOKING_TIME = datetime(2030, 1, 1, 19, 0)
+
+
+async def seed(session: AsyncSession, table_id: int, size: int) -> None:
+    """Заполняет историю столика `size` непересекающимися бронями до BOOKING_TIME."""
+    await session.execute(
+        text("DELETE FROM reservations WHERE table_id = :table_id"),
+        {"table_id": table_id},
+    )
+    await session.execute(
+        text(
+            """
+            INSERT INTO reservations (customer_name, table_id, reservation_time, duration_minutes)
+            SELECT 'guest ' || n, :table_id, CAST(:until AS timestamp) - n * interval '2 hours', 60
+            FROM generate_series(1, :size) AS n
+            """
+        ),
+        {"table_id": table_id, "until": BOOKING_TIME, "size": size},
+    )
+    await session.commit()
+    await session.execute(text("ANALYZE reservations"))
+
+
+async def measure(repo: ReservationRepository, table_id: int) -> list[float]:
+    timings = []
+    for i in range(ITERATIONS):
+        start = BOOKING_TIME + timedelta(minutes=15 * (i % 8))
+        started = time.perf_counter()
+        await repo.has_conflict(table_id=table_id, start_time=start, duration=90)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def main() -> None:
+    engine = create_async_engine(db_settings.test_database_url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with session_factory() as session:
+        table = Table(name="bench", seats=4)
+        session.add(table)
+        await session.commit()
+
+        repo = ReservationRepository(session)
+        print(f"{'history':>10} {'p50, ms':>10} {'p95, ms':>10}")
+        for size in SIZES:
+            await seed(session, table.id, size)
+            timings = sorted(await measure(repo, table.id))
+            p50 = statistics.median(timings)
+            p95 = timings[int(len(timings) * 0.95)]
+            print(f"{size:>10} {p50:>10.3f} {p95:>10.3f}")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
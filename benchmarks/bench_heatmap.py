@@ -0,0 +1,120 @@
+"""
+Бенчмарк тепловой карты загрузки столиков.
+
+Заполняет историю броней (по умолчанию год для 200 столиков, бронь в
+каждом двухчасовом слоте — около 876 тысяч броней) и для квартала и
+всего года замеряет этапы `GET /stats/heatmap`:
+
+- `load` — загрузку броней в массивы NumPy одним запросом
+  (`OccupancyRepository.get_reservation_columns`);
+- `compute` — раскладку броней по интервалам (`utilisation_heatmap`);
+- `render` — сериализацию ответа в JSON;
+- `total` — весь запрос через ASGI-приложение.
+
+Печатаются медианы по `--repeat` повторам. Работает с тестовой БД
+(`db_settings.test_database_url`) и пересоздает в ней схему.
+
+Запуск:
+    python -m benchmarks.bench_heatmap
+    python -m benchmarks.bench_heatmap --tables 50 --days 91
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import db_settings
+from app.core.database import create_engine, get_read_db
+from app.core.responses import FastJSONResponse
+from app.main import app
+from app.repositories.occupancy_repo import OccupancyRepository
+from app.services.utilisation_heatmap import utilisation_heatmap
+from benchmarks.datagen import (
+    HISTORY_START,
+    create_tables,
+    drop_schema,
+    reset_schema,
+    resize_reservations,
+)
+
+
+SLOTS_PER_DAY = 12
+
+
+async def measure(
+    session_factory: async_sessionmaker[AsyncSession], days: int, repeat: int
+) -> dict[str, float]:
+    """Замеряет этапы тепловой карты за `days` дней от начала истории, мс."""
+    start = HISTORY_START.date()
+    period_start = datetime.combine(start, datetime.min.time())
+    params = {"from": start.isoformat(), "to": (start + timedelta(days=days - 1)).isoformat()}
+    timings = {"load": [], "compute": [], "render": [], "total": []}
+
+    async def override_get_read_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(repeat):
+            async with session_factory() as session:
+                started = time.perf_counter()
+                columns = await OccupancyRepository(session).get_reservation_columns(
+                    period_start, period_start + timedelta(days=days)
+                )
+                loaded = time.perf_counter()
+                occupancy = utilisation_heatmap(*columns, start, days)
+                computed = time.perf_counter()
+                FastJSONResponse(
+                    {"table_ids": columns[0].tolist(), "occupancy": occupancy.round(4).tolist()}
+                )
+                rendered = time.perf_counter()
+            timings["load"].append(loaded - started)
+            timings["compute"].append(computed - loaded)
+            timings["render"].append(rendered - computed)
+
+            started = time.perf_counter()
+            response = await client.get("/stats/heatmap", params=params)
+            timings["total"].append(time.perf_counter() - started)
+            assert response.status_code == 200, response.text
+    app.dependency_overrides.clear()
+    return {stage: statistics.median(values) * 1000 for stage, values in timings.items()}
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_engine(db_settings.test_database_url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    await reset_schema(engine)
+    async with session_factory() as session:
+        table_ids = await create_tables(session, args.tables)
+        size = len(table_ids) * args.days * SLOTS_PER_DAY
+        seconds = await resize_reservations(session, table_ids, size)
+    print(f"{size} reservations for {args.tables} tables loaded in {seconds:.1f} s")
+
+    print(f"{'period':>8} {'load, ms':>9} {'compute, ms':>12} {'render, ms':>11} {'total, ms':>10}")
+    for label, days in (("quarter", 91), ("year", args.days)):
+        result = await measure(session_factory, days, args.repeat)
+        print(
+            f"{label:>8} {result['load']:>9.1f} {result['compute']:>12.1f} "
+            f"{result['render']:>11.1f} {result['total']:>10.1f}"
+        )
+
+    await drop_schema(engine)
+    await engine.dispose()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the utilisation heatmap.")
+    parser.add_argument("--tables", type=int, default=200, help="число столиков")
+    parser.add_argument("--days", type=int, default=365, help="длина истории в днях")
+    parser.add_argument("--repeat", type=int, default=5, help="число повторов замера")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,96 @@
+"""
+Микро-бенчмарк сериализации списка бронирований.
+
+Сравнивает два пути выдачи страницы из 10 000 бронирований:
+
+- orm: ORM-объекты → валидация `Page[ReservationRead]` (from_attributes) →
+  JSON через `JSONResponse` — так ответ формировался через response_model;
+- rows: Core-строки выбранных столбцов → `FastJSONResponse` (pydantic-core).
+
+Сообщает число «запросов» в секунду (выборка + сериализация) и пик
+выделенной памяти Python (tracemalloc) на одну страницу. Работает
+с тестовой БД и пересоздает в ней схему.
+
+Запуск:
+    python -m benchmarks.bench_list_serialization
+"""
+
+import asyncio
+import time
+import tracemalloc
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import db_settings
+from app.core.database import Base
+from app.core.responses import FastJSONResponse
+from app.models.table import Table
+from app.repositories.reservation_repo import ReservationRepository
+from app.schemas.page import Page
+from app.schemas.reservation import ReservationRead
+from benchmarks.bench_has_conflict import seed
+
+
+ROWS = 10_000
+ITERATIONS = 20
+
+page_adapter = TypeAdapter(Page[ReservationRead])
+
+
+async def orm_path(repo: ReservationRepository) -> bytes:
+    items, next_cursor = await repo.get_filtered_page(ROWS)
+    page = page_adapter.validate_python(
+        {"items": items, "next_cursor": next_cursor}, from_attributes=True
+    )
+    return JSONResponse(page_adapter.dump_python(page, mode="json")).body
+
+
+async def rows_path(repo: ReservationRepository) -> bytes:
+    items, next_cursor = await repo.get_filtered_page_rows(
+        ROWS, list(ReservationRead.model_fields)
+    )
+    return FastJSONResponse({"items": items, "next_cursor": next_cursor}).body
+
+
+async def main() -> None:
+    engine = create_async_engine(db_settings.test_database_url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with session_factory() as session:
+        table = Table(name="bench", seats=4)
+        session.add(table)
+        await session.commit()
+        await seed(session, table.id, ROWS)
+
+    print(f"{'path':>5} {'req/s':>8} {'ms/req':>8} {'peak alloc, MB':>15}")
+    for name, path in (("orm", orm_path), ("rows", rows_path)):
+        async with session_factory() as session:
+            await path(ReservationRepository(session))
+
+        started = time.perf_counter()
+        for _ in range(ITERATIONS):
+            async with session_factory() as session:
+                await path(ReservationRepository(session))
+        elapsed = (time.perf_counter() - started) / ITERATIONS
+
+        async with session_factory() as session:
+            tracemalloc.start()
+            await path(ReservationRepository(session))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        print(f"{name:>5} {1 / elapsed:>8.1f} {elapsed * 1000:>8.1f} {peak / 2**20:>15.2f}")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
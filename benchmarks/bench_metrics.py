@@ -0,0 +1,134 @@
+"""
+Бенчмарк накладных расходов сбора метрик.
+
+Сравнивает время обработки GET /tables/ и GET /reservations/ приложением
+с `MetricsMiddleware` и учетом SQL-запросов (`instrument_engine`) и без
+них. Замеры чередуются раундами, чтобы фоновый шум одинаково влиял на оба
+варианта; сообщается медиана времени на запрос и относительный прирост.
+Приложение вызывается напрямую как ASGI-приложение. Работает с тестовой
+БД и пересоздает в ней схему.
+
+Запуск:
+    python -m benchmarks.bench_metrics
+"""
+
+import asyncio
+import statistics
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import db_settings
+from app.core.database import Base, create_engine, get_db, get_read_sessionmaker
+from app.core.metrics import instrument_engine, uninstrument_engine
+from app.core.middleware import MetricsMiddleware
+from app.main import app
+from app.models.table import Table
+from benchmarks.bench_has_conflict import seed
+
+
+TABLES = 50
+RESERVATIONS = 1_000
+REQUESTS = 300
+ROUNDS = 7
+PATHS = ("/tables/", "/reservations/")
+
+
+async def call(asgi_app, path: str) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [],
+        "client": ("bench", 0),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+
+    await asgi_app(scope, receive, send)
+
+
+def build_stack(with_metrics: bool):
+    """Собирает стек middleware приложения с метриками или без них."""
+    middleware = app.user_middleware
+    if not with_metrics:
+        app.user_middleware = [m for m in middleware if m.cls is not MetricsMiddleware]
+    try:
+        return app.build_middleware_stack()
+    finally:
+        app.user_middleware = middleware
+
+
+async def measure(asgi_app, engine, with_metrics: bool, path: str) -> float:
+    if with_metrics:
+        instrument_engine(engine)
+    else:
+        uninstrument_engine(engine)
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        await call(asgi_app, path)
+    return (time.perf_counter() - started) / REQUESTS
+
+
+async def main() -> None:
+    engine = create_engine(db_settings.test_database_url)
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_sessionmaker] = lambda: session_factory
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with session_factory() as session:
+        tables = [Table(name=f"bench {i}", seats=4) for i in range(TABLES)]
+        session.add_all(tables)
+        await session.commit()
+        await seed(session, tables[0].id, RESERVATIONS)
+
+    stacks = {False: build_stack(False), True: build_stack(True)}
+
+    print(f"{'path':>15} {'plain, ms':>10} {'metrics, ms':>12} {'overhead':>9}")
+    for path in PATHS:
+        for with_metrics, stack in stacks.items():
+            await measure(stack, engine, with_metrics, path)
+
+        timings = {False: [], True: []}
+        for _ in range(ROUNDS):
+            for with_metrics, stack in stacks.items():
+                timings[with_metrics].append(
+                    await measure(stack, engine, with_metrics, path)
+                )
+        plain = statistics.median(timings[False])
+        metered = statistics.median(timings[True])
+        print(
+            f"{path:>15} {plain * 1000:>10.3f} {metered * 1000:>12.3f} "
+            f"{(metered / plain - 1) * 100:>8.1f}%"
+        )
+
+    app.dependency_overrides.clear()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
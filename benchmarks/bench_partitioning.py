@@ -0,0 +1,180 @@
+"""
+Бенчмарк секционирования броней по месяцам.
+
+Загружает одинаковую историю броней (по умолчанию 10^7) в таблицу,
+секционированную по месяцам, как в приложении, и в одну таблицу без
+партиций, и для каждой замеряет:
+
+- `book` — создание брони через
+  `ReservationService.create_reservation_if_available` (INSERT с
+  проверкой EXCLUDE-ограничения и триггерами);
+- `has_conflict` — проверку конфликта перед бронированием;
+- `free_slots` — свободные слоты всех столиков на вечер
+  (`TableRepository.get_free_slots`).
+
+Брони ставятся в свободные промежутки последнего месяца истории, после
+замера удаляются. Кроме задержек печатаются время загрузки и размер
+таблицы броней с индексами. Работает с тестовой БД
+(`db_settings.test_database_url`) и пересоздает в ней схему.
+
+Запуск:
+    python -m benchmarks.bench_partitioning
+    python -m benchmarks.bench_partitioning --rows 1000000 --output partitioning.json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import db_settings
+from app.core.database import create_engine
+from app.models.reservation import Reservation
+from app.repositories.reservation_repo import ReservationRepository
+from app.repositories.table_repo import TableRepository
+from app.services.reservation_service import ReservationService
+from benchmarks.datagen import (
+    SLOT,
+    create_tables,
+    drop_schema,
+    reset_schema,
+    resize_reservations,
+    slot_time,
+)
+
+
+LAYOUTS = {"partitioned": True, "plain": False}
+# Брони истории длятся не дольше 105 минут двухчасового слота,
+# поэтому последние 15 минут слота всегда свободны.
+BOOKING_OFFSET = timedelta(minutes=105)
+BOOKING_MINUTES = 15
+
+
+def percentiles(timings: list[float]) -> dict:
+    timings = sorted(timings)
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95)], 3),
+    }
+
+
+async def measure(
+    session_factory, table_ids: list[int], rows: int, bookings: int
+) -> dict:
+    """Замеряет бронирование и проверки доступности на загруженной истории."""
+    tables = len(table_ids)
+    last_slot = slot_time(rows - 1, tables)
+    # Слоты заполнены у всех столиков до предпоследнего включительно.
+    slots = [
+        (table_ids[i % tables], last_slot - SLOT * (1 + i // tables) + BOOKING_OFFSET)
+        for i in range(bookings)
+    ]
+
+    timings = {"book": [], "has_conflict": [], "free_slots": []}
+    async with session_factory() as session:
+        repo = ReservationRepository(session)
+        service = ReservationService(repo)
+        for table_id, start in slots:
+            started = time.perf_counter()
+            await repo.has_conflict(table_id, start, BOOKING_MINUTES)
+            timings["has_conflict"].append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            created = await service.create_reservation_if_available(
+                Reservation(
+                    customer_name="bench",
+                    table_id=table_id,
+                    reservation_time=start,
+                    duration_minutes=BOOKING_MINUTES,
+                )
+            )
+            timings["book"].append((time.perf_counter() - started) * 1000)
+            assert created is not None, "benchmark slot must be free"
+            session.expunge_all()
+
+        table_repo = TableRepository(session)
+        for i in range(min(bookings, 50)):
+            evening = last_slot - SLOT * (1 + i % 12) - timedelta(hours=4)
+            started = time.perf_counter()
+            await table_repo.get_free_slots(
+                evening, evening + timedelta(hours=4), party_size=2, slot_minutes=30
+            )
+            timings["free_slots"].append((time.perf_counter() - started) * 1000)
+
+        await session.execute(text("DELETE FROM reservations WHERE customer_name = 'bench'"))
+        await session.commit()
+
+    return {name: percentiles(values) for name, values in timings.items()}
+
+
+async def table_size(session: AsyncSession, partitioned: bool) -> int:
+    """Возвращает размер таблицы броней (всех партиций) с индексами в байтах."""
+    if not partitioned:
+        return await session.scalar(text("SELECT pg_total_relation_size('reservations')"))
+    return await session.scalar(
+        text(
+            "SELECT sum(pg_total_relation_size(relid))::bigint "
+            "FROM pg_partition_tree('reservations')"
+        )
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_engine(db_settings.test_database_url)
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+    results = {"rows": args.rows, "tables": args.tables, "layouts": {}}
+    for layout, partitioned in LAYOUTS.items():
+        await reset_schema(engine, partitioned=partitioned)
+        async with session_factory() as session:
+            table_ids = await create_tables(session, args.tables)
+            load_seconds = await resize_reservations(session, table_ids, args.rows)
+            size = await table_size(session, partitioned)
+        result = await measure(session_factory, table_ids, args.rows, args.bookings)
+        result["load_seconds"] = round(load_seconds, 1)
+        result["size_mb"] = round(size / 2**20, 1)
+        results["layouts"][layout] = result
+        print(f"{layout}: loaded {args.rows} rows in {load_seconds:.1f} s")
+
+    await drop_schema(engine)
+    await engine.dispose()
+
+    print(f"{'layout':>12} {'path':>13} {'p50, ms':>9} {'p95, ms':>9}")
+    for layout, result in results["layouts"].items():
+        for name in ("book", "has_conflict", "free_slots"):
+            print(
+                f"{layout:>12} {name:>13} {result[name]['p50_ms']:>9.3f} "
+                f"{result[name]['p95_ms']:>9.3f}"
+            )
+    for layout, result in results["layouts"].items():
+        print(
+            f"{layout:>12} load {result['load_seconds']:.1f} s, "
+            f"size {result['size_mb']:.1f} MB"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+        print(f"results written to {args.output}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Partitioned vs plain reservations.")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="число броней")
+    parser.add_argument("--tables", type=int, default=100, help="число столиков")
+    parser.add_argument(
+        "--bookings", type=int, default=500, help="число замеряемых бронирований"
+    )
+    parser.add_argument("--output", help="файл для результатов в JSON")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,212 @@
+"""
+Бенчмарк горячих путей репозиториев при росте объема данных.
+
+Для каждого объема броней (по умолчанию от 10^3 до 10^6) замеряет
+`ReservationRepository.has_conflict`, `get_reservations_by_table`,
+`BaseRepository.get_all` и `BaseRepository.delete`: медиану времени
+вызова и пик памяти Python за вызов (tracemalloc, отдельным прогоном,
+чтобы трассировка не искажала время). Колонка `x prev` показывает, во
+сколько раз выросло время по сравнению с предыдущим объемом: около 1 —
+путь не зависит от объема, около 10 (при шаге объема x10) — линеен.
+
+Данные загружает `benchmarks.datagen`: сначала наибольший объем, затем
+он уменьшается удалением последних броней. Работает с тестовой БД
+(`db_settings.test_database_url`); с `--reuse` использует уже
+загруженные данные и оставляет их после прогона.
+
+Запуск:
+    python -m benchmarks.bench_repositories
+    python -m benchmarks.bench_repositories --sizes 1000 10000 --output repos.json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+from functools import partial
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import db_settings
+from app.core.database import create_engine
+from app.repositories.reservation_repo import ReservationRepository
+from benchmarks.datagen import (
+    HISTORY_START,
+    create_tables,
+    drop_schema,
+    get_table_ids,
+    reset_schema,
+    resize_reservations,
+)
+
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+# Число вызовов на объем: дорогие пути вызываются реже.
+ITERATIONS = {
+    "has_conflict": 200,
+    "get_reservations_by_table": 5,
+    "get_all": 1,
+    "delete": 200,
+}
+# Брони для бенчмарка delete создаются после всей истории.
+DELETE_START = HISTORY_START + timedelta(days=365 * 200)
+
+
+async def bench_has_conflict(repo, table_ids, size, iteration):
+    # Проверяются слоты в середине истории столика.
+    history_hours = 2 * (size // len(table_ids))
+    start = HISTORY_START + timedelta(hours=history_hours // 2 + iteration % 8)
+    await repo.has_conflict(
+        table_id=table_ids[iteration % len(table_ids)], start_time=start, duration=90
+    )
+
+
+async def bench_get_reservations_by_table(repo, table_ids, size, iteration):
+    await repo.get_reservations_by_table(table_ids[iteration % len(table_ids)])
+
+
+async def bench_get_all(repo, table_ids, size, iteration):
+    await repo.get_all()
+
+
+async def bench_delete(repo, table_ids, size, iteration, ids):
+    await repo.delete(ids[iteration])
+
+
+async def create_for_delete(session: AsyncSession, table_id: int, count: int) -> list[int]:
+    """Создает брони, которые удалит бенчмарк delete (объем данных не меняется)."""
+    result = await session.execute(
+        text(
+            """
+            INSERT INTO reservations (customer_name, table_id, reservation_time, duration_minutes)
+            SELECT 'delete ' || n, :table_id, CAST(:start AS timestamp) + n * interval '2 hours', 60
+            FROM generate_series(1, :count) AS n
+            RETURNING id
+            """
+        ),
+        {"table_id": table_id, "start": DELETE_START, "count": count},
+    )
+    ids = list(result.scalars())
+    await session.commit()
+    return ids
+
+
+PATHS = {
+    "has_conflict": bench_has_conflict,
+    "get_reservations_by_table": bench_get_reservations_by_table,
+    "get_all": bench_get_all,
+    "delete": bench_delete,
+}
+
+
+async def measure(session_factory, name, table_ids, size) -> dict:
+    """Возвращает медиану времени вызова (мс) и пик памяти Python (МБ)."""
+    iterations = ITERATIONS[name]
+    async with session_factory() as session:
+        repo = ReservationRepository(session)
+        call = PATHS[name]
+        if name == "delete":
+            ids = await create_for_delete(session, table_ids[0], iterations + 1)
+            call = partial(bench_delete, ids=ids)
+
+        timings = []
+        for iteration in range(iterations):
+            started = time.perf_counter()
+            await call(repo, table_ids, size, iteration)
+            timings.append((time.perf_counter() - started) * 1000)
+            # Объекты прошлого вызова не должны влиять на следующий.
+            session.expunge_all()
+
+        tracemalloc.start()
+        await call(repo, table_ids, size, iterations)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        session.expunge_all()
+
+    return {
+        "iterations": iterations,
+        "median_ms": round(statistics.median(timings), 3),
+        "peak_mb": round(peak / 2**20, 3),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_engine(db_settings.test_database_url)
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+    if not args.reuse:
+        await reset_schema(engine)
+    async with session_factory() as session:
+        table_ids = await get_table_ids(session)
+        if not table_ids:
+            table_ids = await create_tables(session, args.tables)
+        # Брони бенчмарка delete, оставшиеся от прерванного прогона.
+        await session.execute(
+            text("DELETE FROM reservations WHERE reservation_time >= :start"),
+            {"start": DELETE_START},
+        )
+        await session.commit()
+
+    results = {"tables": len(table_ids), "sizes": {}}
+    # Объем загружается один раз и затем только уменьшается.
+    for size in sorted(args.sizes, reverse=True):
+        async with session_factory() as session:
+            load_seconds = await resize_reservations(session, table_ids, size)
+        results["sizes"][size] = {"resize_seconds": round(load_seconds, 1)}
+        for name in PATHS:
+            results["sizes"][size][name] = await measure(
+                session_factory, name, table_ids, size
+            )
+
+    print(
+        f"{'size':>10} {'path':>26} {'median, ms':>11} {'x prev':>7} "
+        f"{'py peak, MB':>12}"
+    )
+    previous: dict[str, float] = {}
+    for size in sorted(args.sizes):
+        for name in PATHS:
+            result = results["sizes"][size][name]
+            growth = (
+                f"{result['median_ms'] / previous[name]:>7.1f}"
+                if previous.get(name)
+                else f"{'':>7}"
+            )
+            previous[name] = result["median_ms"]
+            print(
+                f"{size:>10} {name:>26} {result['median_ms']:>11.3f} {growth} "
+                f"{result['peak_mb']:>12.3f}"
+            )
+
+    if not args.reuse:
+        await drop_schema(engine)
+    await engine.dispose()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+        print(f"results written to {args.output}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Repository hot paths vs data size.")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=SIZES, help="объемы броней"
+    )
+    parser.add_argument("--tables", type=int, default=100, help="число столиков")
+    parser.add_argument(
+        "--reuse",
+        action="store_true",
+        help="использовать загруженные данные и не удалять их после прогона",
+    )
+    parser.add_argument("--output", help="файл для результатов в JSON")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,228 @@
+"""
+Генератор синтетических данных для бенчмарков.
+
+Заполняет БД столиками и непересекающимися бронями одним
+`INSERT ... SELECT generate_series(...)` на стороне сервера, так что
+данные не проходят через Python и драйвер. Бронь с порядковым номером n
+принадлежит n % tables-му столику и начинается через 2 * (n // tables)
+часов после `HISTORY_START`, поэтому объем можно наращивать и
+уменьшать (`resize_reservations`), не пересоздавая остальные данные.
+
+Почти все время загрузки занимает проверка EXCLUDE-ограничения: десятки
+микросекунд на строку, около полутора минут на миллион броней. Удалять
+ограничение на время загрузки бесполезно: при повторном создании оно
+проверяет все строки еще дольше. Поэтому бенчмарки загружают
+наибольший объем один раз и уменьшают его удалением последних броней,
+а загруженные данные можно переиспользовать между запусками
+(`bench_repositories --reuse`).
+
+Запуск (заполнить тестовую БД):
+    python -m benchmarks.datagen --tables 100 --reservations 1000000
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import db_settings
+from app.core.database import Base, create_engine
+from app.models.cache_generation import CacheGeneration  # noqa: F401
+from app.models.reservation import Reservation  # noqa: F401
+from app.models.table import Table  # noqa: F401
+from app.repositories.reservation_repo import ReservationRepository
+
+
+HISTORY_START = datetime(2020, 1, 1, 0, 0)
+SLOT = timedelta(hours=2)
+
+
+def slot_time(number: int, tables: int) -> datetime:
+    """Возвращает начало брони с порядковым номером `number`."""
+    return HISTORY_START + SLOT * (number // tables)
+
+
+# Таблица броней без партиций (до секционирования по месяцам) — для
+# сравнения в bench_partitioning.
+CREATE_PLAIN_RESERVATIONS = (
+    "DROP TABLE reservations CASCADE",
+    """
+    CREATE TABLE reservations (
+        id serial PRIMARY KEY,
+        customer_name varchar(100) NOT NULL,
+        table_id integer NOT NULL REFERENCES tables (id) ON DELETE CASCADE,
+        reservation_time timestamp NOT NULL,
+        duration_minutes integer NOT NULL,
+        period tsrange GENERATED ALWAYS AS (
+            tsrange(reservation_time, reservation_time + make_interval(mins => duration_minutes))
+        ) STORED,
+        CONSTRAINT reservations_duration_range CHECK (duration_minutes BETWEEN 1 AND 1440),
+        CONSTRAINT reservations_no_overlap EXCLUDE USING gist (table_id WITH =, period WITH &&)
+    )
+    """,
+    "CREATE INDEX ix_reservations_id ON reservations (id)",
+    "CREATE INDEX ix_reservations_table_id_reservation_time "
+    "ON reservations (table_id, reservation_time)",
+    "CREATE INDEX ix_reservations_reservation_time_id ON reservations (reservation_time, id)",
+    "CREATE TRIGGER reservations_version_insert AFTER INSERT ON reservations "
+    "REFERENCING NEW TABLE AS changed "
+    "FOR EACH STATEMENT EXECUTE FUNCTION bump_reservations_version()",
+    "CREATE TRIGGER reservations_version_delete AFTER DELETE ON reservations "
+    "REFERENCING OLD TABLE AS changed "
+    "FOR EACH STATEMENT EXECUTE FUNCTION bump_reservations_version()",
+)
+
+
+async def reset_schema(engine: AsyncEngine, partitioned: bool = True) -> None:
+    """
+    Пересоздает схему БД.
+
+    Аргументы:
+        engine: Движок тестовой БД.
+        partitioned: Секционировать брони по месяцам, как в приложении;
+            иначе брони хранятся в одной таблице.
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        if not partitioned:
+            for statement in CREATE_PLAIN_RESERVATIONS:
+                await conn.execute(text(statement))
+
+
+async def drop_schema(engine: AsyncEngine) -> None:
+    """Удаляет схему БД."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+
+async def create_tables(session: AsyncSession, tables: int) -> list[int]:
+    """
+    Создает `tables` столиков.
+
+    Возвращает:
+        ID созданных столиков по возрастанию.
+    """
+    result = await session.execute(
+        text(
+            """
+            INSERT INTO tables (name, seats, location)
+            SELECT 'table ' || n, 2 + n % 6, 'hall ' || n % 3
+            FROM generate_series(1, :tables) AS n
+            RETURNING id
+            """
+        ),
+        {"tables": tables},
+    )
+    table_ids = sorted(result.scalars().all())
+    await session.commit()
+    return table_ids
+
+
+async def get_table_ids(session: AsyncSession) -> list[int]:
+    """Возвращает ID существующих столиков по возрастанию."""
+    return list(await session.scalars(text("SELECT id FROM tables ORDER BY id")))
+
+
+async def count_reservations(session: AsyncSession) -> int:
+    return await session.scalar(text("SELECT count(*) FROM reservations"))
+
+
+async def is_partitioned(session: AsyncSession) -> bool:
+    """Проверяет, секционирована ли таблица броней."""
+    return await session.scalar(
+        text("SELECT relkind = 'p' FROM pg_class WHERE oid = 'reservations'::regclass")
+    )
+
+
+async def resize_reservations(
+    session: AsyncSession, table_ids: list[int], size: int
+) -> float:
+    """
+    Догружает или удаляет последние брони до общего числа `size`.
+
+    Перед загрузкой в секционированную таблицу создает месячные партиции
+    на весь период новых броней.
+
+    Аргументы:
+        session: Сессия БД.
+        table_ids: ID столиков, по которым раскладываются брони.
+        size: Требуемое общее число броней.
+
+    Возвращает:
+        Время загрузки в секундах.
+    """
+    started = time.perf_counter()
+    current = await count_reservations(session)
+    if current < size and await is_partitioned(session):
+        last = slot_time(size - 1, len(table_ids))
+        months = (last.year - HISTORY_START.year) * 12 + last.month - HISTORY_START.month
+        await ReservationRepository(session).create_partitions(HISTORY_START, months + 1)
+    if current < size:
+        # Длительность 60-105 минут не выходит за двухчасовой слот.
+        await session.execute(
+            text(
+                """
+                INSERT INTO reservations (customer_name, table_id, reservation_time, duration_minutes)
+                SELECT
+                    'guest ' || n,
+                    (CAST(:table_ids AS integer[]))[1 + n % :tables],
+                    CAST(:start AS timestamp) + (n / :tables) * interval '2 hours',
+                    60 + 15 * (n % 4)
+                FROM generate_series(:current, :size - 1) AS n
+                """
+            ),
+            {
+                "table_ids": table_ids,
+                "tables": len(table_ids),
+                "start": HISTORY_START,
+                "current": current,
+                "size": size,
+            },
+        )
+        await session.commit()
+        await session.execute(text("ANALYZE reservations"))
+    elif current > size:
+        # Брони вставлялись по порядку номеров, поэтому последние по id —
+        # это брони с номерами от size и выше.
+        await session.execute(
+            text(
+                """
+                DELETE FROM reservations WHERE id IN (
+                    SELECT id FROM reservations ORDER BY id DESC LIMIT :excess
+                )
+                """
+            ),
+            {"excess": current - size},
+        )
+        await session.commit()
+        async with session.bind.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("VACUUM ANALYZE reservations"))
+    return time.perf_counter() - started
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_engine(db_settings.test_database_url)
+    await reset_schema(engine)
+    async with AsyncSession(engine) as session:
+        table_ids = await create_tables(session, args.tables)
+        seconds = await resize_reservations(session, table_ids, args.reservations)
+    await engine.dispose()
+    print(f"{args.reservations} reservations for {args.tables} tables in {seconds:.1f} s")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fill the test DB with synthetic data.")
+    parser.add_argument("--tables", type=int, default=100, help="число столиков")
+    parser.add_argument(
+        "--reservations", type=int, default=1_000_000, help="число броней"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,364 @@
+"""
+Нагрузочный тест API бронирования.
+
+Заполняет тестовую БД столиками и бронями, распределенными по нескольким
+месяцам, и прогоняет через приложение сценарии конкурентными клиентами
+httpx (`ASGITransport`, без сети): каждый запрос обслуживается отдельной
+сессией из пула, как в рабочем приложении. Для каждого сценария
+сообщается пропускная способность, p50/p95/p99 задержки и распределение
+статусов ответов.
+
+Сценарии:
+    get_tables            GET /tables/
+    get_reservations      GET /reservations/?table_id=... (случайный столик)
+    post_low_contention   POST /reservations/ на свободные слоты разных столиков
+    post_high_contention  POST /reservations/ на несколько слотов одного столика
+                          (большинство ответов — 409)
+    delete                DELETE /reservations/{id} заранее созданных броней
+
+Результаты пишутся в JSON (`--output`) вместе с коммитом и параметрами
+запуска; `--compare` выводит изменение метрик относительно прошлого
+результата. С `--batching` брони создаются через групповую очередь
+(`ReservationWriteBatcher`). Работает с тестовой БД и пересоздает в ней
+схему.
+
+Запуск:
+    python -m benchmarks.load_test --output load_test.json
+    python -m benchmarks.load_test --compare load_test.json
+    python -m benchmarks.load_test --batching --compare load_test.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from itertools import count
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import db_settings
+from app.core.database import Base, create_engine, get_db, get_read_sessionmaker
+from app.dependencies.services import (
+    get_reservation_batcher,
+    get_reservation_service,
+    get_table_cache,
+)
+from app.main import app
+from app.repositories.reservation_repo import ReservationRepository
+from app.services.reservation_batcher import ReservationWriteBatcher
+
+
+# Брони при заполнении идут каждые 2 часа с этого момента.
+HISTORY_START = datetime(2029, 1, 1, 0, 0)
+# Новые брони сценариев создаются после истории.
+BOOKING_START = datetime(2031, 1, 1, 0, 0)
+# Число слотов, за которые соревнуются клиенты в post_high_contention.
+CONTENDED_SLOTS = 4
+
+
+def percentile(timings: list[float], fraction: float) -> float:
+    """Возвращает перцентиль отсортированного списка (ближайший ранг)."""
+    position = min(len(timings) - 1, max(0, round(fraction * len(timings)) - 1))
+    return timings[position]
+
+
+async def seed(session_factory, tables: int, reservations: int) -> None:
+    """Создает `tables` столиков и `reservations` броней, равномерно по столикам."""
+    async with session_factory() as session:
+        await session.execute(
+            text(
+                """
+                INSERT INTO tables (name, seats, location)
+                SELECT 'table ' || n, 2 + n % 6, 'зал ' || n % 3
+                FROM generate_series(1, :tables) AS n
+                """
+            ),
+            {"tables": tables},
+        )
+        # Месячные партиции истории и сценариев; позже — партиция по умолчанию.
+        await ReservationRepository(session).create_partitions(HISTORY_START, 30)
+        await session.execute(
+            text(
+                """
+                INSERT INTO reservations (customer_name, table_id, reservation_time, duration_minutes)
+                SELECT
+                    'guest ' || n,
+                    (SELECT min(id) FROM tables) + n % :tables,
+                    CAST(:start AS timestamp) + (n / :tables) * interval '2 hours',
+                    60 + 30 * (n % 3)
+                FROM generate_series(0, :reservations - 1) AS n
+                """
+            ),
+            {"tables": tables, "reservations": reservations, "start": HISTORY_START},
+        )
+        await session.commit()
+        await session.execute(text("ANALYZE"))
+
+
+async def run_scenario(
+    client: AsyncClient, make_request, requests: int, concurrency: int
+) -> dict:
+    """
+    Выполняет `requests` запросов в `concurrency` параллельных клиентов.
+
+    Аргументы:
+        client: HTTP-клиент приложения.
+        make_request: Корутина `(client, номер запроса) -> Response`.
+        requests: Общее число запросов.
+        concurrency: Число одновременно работающих клиентов.
+
+    Возвращает:
+        Словарь с числом запросов, длительностью, RPS, перцентилями
+        задержки в миллисекундах и числом ответов по статусам.
+    """
+    numbers = iter(range(requests))
+    timings: list[float] = []
+    statuses: Counter[int] = Counter()
+
+    async def worker() -> None:
+        for number in numbers:
+            started = time.perf_counter()
+            response = await make_request(client, number)
+            timings.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - started
+
+    timings.sort()
+    return {
+        "requests": requests,
+        "seconds": round(seconds, 3),
+        "rps": round(requests / seconds, 1),
+        "p50_ms": round(percentile(timings, 0.50), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "p99_ms": round(percentile(timings, 0.99), 3),
+        "statuses": {str(code): total for code, total in sorted(statuses.items())},
+    }
+
+
+def build_scenarios(tables: int, table_ids: list[int], delete_ids: list[int]) -> dict:
+    """Возвращает сценарии нагрузки: {имя: make_request}."""
+    slot = count()
+    rng = random.Random(0)
+
+    async def get_tables(client, number):
+        return await client.get("/tables/")
+
+    async def get_reservations(client, number):
+        return await client.get(
+            "/reservations/", params={"table_id": rng.choice(table_ids)}
+        )
+
+    async def post_low_contention(client, number):
+        # Каждый запрос получает свой слот: конфликтов нет.
+        index = next(slot)
+        return await client.post(
+            "/reservations/",
+            json={
+                "customer_name": f"load {number}",
+                "table_id": table_ids[index % tables],
+                "reservation_time": (
+                    BOOKING_START + timedelta(hours=2 * (index // tables))
+                ).isoformat(),
+                "duration_minutes": 60,
+            },
+        )
+
+    async def post_high_contention(client, number):
+        return await client.post(
+            "/reservations/",
+            json={
+                "customer_name": f"load {number}",
+                "table_id": table_ids[0],
+                "reservation_time": (
+                    BOOKING_START
+                    - timedelta(days=1)
+                    + timedelta(minutes=30 * rng.randrange(CONTENDED_SLOTS))
+                ).isoformat(),
+                "duration_minutes": 60,
+            },
+        )
+
+    async def delete(client, number):
+        return await client.delete(f"/reservations/{delete_ids[number]}")
+
+    return {
+        "get_tables": get_tables,
+        "get_reservations": get_reservations,
+        "post_low_contention": post_low_contention,
+        "post_high_contention": post_high_contention,
+        "delete": delete,
+    }
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results: dict, previous: dict | None) -> None:
+    print(
+        f"{'scenario':>22} {'rps':>9} {'p50, ms':>9} {'p95, ms':>9} "
+        f"{'p99, ms':>9}  statuses"
+    )
+    for name, result in results["scenarios"].items():
+        print(
+            f"{name:>22} {result['rps']:>9.1f} {result['p50_ms']:>9.2f} "
+            f"{result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f}  {result['statuses']}"
+        )
+        old = (previous or {}).get("scenarios", {}).get(name)
+        if old:
+            deltas = "  ".join(
+                f"{key} {(result[key] / old[key] - 1) * 100:+.1f}%"
+                for key in ("rps", "p50_ms", "p95_ms", "p99_ms")
+                if old[key]
+            )
+            print(f"{'vs ' + str(previous.get('commit')):>22} {deltas}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_engine(db_settings.test_database_url)
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+    async def override_get_db():
+        async with session_factory() as session:
+            try:
+                yield session
+            except Exception:
+                await session.rollback()
+                raise
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_sessionmaker] = lambda: session_factory
+    batcher = None
+    if args.batching:
+        batcher = ReservationWriteBatcher(
+            session_factory,
+            lambda session: get_reservation_service(session, get_table_cache()),
+            args.batch_size,
+            args.batch_delay,
+        )
+    app.dependency_overrides[get_reservation_batcher] = lambda: batcher
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    await seed(session_factory, args.tables, args.reservations)
+
+    async with session_factory() as session:
+        table_ids = list(await session.scalars(text("SELECT id FROM tables ORDER BY id")))
+        delete_ids = list(
+            await session.scalars(
+                text("SELECT id FROM reservations ORDER BY random() LIMIT :limit"),
+                {"limit": args.requests},
+            )
+        )
+
+    scenarios = build_scenarios(args.tables, table_ids, delete_ids)
+    results = {
+        "commit": current_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "tables": args.tables,
+            "reservations": args.reservations,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "pool_size": db_settings.db_pool_size,
+            "max_overflow": db_settings.db_max_overflow,
+            "batching": args.batching,
+            "batch_size": args.batch_size if args.batching else None,
+            "batch_delay": args.batch_delay if args.batching else None,
+        },
+        "scenarios": {},
+    }
+
+    # Ошибки приложения учитываются как ответы 500, а не прерывают прогон.
+    async with AsyncClient(
+        transport=ASGITransport(app=app, raise_app_exceptions=False),
+        base_url="http://load",
+    ) as client:
+        for name, make_request in scenarios.items():
+            requests = args.requests
+            if name == "delete":
+                requests = min(requests, len(delete_ids))
+            # Прогрев: первые запросы заполняют пул соединений и кэши.
+            if name.startswith("get"):
+                await run_scenario(
+                    client, make_request, args.concurrency, args.concurrency
+                )
+            results["scenarios"][name] = await run_scenario(
+                client, make_request, requests, args.concurrency
+            )
+
+    if batcher is not None:
+        await batcher.close()
+    app.dependency_overrides.clear()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            previous = json.load(file)
+    print_report(results, previous)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+        print(f"results written to {args.output}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test of the booking API.")
+    parser.add_argument("--tables", type=int, default=50, help="число столиков")
+    parser.add_argument(
+        "--reservations", type=int, default=100_000, help="число броней в истории"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=2_000, help="число запросов на сценарий"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=32, help="число одновременных клиентов"
+    )
+    parser.add_argument(
+        "--batching",
+        action="store_true",
+        help="создавать брони через групповую очередь",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=db_settings.reservation_batch_max_size,
+        help="максимальное число броней в пачке",
+    )
+    parser.add_argument(
+        "--batch-delay",
+        type=float,
+        default=db_settings.reservation_batch_max_delay_seconds,
+        help="сколько секунд первый запрос пачки ждет следующих",
+    )
+    parser.add_argument("--output", help="файл для результатов в JSON")
+    parser.add_argument("--compare", help="JSON прошлого запуска для сравнения")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
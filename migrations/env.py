@@ -9,8 +9,12 @@ from alembic import context
 from app.core.config import db_settings
 from app.core.database import Base
 
+from app.models.cache_generation import CacheGeneration
+from app.models.idempotency_key import IdempotencyKey
 from app.models.table import Table
 from app.models.reservation import Reservation
+from app.models.reservation_archive import ReservationArchive
+from app.models.table_daily_occupancy import TableDailyOccupancy
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
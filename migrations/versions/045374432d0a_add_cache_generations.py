@@ -0,0 +1,52 @@
+"""add cache generations
+
+Revision ID: 045374432d0a
+Revises: 5c9fcc2568f5
+Create Date: 2026-10-18 13:38:37.047741
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '045374432d0a'
+down_revision: Union[str, None] = '5c9fcc2568f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "cache_generations",
+        sa.Column("name", sa.String(length=50), nullable=False),
+        sa.Column("generation", sa.BigInteger(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_tables_generation() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO cache_generations (name, generation) VALUES ('tables', 1)
+            ON CONFLICT (name) DO UPDATE
+            SET generation = cache_generations.generation + 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER tables_generation AFTER INSERT OR DELETE "
+        "OR UPDATE OF name, seats, location ON tables "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_tables_generation()"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER tables_generation ON tables")
+    op.execute("DROP FUNCTION bump_tables_generation()")
+    op.drop_table("cache_generations")
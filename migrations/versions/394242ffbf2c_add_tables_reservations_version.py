@@ -0,0 +1,60 @@
+"""add tables reservations version
+
+Revision ID: 394242ffbf2c
+Revises: ee6b54a69e8e
+Create Date: 2026-10-18 12:57:31.169835
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '394242ffbf2c'
+down_revision: Union[str, None] = 'ee6b54a69e8e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "tables",
+        sa.Column(
+            "reservations_version",
+            sa.BigInteger(),
+            server_default="0",
+            nullable=False,
+        ),
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_reservations_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE tables SET reservations_version = reservations_version + 1
+            WHERE id IN (SELECT DISTINCT table_id FROM changed);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER reservations_version_insert AFTER INSERT ON reservations "
+        "REFERENCING NEW TABLE AS changed "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_reservations_version()"
+    )
+    op.execute(
+        "CREATE TRIGGER reservations_version_delete AFTER DELETE ON reservations "
+        "REFERENCING OLD TABLE AS changed "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_reservations_version()"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER reservations_version_delete ON reservations")
+    op.execute("DROP TRIGGER reservations_version_insert ON reservations")
+    op.execute("DROP FUNCTION bump_reservations_version()")
+    op.drop_column("tables", "reservations_version")
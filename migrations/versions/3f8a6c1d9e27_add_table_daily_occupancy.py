@@ -0,0 +1,161 @@
+"""add table daily occupancy
+
+Revision ID: 3f8a6c1d9e27
+Revises: e41c7a9b2d58
+Create Date: 2026-10-18 21:14:05.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8a6c1d9e27'
+down_revision: Union[str, None] = 'e41c7a9b2d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OCCUPANCY_UPSERT = """
+INSERT INTO table_daily_occupancy AS o (
+    day, table_id, reservations, booked_minutes, hourly_reservations, hourly_minutes
+)
+WITH slices AS (
+    SELECT
+        c.table_id,
+        h.hour_start,
+        h.hour_start = date_trunc('hour', c.reservation_time) AS starts,
+        round(extract(epoch FROM
+            least(
+                c.reservation_time + make_interval(mins => c.duration_minutes),
+                h.hour_start + interval '1 hour'
+            ) - greatest(c.reservation_time, h.hour_start)
+        ) / 60)::integer AS minutes
+    FROM {source} AS c
+    CROSS JOIN LATERAL generate_series(
+        date_trunc('hour', c.reservation_time),
+        c.reservation_time + make_interval(mins => c.duration_minutes)
+            - interval '1 microsecond',
+        interval '1 hour'
+    ) AS h(hour_start)
+),
+per_hour AS (
+    SELECT
+        hour_start::date AS day,
+        table_id,
+        extract(hour FROM hour_start)::integer AS hour_of_day,
+        count(*) FILTER (WHERE starts)::integer AS started,
+        count(*)::integer AS reservations,
+        sum(minutes)::integer AS minutes
+    FROM slices
+    GROUP BY 1, 2, 3
+)
+SELECT
+    d.day,
+    d.table_id,
+    {delta} * coalesce(sum(p.started), 0)::integer,
+    {delta} * coalesce(sum(p.minutes), 0)::integer,
+    array_agg({delta} * coalesce(p.reservations, 0) ORDER BY h.hour_of_day),
+    array_agg({delta} * coalesce(p.minutes, 0) ORDER BY h.hour_of_day)
+FROM (SELECT DISTINCT day, table_id FROM per_hour) AS d
+CROSS JOIN generate_series(0, 23) AS h(hour_of_day)
+LEFT JOIN per_hour AS p
+    ON p.day = d.day AND p.table_id = d.table_id AND p.hour_of_day = h.hour_of_day
+GROUP BY d.day, d.table_id
+ORDER BY d.day, d.table_id
+ON CONFLICT (day, table_id) DO UPDATE SET
+    reservations = o.reservations + excluded.reservations,
+    booked_minutes = o.booked_minutes + excluded.booked_minutes,
+    hourly_reservations = ARRAY(
+        SELECT a + b
+        FROM unnest(o.hourly_reservations, excluded.hourly_reservations)
+            WITH ORDINALITY AS u(a, b, n)
+        ORDER BY n
+    ),
+    hourly_minutes = ARRAY(
+        SELECT a + b
+        FROM unnest(o.hourly_minutes, excluded.hourly_minutes)
+            WITH ORDINALITY AS u(a, b, n)
+        ORDER BY n
+    )
+"""
+
+APPLY_TABLE_DAILY_OCCUPANCY = f"""
+CREATE OR REPLACE FUNCTION apply_table_daily_occupancy() RETURNS trigger AS $$
+DECLARE
+    delta integer := CASE TG_OP WHEN 'DELETE' THEN -1 ELSE 1 END;
+BEGIN
+    IF delta < 0 AND current_setting('app.archiving_reservations', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    {OCCUPANCY_UPSERT.format(source="changed", delta="delta")};
+
+    IF delta < 0 THEN
+        DELETE FROM table_daily_occupancy AS o
+        USING (
+            SELECT DISTINCT c.table_id, d.day::date AS day
+            FROM changed AS c
+            CROSS JOIN LATERAL generate_series(
+                date_trunc('day', c.reservation_time),
+                c.reservation_time + make_interval(mins => c.duration_minutes)
+                    - interval '1 microsecond',
+                interval '1 day'
+            ) AS d(day)
+        ) AS touched
+        WHERE o.day = touched.day
+          AND o.table_id = touched.table_id
+          AND o.booked_minutes = 0;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+OCCUPANCY_TRIGGERS = (
+    "CREATE TRIGGER table_daily_occupancy_insert AFTER INSERT ON reservations "
+    "REFERENCING NEW TABLE AS changed "
+    "FOR EACH STATEMENT EXECUTE FUNCTION apply_table_daily_occupancy()",
+    "CREATE TRIGGER table_daily_occupancy_delete AFTER DELETE ON reservations "
+    "REFERENCING OLD TABLE AS changed "
+    "FOR EACH STATEMENT EXECUTE FUNCTION apply_table_daily_occupancy()",
+)
+
+# Сводка заполняется по текущим и архивным броням.
+ALL_RESERVATIONS = (
+    "(SELECT table_id, reservation_time, duration_minutes FROM reservations "
+    "UNION ALL "
+    "SELECT table_id, reservation_time, duration_minutes FROM reservations_archive)"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "table_daily_occupancy",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("table_id", sa.Integer(), nullable=False),
+        sa.Column("reservations", sa.Integer(), nullable=False),
+        sa.Column("booked_minutes", sa.Integer(), nullable=False),
+        sa.Column(
+            "hourly_reservations", postgresql.ARRAY(sa.Integer()), nullable=False
+        ),
+        sa.Column("hourly_minutes", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.PrimaryKeyConstraint("day", "table_id"),
+    )
+    # Брони не должны меняться между заполнением сводки и созданием триггеров.
+    op.execute("LOCK TABLE reservations, reservations_archive IN SHARE MODE")
+    op.execute(OCCUPANCY_UPSERT.format(source=ALL_RESERVATIONS, delta="1"))
+    op.execute(APPLY_TABLE_DAILY_OCCUPANCY)
+    for statement in OCCUPANCY_TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER table_daily_occupancy_delete ON reservations")
+    op.execute("DROP TRIGGER table_daily_occupancy_insert ON reservations")
+    op.execute("DROP FUNCTION apply_table_daily_occupancy()")
+    op.drop_table("table_daily_occupancy")
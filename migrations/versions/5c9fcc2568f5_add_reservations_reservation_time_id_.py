@@ -0,0 +1,33 @@
+"""add reservations reservation_time id index
+
+Revision ID: 5c9fcc2568f5
+Revises: 394242ffbf2c
+Create Date: 2026-10-18 13:01:28.993412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c9fcc2568f5'
+down_revision: Union[str, None] = '394242ffbf2c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_reservations_reservation_time_id",
+        "reservations",
+        ["reservation_time", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_reservations_reservation_time_id", table_name="reservations")
@@ -0,0 +1,49 @@
+"""lock tables in id order on version bump
+
+Revision ID: a6d2e8f04b13
+Revises: b7e2d4c91f3a
+Create Date: 2026-10-18 15:41:09.270514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d2e8f04b13'
+down_revision: Union[str, None] = 'b7e2d4c91f3a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_reservations_version() RETURNS trigger AS $$
+        BEGIN
+            PERFORM 1 FROM tables WHERE id IN (SELECT table_id FROM changed)
+            ORDER BY id FOR NO KEY UPDATE;
+            UPDATE tables SET reservations_version = reservations_version + 1
+            WHERE id IN (SELECT DISTINCT table_id FROM changed);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_reservations_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE tables SET reservations_version = reservations_version + 1
+            WHERE id IN (SELECT DISTINCT table_id FROM changed);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
@@ -0,0 +1,254 @@
+"""partition reservations by month
+
+Revision ID: b7e2d4c91f3a
+Revises: 9d3b1f6a2c47
+Create Date: 2026-10-18 17:05:41.902318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d4c91f3a'
+down_revision: Union[str, None] = '9d3b1f6a2c47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+MAX_DURATION_MINUTES = 1440
+
+COLUMNS = "id, customer_name, table_id, reservation_time, duration_minutes"
+
+CREATE_RESERVATION_PARTITION = """
+CREATE OR REPLACE FUNCTION create_reservation_partition(month timestamp) RETURNS text AS $$
+DECLARE
+    lower_bound timestamp := date_trunc('month', month);
+    upper_bound timestamp := date_trunc('month', month) + interval '1 month';
+    partition text := 'reservations_' || to_char(lower_bound, 'YYYY_MM');
+    has_default_rows boolean;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('create_reservation_partition'));
+    IF to_regclass(partition) IS NOT NULL THEN
+        RETURN partition;
+    END IF;
+
+    SELECT EXISTS (
+        SELECT 1 FROM reservations_default
+        WHERE reservation_time >= lower_bound AND reservation_time < upper_bound
+    ) INTO has_default_rows;
+    IF has_default_rows THEN
+        ALTER TABLE reservations DETACH PARTITION reservations_default;
+    END IF;
+
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF reservations FOR VALUES FROM (%L) TO (%L)',
+        partition, lower_bound, upper_bound
+    );
+    EXECUTE format(
+        'ALTER TABLE %I ADD CONSTRAINT %I '
+        'EXCLUDE USING gist (table_id WITH =, period WITH &&)',
+        partition, partition || '_no_overlap'
+    );
+
+    IF has_default_rows THEN
+        EXECUTE format(
+            'WITH moved AS ('
+            '    DELETE FROM reservations_default'
+            '    WHERE reservation_time >= %L AND reservation_time < %L'
+            '    RETURNING *'
+            ') INSERT INTO %I (id, customer_name, table_id, reservation_time, duration_minutes) '
+            'SELECT id, customer_name, table_id, reservation_time, duration_minutes FROM moved',
+            lower_bound, upper_bound, partition
+        );
+        ALTER TABLE reservations ATTACH PARTITION reservations_default DEFAULT;
+    END IF;
+    RETURN partition;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+CHECK_RESERVATION_PARTITION_OVERLAP = f"""
+CREATE OR REPLACE FUNCTION check_reservation_partition_overlap() RETURNS trigger AS $$
+DECLARE
+    starts_at timestamp := lower(NEW.period);
+    ends_at timestamp := upper(NEW.period);
+    boundary timestamp := date_trunc('month', upper(NEW.period));
+BEGIN
+    IF NOT (starts_at < boundary AND boundary < ends_at) THEN
+        boundary := date_trunc('month', starts_at);
+        IF starts_at >= boundary + interval '{MAX_DURATION_MINUTES} minutes' THEN
+            RETURN NULL;
+        END IF;
+    END IF;
+
+    PERFORM pg_advisory_xact_lock(
+        NEW.table_id, (extract(epoch FROM boundary) / 86400)::integer
+    );
+    IF EXISTS (
+        SELECT 1 FROM reservations
+        WHERE table_id = NEW.table_id
+          AND id <> NEW.id
+          AND reservation_time > starts_at - interval '{MAX_DURATION_MINUTES} minutes'
+          AND reservation_time < ends_at
+          AND period && NEW.period
+    ) THEN
+        RAISE EXCEPTION 'conflicting key value violates exclusion constraint "reservations_no_overlap"'
+            USING ERRCODE = 'exclusion_violation',
+                  CONSTRAINT = 'reservations_no_overlap',
+                  TABLE = 'reservations';
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+VERSION_TRIGGERS = (
+    "CREATE TRIGGER reservations_version_insert AFTER INSERT ON reservations "
+    "REFERENCING NEW TABLE AS changed "
+    "FOR EACH STATEMENT EXECUTE FUNCTION bump_reservations_version()",
+    "CREATE TRIGGER reservations_version_delete AFTER DELETE ON reservations "
+    "REFERENCING OLD TABLE AS changed "
+    "FOR EACH STATEMENT EXECUTE FUNCTION bump_reservations_version()",
+)
+
+INDEXES = (
+    ("ix_reservations_id", ["id"]),
+    ("ix_reservations_table_id_reservation_time", ["table_id", "reservation_time"]),
+    ("ix_reservations_reservation_time_id", ["reservation_time", "id"]),
+)
+
+
+def reservation_columns() -> list[sa.Column]:
+    return [
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('reservations_id_seq')"),
+            nullable=False,
+        ),
+        sa.Column("customer_name", sa.String(length=100), nullable=False),
+        sa.Column("table_id", sa.Integer(), nullable=False),
+        sa.Column("reservation_time", sa.DateTime(), nullable=False),
+        sa.Column("duration_minutes", sa.Integer(), nullable=False),
+        sa.Column(
+            "period",
+            postgresql.TSRANGE(),
+            sa.Computed(
+                "tsrange(reservation_time, "
+                "reservation_time + make_interval(mins => duration_minutes))",
+                persisted=True,
+            ),
+        ),
+        sa.ForeignKeyConstraint(["table_id"], ["tables.id"], ondelete="CASCADE"),
+    ]
+
+
+def detach_old_table(new_name: str) -> None:
+    """Переименовывает таблицу броней и освобождает имена ее объектов."""
+    op.execute(f"ALTER TABLE reservations RENAME TO {new_name}")
+    for constraint in ("pkey", "table_id_fkey"):
+        op.execute(
+            f"ALTER TABLE {new_name} "
+            f"RENAME CONSTRAINT reservations_{constraint} TO {new_name}_{constraint}"
+        )
+    op.execute(f"DROP TRIGGER reservations_version_insert ON {new_name}")
+    op.execute(f"DROP TRIGGER reservations_version_delete ON {new_name}")
+    for name, _ in INDEXES:
+        op.drop_index(name, table_name=new_name)
+
+
+def move_rows(old_name: str) -> None:
+    """Переносит брони из старой таблицы и удаляет ее."""
+    op.execute(
+        f"INSERT INTO reservations ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM {old_name} ORDER BY reservation_time"
+    )
+    op.execute("ALTER SEQUENCE reservations_id_seq OWNED BY reservations.id")
+    op.execute(f"DROP TABLE {old_name}")
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Брони длиннее суток нужно устранить до применения миграции: длительность
+    теперь ограничена MAX_DURATION_MINUTES. Таблица перестраивается целиком
+    (копирование всех броней), поэтому миграцию стоит применять вне пиковой
+    нагрузки.
+    """
+    detach_old_table("reservations_unpartitioned")
+    op.drop_constraint("reservations_no_overlap", "reservations_unpartitioned")
+
+    op.create_table(
+        "reservations",
+        *reservation_columns(),
+        sa.CheckConstraint(
+            f"duration_minutes BETWEEN 1 AND {MAX_DURATION_MINUTES}",
+            name="reservations_duration_range",
+        ),
+        sa.PrimaryKeyConstraint("id", "reservation_time"),
+        postgresql_partition_by="RANGE (reservation_time)",
+    )
+    for name, columns in INDEXES:
+        op.create_index(name, "reservations", columns, unique=False)
+
+    op.execute("CREATE TABLE reservations_default PARTITION OF reservations DEFAULT")
+    op.execute(
+        "ALTER TABLE reservations_default ADD CONSTRAINT reservations_default_no_overlap "
+        "EXCLUDE USING gist (table_id WITH =, period WITH &&)"
+    )
+    op.execute(CREATE_RESERVATION_PARTITION)
+    op.execute(CHECK_RESERVATION_PARTITION_OVERLAP)
+    op.execute(
+        "CREATE TRIGGER reservations_partition_overlap "
+        "AFTER INSERT OR UPDATE OF table_id, reservation_time, duration_minutes "
+        "ON reservations "
+        "FOR EACH ROW EXECUTE FUNCTION check_reservation_partition_overlap()"
+    )
+    for statement in VERSION_TRIGGERS:
+        op.execute(statement)
+
+    # Партиции всех месяцев с бронями и трех месяцев вперед.
+    op.execute(
+        """
+        SELECT create_reservation_partition(month)
+        FROM generate_series(
+            (SELECT date_trunc('month', coalesce(min(reservation_time), localtimestamp))
+             FROM reservations_unpartitioned),
+            (SELECT date_trunc('month', greatest(max(reservation_time), localtimestamp))
+             FROM reservations_unpartitioned) + interval '3 months',
+            interval '1 month'
+        ) AS month
+        """
+    )
+    move_rows("reservations_unpartitioned")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    detach_old_table("reservations_partitioned")
+    op.execute("DROP TRIGGER reservations_partition_overlap ON reservations_partitioned")
+
+    op.create_table(
+        "reservations",
+        *reservation_columns(),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    for name, columns in INDEXES:
+        op.create_index(name, "reservations", columns, unique=False)
+    op.create_exclude_constraint(
+        "reservations_no_overlap",
+        "reservations",
+        ("table_id", "="),
+        ("period", "&&"),
+        using="gist",
+    )
+    for statement in VERSION_TRIGGERS:
+        op.execute(statement)
+
+    move_rows("reservations_partitioned")
+    op.execute("DROP FUNCTION check_reservation_partition_overlap()")
+    op.execute("DROP FUNCTION create_reservation_partition(timestamp)")
@@ -0,0 +1,58 @@
+"""add reservations archive
+
+Revision ID: e41c7a9b2d58
+Revises: a6d2e8f04b13
+Create Date: 2026-10-18 19:02:37.541806
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41c7a9b2d58'
+down_revision: Union[str, None] = 'a6d2e8f04b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "reservations_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("customer_name", sa.String(length=100), nullable=False),
+        sa.Column("table_id", sa.Integer(), nullable=False),
+        sa.Column("reservation_time", sa.DateTime(), nullable=False),
+        sa.Column("duration_minutes", sa.Integer(), nullable=False),
+        sa.Column(
+            "archived_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_reservations_archive_table_id_reservation_time",
+        "reservations_archive",
+        ["table_id", "reservation_time"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_reservations_archive_reservation_time_id",
+        "reservations_archive",
+        ["reservation_time", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_reservations_archive_reservation_time_id", table_name="reservations_archive"
+    )
+    op.drop_index(
+        "ix_reservations_archive_table_id_reservation_time",
+        table_name="reservations_archive",
+    )
+    op.drop_table("reservations_archive")
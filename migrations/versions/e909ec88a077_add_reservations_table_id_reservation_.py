@@ -0,0 +1,35 @@
+"""add reservations table_id reservation_time index
+
+Revision ID: e909ec88a077
+Revises: 6153897d7295
+Create Date: 2026-10-18 12:54:40.483730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e909ec88a077'
+down_revision: Union[str, None] = '6153897d7295'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_reservations_table_id_reservation_time",
+        "reservations",
+        ["table_id", "reservation_time"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_reservations_table_id_reservation_time", table_name="reservations"
+    )
@@ -0,0 +1,53 @@
+"""add reservations no overlap exclusion constraint
+
+Revision ID: ee6b54a69e8e
+Revises: e909ec88a077
+Create Date: 2026-10-18 12:56:01.493036
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ee6b54a69e8e'
+down_revision: Union[str, None] = 'e909ec88a077'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Существующие пересекающиеся брони нужно устранить до применения миграции,
+    иначе создание EXCLUDE-ограничения завершится ошибкой.
+    """
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.add_column(
+        "reservations",
+        sa.Column(
+            "period",
+            postgresql.TSRANGE(),
+            sa.Computed(
+                "tsrange(reservation_time, "
+                "reservation_time + make_interval(mins => duration_minutes))",
+                persisted=True,
+            ),
+        ),
+    )
+    op.create_exclude_constraint(
+        "reservations_no_overlap",
+        "reservations",
+        ("table_id", "="),
+        ("period", "&&"),
+        using="gist",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("reservations_no_overlap", "reservations")
+    op.drop_column("reservations", "period")
@@ -1,25 +1,69 @@
+import os
+from contextlib import contextmanager
+
 import pytest
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy import event, make_url, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.main import app
 from app.core.config import db_settings
-from app.core.database import Base, get_db
+from app.core.database import Base, create_engine, get_db, get_read_sessionmaker
+from app.core.profiling import install_profiler, profile_queries
 
 
-testing_async_engine = create_async_engine(
-    db_settings.test_database_url, pool_pre_ping=True, echo=False
-)
+def worker_database_url() -> str:
+    """
+    Return the test DB URL for this process.
+
+    Under pytest-xdist every worker gets its own database
+    (`<test_db_name>_<worker id>`) so workers never share a schema.
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    url = make_url(db_settings.test_database_url)
+    if worker:
+        url = url.set(database=f"{url.database}_{worker}")
+    return url.render_as_string(hide_password=False)
+
+
+testing_async_engine = create_engine(worker_database_url())
 
 testing_async_session = async_sessionmaker(
     testing_async_engine, class_=AsyncSession, expire_on_commit=False
 )
 
+# Savepoint statements issued by the per-test transaction, not by the app.
+SAVEPOINT_PREFIXES = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
 
-@pytest.fixture
-async def setup_database():
-    """Create and drop test DB tables."""
+
+async def create_worker_database() -> None:
+    """Create the xdist worker database if it does not exist yet."""
+    url = make_url(worker_database_url())
+    base_url = make_url(db_settings.test_database_url)
+    if url.database == base_url.database:
+        return
+
+    admin_engine = create_engine(db_settings.test_database_url)
+    try:
+        async with admin_engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            exists = await conn.scalar(
+                text("SELECT 1 FROM pg_database WHERE datname = :name"),
+                {"name": url.database},
+            )
+            if not exists:
+                await conn.execute(text(f'CREATE DATABASE "{url.database}"'))
+    finally:
+        await admin_engine.dispose()
+
+
+@pytest.fixture(scope="session")
+async def database():
+    """Create the test DB schema once per session (per xdist worker)."""
+    await create_worker_database()
     async with testing_async_engine.begin() as conn:
+        # Leftovers of an interrupted run.
+        await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
 
     yield
@@ -31,14 +75,41 @@ async def setup_database():
 
 
 @pytest.fixture
-async def client(setup_database):
+async def connection(database):
+    """
+    Provide a connection inside an outer transaction rolled back after the test.
+
+    Sessions bound to it (see `session_factory`) turn their commits and
+    rollbacks into SAVEPOINTs, so nothing a test writes outlives the test.
+    """
+    async with testing_async_engine.connect() as conn:
+        transaction = await conn.begin()
+        yield conn
+        if transaction.is_active:
+            await transaction.rollback()
+
+
+@pytest.fixture
+def session_factory(connection):
+    """Provide a session factory bound to the test's rolled-back transaction."""
+    return async_sessionmaker(
+        bind=connection,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
+
+
+@pytest.fixture
+async def client(session_factory):
     """Provide a test client with overridden DB session."""
-    async with testing_async_session() as session:
+    async with session_factory() as session:
 
         async def override_get_db():
             yield session
 
         app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_read_sessionmaker] = lambda: session_factory
 
         async with AsyncClient(
             transport=ASGITransport(app=app), base_url="http://test"
@@ -46,4 +117,93 @@ async def client(setup_database):
             yield ac
 
         app.dependency_overrides.clear()
-        await session.close()
+
+
+@pytest.fixture
+async def committed_database(database):
+    """
+    Let a test commit for real and empty all tables afterwards.
+
+    For tests that need truly concurrent transactions, which a single
+    rolled-back connection cannot provide.
+    """
+    yield
+
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+    async with testing_async_engine.begin() as conn:
+        await conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+
+
+@pytest.fixture
+async def concurrent_client(committed_database):
+    """Provide a test client that opens a separate DB session per request."""
+
+    async def override_get_db():
+        async with testing_async_session() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_sessionmaker] = lambda: testing_async_session
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        yield ac
+
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def engine(database):
+    """Provide the test DB engine."""
+    return testing_async_engine
+
+
+@pytest.fixture
+def statements():
+    """Collect SQL statements issued through the test engine."""
+    issued = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith(SAVEPOINT_PREFIXES):
+            issued.append(statement)
+
+    event.listen(
+        testing_async_engine.sync_engine, "before_cursor_execute", before_cursor_execute
+    )
+    yield issued
+    event.remove(
+        testing_async_engine.sync_engine, "before_cursor_execute", before_cursor_execute
+    )
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Fail the test if a block issues more SQL statements than budgeted.
+
+    Usage:
+        with query_budget(1):
+            await client.delete(f"/tables/{table_id}")
+    """
+    install_profiler(testing_async_engine)
+
+    @contextmanager
+    def budget(max_queries: int):
+        with profile_queries() as profile:
+            yield profile
+        profile.statements = [
+            statement
+            for statement in profile.statements
+            if not statement.statement.startswith(SAVEPOINT_PREFIXES)
+        ]
+        if profile.count > max_queries:
+            issued = "\n".join(
+                f"  {statement.statement}" for statement in profile.statements
+            )
+            pytest.fail(
+                f"{profile.count} SQL statements issued, budget is {max_queries}:\n"
+                f"{issued}"
+            )
+
+    return budget
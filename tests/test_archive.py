@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.repositories.reservation_archive_repo import ReservationArchiveRepository
+from app.services import reservation_archive_service
+from app.services.reservation_archive_service import ReservationArchiveService
+
+
+ARCHIVE_BEFORE = datetime(2030, 2, 1)
+
+
+async def create_table(client, name: str = "Archive") -> int:
+    response = await client.post("/tables/", json={"name": name, "seats": 2})
+    return response.json()["id"]
+
+
+async def book(client, table_id: int, start: datetime) -> int:
+    response = await client.post(
+        "/reservations/",
+        json={
+            "customer_name": "John Doe",
+            "table_id": table_id,
+            "reservation_time": start.isoformat(),
+            "duration_minutes": 60,
+        },
+    )
+    return response.json()["id"]
+
+
+async def archive(session_factory, **kwargs) -> int:
+    async with session_factory() as session:
+        service = ReservationArchiveService(ReservationArchiveRepository(session))
+        return await service.archive(
+            **{
+                "before": ARCHIVE_BEFORE,
+                "batch_size": 2,
+                "pause_seconds": 0,
+                "lock_timeout_seconds": 1,
+                **kwargs,
+            }
+        )
+
+
+async def test_archive_moves_old_reservations_in_batches(client, session_factory):
+    """Тест на перенос в архив пакетами только броней старше горизонта"""
+    table_id = await create_table(client)
+    old_ids = [
+        await book(client, table_id, datetime(2030, 1, day, 19, 0)) for day in range(1, 6)
+    ]
+    recent_id = await book(client, table_id, datetime(2030, 2, 1, 19, 0))
+
+    assert await archive(session_factory, max_batches=1) == 2
+    assert await archive(session_factory) == 3
+    assert await archive(session_factory) == 0
+
+    response = await client.get("/reservations/")
+    assert [r["id"] for r in response.json()["items"]] == [recent_id]
+
+    response = await client.get("/reservations/archive")
+    items = response.json()["items"]
+    assert [r["id"] for r in items] == old_ids
+    assert items[0]["reservation_time"] == "2030-01-01T19:00:00"
+    assert items[0]["archived_at"]
+
+    # Архивная бронь больше не занимает слот.
+    response = await client.post(
+        "/reservations/",
+        json={
+            "customer_name": "Jane Doe",
+            "table_id": table_id,
+            "reservation_time": datetime(2030, 1, 1, 19, 0).isoformat(),
+            "duration_minutes": 60,
+        },
+    )
+    assert response.status_code == 201
+
+
+async def test_archive_filters_and_pages(client, session_factory):
+    """Тест на фильтры и keyset-пагинацию архива"""
+    first = await create_table(client, "First")
+    second = await create_table(client, "Second")
+    for day in range(1, 4):
+        await book(client, first, datetime(2030, 1, day, 19, 0))
+        await book(client, second, datetime(2030, 1, day, 19, 0))
+    await archive(session_factory, batch_size=100)
+
+    response = await client.get(
+        "/reservations/archive", params={"table_id": second, "limit": 2}
+    )
+    page = response.json()
+    assert [r["table_id"] for r in page["items"]] == [second, second]
+    response = await client.get(
+        "/reservations/archive",
+        params={"table_id": second, "limit": 2, "cursor": page["next_cursor"]},
+    )
+    page = response.json()
+    assert [r["reservation_time"] for r in page["items"]] == ["2030-01-03T19:00:00"]
+    assert page["next_cursor"] is None
+
+    response = await client.get(
+        "/reservations/archive",
+        params={"start": "2030-01-02T00:00:00", "end": "2030-01-03T00:00:00"},
+    )
+    assert len(response.json()["items"]) == 2
+
+    response = await client.get("/reservations/archive", params={"cursor": "broken"})
+    assert response.status_code == 400
+
+
+async def test_archive_gives_up_on_locked_tables(
+    concurrent_client, engine, monkeypatch
+):
+    """Тест на отказ переноса, не дождавшегося блокировок столиков, вместо ожидания"""
+    monkeypatch.setattr(reservation_archive_service, "ARCHIVE_LOCK_ATTEMPTS", 2)
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+    table_id = await create_table(concurrent_client)
+    await book(concurrent_client, table_id, datetime(2030, 1, 1, 19, 0))
+
+    # Незавершенное бронирование этого столика держит блокировку его строки.
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        await conn.execute(
+            text("UPDATE tables SET seats = seats WHERE id = :id"), {"id": table_id}
+        )
+        started = datetime.now()
+        with pytest.raises(DBAPIError) as error:
+            await archive(session_factory, lock_timeout_seconds=0.05)
+        assert error.value.orig.sqlstate == "55P03"
+        assert datetime.now() - started < timedelta(seconds=1)
+        await transaction.rollback()
+
+    assert await archive(session_factory) == 1
@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import db_settings
+from app.dependencies import services
+from app.services import availability_index as availability_index_module
+from app.services.availability_index import AvailabilityIndex, TableIntervals
+
+
+@pytest.fixture
+def availability_index(monkeypatch):
+    """Включает индекс доступности со свежим экземпляром на время теста."""
+    index = AvailabilityIndex(ttl_seconds=60)
+    monkeypatch.setattr(services, "availability_index", index)
+    monkeypatch.setattr(db_settings, "availability_index_enabled", True)
+    return index
+
+
+def reservation_json(table_id: int, start: datetime, duration: int = 60) -> dict:
+    return {
+        "customer_name": "Guest",
+        "table_id": table_id,
+        "reservation_time": start.isoformat(),
+        "duration_minutes": duration,
+    }
+
+
+def test_table_intervals_is_free():
+    """Тест на поиск свободного интервала, вставку и удаление в индексе столика"""
+    base = datetime(2030, 1, 1, 12, 0)
+    intervals = TableIntervals(
+        0,
+        [
+            (1, base, base + timedelta(hours=1)),
+            (2, base + timedelta(hours=3), base + timedelta(hours=4)),
+        ],
+    )
+
+    assert intervals.is_free(base + timedelta(hours=1), base + timedelta(hours=3))
+    assert not intervals.is_free(base + timedelta(minutes=30), base + timedelta(hours=2))
+    assert not intervals.is_free(base - timedelta(hours=1), base + timedelta(hours=5))
+
+    intervals.add(3, base + timedelta(hours=1), base + timedelta(hours=2))
+    assert intervals.ids == [1, 3, 2]
+    assert not intervals.is_free(base + timedelta(hours=1), base + timedelta(hours=3))
+
+    assert intervals.remove(3)
+    assert not intervals.remove(3)
+    assert intervals.is_free(base + timedelta(hours=1), base + timedelta(hours=3))
+
+    intervals.prune(base + timedelta(hours=2))
+    assert intervals.ids == [2]
+    assert intervals.start_by_id == {2: base + timedelta(hours=3)}
+    intervals.add(4, base, base + timedelta(hours=1))
+    assert intervals.ids == [2]
+
+
+async def test_index_conflict_and_delete(client, availability_index):
+    """Тест на конфликт и освобождение слота при включенном индексе"""
+    response = await client.post("/tables/", json={"name": "Indexed", "seats": 2})
+    table_id = response.json()["id"]
+    start = datetime(2030, 1, 1, 19, 0)
+
+    response = await client.post("/reservations/", json=reservation_json(table_id, start))
+    assert response.status_code == 201
+    reservation_id = response.json()["id"]
+
+    response = await client.post(
+        "/reservations/",
+        json=reservation_json(table_id, start + timedelta(minutes=30)),
+    )
+    assert response.status_code == 409
+
+    response = await client.delete(f"/reservations/{reservation_id}")
+    assert response.status_code == 204
+    assert availability_index._tables[table_id].ids == []
+
+    response = await client.post(
+        "/reservations/",
+        json=reservation_json(table_id, start + timedelta(minutes=30)),
+    )
+    assert response.status_code == 201
+
+
+async def test_index_detects_changes_from_other_workers(
+    client, availability_index, monkeypatch
+):
+    """Тест на перезагрузку индекса после изменений, сделанных в обход него"""
+    response = await client.post("/tables/", json={"name": "Shared", "seats": 2})
+    table_id = response.json()["id"]
+    start = datetime(2030, 1, 1, 19, 0)
+
+    response = await client.post("/reservations/", json=reservation_json(table_id, start))
+    reservation_id = response.json()["id"]
+    response = await client.post("/reservations/", json=reservation_json(table_id, start))
+    assert response.status_code == 409
+
+    # "Другой воркер" удаляет бронь, не зная о нашем индексе.
+    monkeypatch.setattr(db_settings, "availability_index_enabled", False)
+    response = await client.delete(f"/reservations/{reservation_id}")
+    assert response.status_code == 204
+    monkeypatch.setattr(db_settings, "availability_index_enabled", True)
+
+    response = await client.post("/reservations/", json=reservation_json(table_id, start))
+    assert response.status_code == 201
+
+
+async def test_index_skips_past_reservations(client, availability_index, monkeypatch):
+    """Тест на загрузку в индекс только текущих броней и проверку прошедших слотов по БД"""
+    now = datetime(2030, 1, 2, 12, 0)
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now
+
+    monkeypatch.setattr(availability_index_module, "datetime", FrozenDatetime)
+    response = await client.post("/tables/", json={"name": "History", "seats": 2})
+    table_id = response.json()["id"]
+    past = datetime(2030, 1, 1, 19, 0)
+    future = datetime(2030, 1, 3, 19, 0)
+    await client.post("/reservations/", json=reservation_json(table_id, past))
+    response = await client.post("/reservations/", json=reservation_json(table_id, future))
+    future_id = response.json()["id"]
+
+    for start, available in ((past, False), (future, False), (future - timedelta(hours=2), True)):
+        response = await client.get(
+            "/reservations/availability",
+            params={"table_id": table_id, "start": start.isoformat(), "duration_minutes": 60},
+        )
+        assert response.status_code == 200
+        assert response.json()["available"] is available
+
+    assert availability_index._tables[table_id].ids == [future_id]
+
+
+async def test_availability_endpoint_uses_index(client, availability_index, statements):
+    """Тест на проверку слота через эндпоинт без запросов к БД"""
+    response = await client.post("/tables/", json={"name": "Lookup", "seats": 2})
+    table_id = response.json()["id"]
+    start = datetime(2030, 1, 1, 19, 0)
+    await client.post("/reservations/", json=reservation_json(table_id, start))
+    params = {"table_id": table_id, "start": start.isoformat(), "duration_minutes": 30}
+
+    statements.clear()
+    response = await client.get("/reservations/availability", params=params)
+    assert response.json() == {
+        "table_id": table_id,
+        "reservation_time": start.isoformat(),
+        "duration_minutes": 30,
+        "available": False,
+    }
+    assert statements == []
+
+    response = await client.get(
+        "/reservations/availability", params={**params, "table_id": table_id + 1000}
+    )
+    assert response.status_code == 404
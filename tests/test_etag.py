@@ -0,0 +1,126 @@
+from datetime import datetime
+
+
+async def create_table(client, name: str = "Etag") -> int:
+    response = await client.post("/tables/", json={"name": name, "seats": 2})
+    return response.json()["id"]
+
+
+async def create_reservation(client, table_id: int, hour: int = 19) -> dict:
+    response = await client.post(
+        "/reservations/",
+        json={
+            "customer_name": "John Doe",
+            "table_id": table_id,
+            "reservation_time": datetime(2030, 1, 1, hour, 0).isoformat(),
+            "duration_minutes": 60,
+        },
+    )
+    return response.json()
+
+
+async def test_table_list_not_modified(client, statements):
+    """Тест на ответ 304 для неизмененного списка столиков одним легким запросом"""
+    await create_table(client)
+    response = await client.get("/tables/")
+    etag = response.headers["ETag"]
+
+    statements.clear()
+    response = await client.get("/tables/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+    assert len(statements) == 1
+    assert "FROM cache_generations" in statements[0]
+    assert "FROM tables" not in statements[0]
+
+
+async def test_reservation_list_not_modified(client, statements):
+    """Тест на ответ 304 для неизмененного списка броней одним легким запросом"""
+    table_id = await create_table(client)
+    await create_reservation(client, table_id)
+    response = await client.get("/reservations/", params={"table_id": table_id})
+    etag = response.headers["ETag"]
+
+    statements.clear()
+    response = await client.get(
+        "/reservations/",
+        params={"table_id": table_id},
+        headers={"If-None-Match": etag},
+    )
+    assert response.status_code == 304
+    assert len(statements) == 1
+    assert "FROM reservations" not in statements[0]
+
+
+async def test_list_etag_changes(client):
+    """Тест на смену ETag списков при изменении данных и параметров запроса"""
+    table_id = await create_table(client)
+    tables_etag = (await client.get("/tables/")).headers["ETag"]
+    reservations_etag = (await client.get("/reservations/")).headers["ETag"]
+    assert (await client.get("/tables/?limit=1")).headers["ETag"] != tables_etag
+
+    reservation = await create_reservation(client, table_id)
+    response = await client.get(
+        "/reservations/", headers={"If-None-Match": reservations_etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != reservations_etag
+
+    await client.delete(f"/reservations/{reservation['id']}")
+    etag = (await client.get("/reservations/")).headers["ETag"]
+    assert etag not in (reservations_etag, response.headers["ETag"])
+
+    await create_table(client, "Another")
+    response = await client.get("/tables/", headers={"If-None-Match": tables_etag})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 2
+
+
+async def test_item_etag(client):
+    """Тест на ETag отдельных столика и брони"""
+    table_id = await create_table(client)
+    reservation = await create_reservation(client, table_id)
+
+    for url in (f"/tables/{table_id}", f"/reservations/{reservation['id']}"):
+        response = await client.get(url)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        response = await client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    response = await client.get(f"/reservations/{reservation['id']}")
+    assert response.json() == reservation
+    assert (await client.get("/reservations/999999")).status_code == 404
+
+
+async def test_delete_reservation_if_match(client):
+    """Тест на отмену брони с If-Match: повторная отмена по тому же ETag отклоняется"""
+    table_id = await create_table(client)
+    reservation = await create_reservation(client, table_id)
+    url = f"/reservations/{reservation['id']}"
+    etag = (await client.get(url)).headers["ETag"]
+
+    response = await client.delete(url, headers={"If-Match": '"1.1"'})
+    assert response.status_code == 412
+
+    response = await client.delete(url, headers={"If-Match": etag})
+    assert response.status_code == 204
+
+    response = await client.delete(url, headers={"If-Match": etag})
+    assert response.status_code == 412
+
+
+async def test_delete_table_if_match(client):
+    """Тест на удаление столика с If-Match после изменения его броней"""
+    table_id = await create_table(client)
+    url = f"/tables/{table_id}"
+    etag = (await client.get(url)).headers["ETag"]
+
+    await create_reservation(client, table_id)
+    response = await client.delete(url, headers={"If-Match": etag})
+    assert response.status_code == 412
+
+    etag = (await client.get(url)).headers["ETag"]
+    response = await client.delete(url, headers={"If-Match": etag})
+    assert response.status_code == 204
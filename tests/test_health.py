@@ -0,0 +1,63 @@
+from sqlalchemy import text
+
+from app.core.config import db_settings
+from app.core.database import create_engine
+
+
+async def test_pool_status(client):
+    """Тест на получение состояния пула соединений"""
+    response = await client.get("/health/pool")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["size"] == db_settings.db_pool_size
+    assert data["max_overflow"] == db_settings.db_max_overflow
+    assert data["checked_out"] >= 0
+    assert data["idle"] >= 0
+
+
+async def test_pool_counts_checkouts(engine):
+    """Тест на учет выдачи соединений и времени ожидания в пуле"""
+    pool = engine.pool
+    checkouts = pool.checkouts
+
+    async with engine.connect() as conn:
+        assert pool.stats()["checked_out"] == 1
+        await conn.execute(text("SELECT 1"))
+
+    stats = pool.stats()
+    assert stats["checkouts"] == checkouts + 1
+    assert stats["checked_out"] == 0
+    assert stats["wait_seconds_total"] >= stats["wait_seconds_max"] >= 0
+
+
+async def test_pool_connect_time_is_not_wait_time():
+    """Тест на учет открытия нового соединения отдельно от ожидания в пуле"""
+    engine = create_engine(db_settings.test_database_url)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        stats = engine.pool.stats()
+        assert stats["connects"] == 1
+        assert stats["connect_seconds_total"] > 0
+        assert stats["wait_seconds_total"] < stats["connect_seconds_total"]
+
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        assert engine.pool.stats()["connects"] == 1
+    finally:
+        await engine.dispose()
+
+
+async def test_pgbouncer_mode_disables_statement_cache():
+    """Тест на работу без кэша подготовленных выражений в режиме PgBouncer"""
+    settings = db_settings.model_copy(update={"db_pgbouncer": True})
+    engine = create_engine(db_settings.test_database_url, settings)
+    try:
+        async with engine.connect() as conn:
+            for _ in range(2):
+                result = await conn.execute(text("SELECT CAST(:value AS integer)"), {"value": 1})
+                assert result.scalar() == 1
+            raw = await conn.get_raw_connection()
+            assert raw.driver_connection._stmt_cache.get_max_size() == 0
+    finally:
+        await engine.dispose()
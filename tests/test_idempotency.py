@@ -0,0 +1,187 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.dependencies.services import idempotency_service
+from app.models.reservation import Reservation
+from app.models.table import Table
+from app.services.idempotency_service import (
+    IdempotencyKeyInProgressError,
+    IdempotencyService,
+)
+
+
+RESERVATION = {
+    "customer_name": "John Doe",
+    "reservation_time": datetime(2030, 1, 1, 19, 0).isoformat(),
+    "duration_minutes": 60,
+}
+
+
+@pytest.fixture
+def idempotency(monkeypatch, session_factory):
+    """Store idempotency keys in the test's rolled-back transaction."""
+    monkeypatch.setattr(idempotency_service, "session_factory", session_factory)
+    return idempotency_service
+
+
+async def test_replay_returns_stored_response(client, idempotency, query_budget):
+    """Тест на повтор запроса с тем же ключом: сохраненный ответ без создания"""
+    headers = {"Idempotency-Key": "create-table-1"}
+    first = await client.post(
+        "/tables/", json={"name": "Once", "seats": 2}, headers=headers
+    )
+    assert first.status_code == 201
+    assert "idempotent-replayed" not in first.headers
+
+    # Ключ занят и прочитан, к столикам повтор не обращается.
+    with query_budget(2) as profile:
+        replay = await client.post(
+            "/tables/", json={"name": "Once", "seats": 2}, headers=headers
+        )
+    assert not any("tables" in s.statement for s in profile.statements)
+    assert replay.status_code == 201
+    assert replay.headers["idempotent-replayed"] == "true"
+    assert replay.json() == first.json()
+
+    response = await client.get("/tables/")
+    assert [t["name"] for t in response.json()["items"]] == ["Once"]
+
+
+async def test_replay_of_conflict(client, idempotency):
+    """Тест на повтор ответа 409: повтор не бронирует освободившийся слот"""
+    table = await client.post("/tables/", json={"name": "Busy", "seats": 2})
+    reservation = {**RESERVATION, "table_id": table.json()["id"]}
+    booked = await client.post("/reservations/", json=reservation)
+
+    headers = {"Idempotency-Key": "late-booking"}
+    conflict = await client.post("/reservations/", json=reservation, headers=headers)
+    assert conflict.status_code == 409
+
+    await client.delete(f"/reservations/{booked.json()['id']}")
+    replay = await client.post("/reservations/", json=reservation, headers=headers)
+    assert replay.status_code == 409
+    assert replay.headers["idempotent-replayed"] == "true"
+
+
+async def test_key_reused_with_different_body(client, idempotency):
+    """Тест на ключ, повторно использованный с другим телом запроса"""
+    headers = {"Idempotency-Key": "reused"}
+    await client.post("/tables/", json={"name": "First", "seats": 2}, headers=headers)
+    response = await client.post(
+        "/tables/", json={"name": "Second", "seats": 2}, headers=headers
+    )
+    assert response.status_code == 422
+
+    # Тот же ключ на другом маршруте — другой ключ.
+    table_id = (await client.get("/tables/")).json()["items"][0]["id"]
+    response = await client.post(
+        "/reservations/", json={**RESERVATION, "table_id": table_id}, headers=headers
+    )
+    assert response.status_code == 201
+
+
+async def test_invalid_key(client, idempotency):
+    """Тест на пустой и слишком длинный ключ идемпотентности"""
+    for key in ("", "k" * 256):
+        response = await client.post(
+            "/tables/",
+            json={"name": "Invalid", "seats": 2},
+            headers={"Idempotency-Key": key},
+        )
+        assert response.status_code == 400
+
+
+async def test_key_in_progress_and_release(session_factory):
+    """Тест на ожидание незавершенного запроса и освобождение ключа"""
+    service = IdempotencyService(
+        session_factory, ttl_seconds=60, lease_seconds=60, wait_seconds=0.1
+    )
+    claim = await service.begin("k", "POST /tables/", "f")
+    assert claim.status_code is None
+    with pytest.raises(IdempotencyKeyInProgressError):
+        await service.begin("k", "POST /tables/", "f")
+
+    await service.release(claim)
+    claim = await service.begin("k", "POST /tables/", "f")
+    assert claim.status_code is None
+    assert await service.complete(claim, 201, "application/json", b"{}")
+    record = await service.begin("k", "POST /tables/", "f")
+    assert (record.status_code, record.body) == (201, b"{}")
+
+
+async def test_sweep_and_reclaim_expired_keys(session_factory):
+    """Тест на удаление устаревших ключей и повторное использование истекшего"""
+    service = IdempotencyService(
+        session_factory, ttl_seconds=3600, lease_seconds=60, wait_seconds=0
+    )
+    for key in ("old", "expired", "fresh"):
+        claim = await service.begin(key, "POST /tables/", "f")
+        await service.complete(claim, 201, None, b"")
+
+    async with session_factory() as session:
+        await session.execute(
+            text(
+                "UPDATE idempotency_keys SET created_at = now() - interval '2 hours' "
+                "WHERE key IN ('old', 'expired')"
+            )
+        )
+        await session.commit()
+
+    # Истекший ключ занимается заново, даже если его еще не удалили.
+    assert (await service.begin("expired", "POST /tables/", "other")).status_code is None
+    assert await service.sweep() == 1
+    assert (await service.begin("fresh", "POST /tables/", "f")).status_code == 201
+
+
+async def test_expired_lease_loses_ownership(session_factory):
+    """Тест на запрет сохранить ответ и освободить ключ после истечения аренды"""
+    service = IdempotencyService(
+        session_factory, ttl_seconds=60, lease_seconds=0, wait_seconds=0
+    )
+    slow = await service.begin("k", "POST /tables/", "f")
+    # Аренда медленного запроса истекла, и ключ занял повтор.
+    retry = await service.begin("k", "POST /tables/", "f")
+    assert retry.created_at != slow.created_at
+
+    await service.release(slow)
+    assert not await service.complete(slow, 500, None, b"stale")
+    assert await service.complete(retry, 201, None, b"fresh")
+    assert not await service.complete(slow, 201, None, b"stale")
+
+    record = await service.begin("k", "POST /tables/", "f")
+    assert (record.status_code, record.body) == (201, b"fresh")
+
+
+async def test_concurrent_duplicates_wait_for_first(
+    concurrent_client, engine, monkeypatch
+):
+    """Тест на параллельные запросы с одним ключом: бронь создается один раз"""
+    monkeypatch.setattr(
+        idempotency_service,
+        "session_factory",
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+    )
+    table = await concurrent_client.post("/tables/", json={"name": "Hot", "seats": 2})
+    reservation = {**RESERVATION, "table_id": table.json()["id"]}
+
+    responses = await asyncio.gather(
+        *(
+            concurrent_client.post(
+                "/reservations/",
+                json=reservation,
+                headers={"Idempotency-Key": "double-click"},
+            )
+            for _ in range(20)
+        )
+    )
+    assert {r.status_code for r in responses} == {201}
+    assert len({r.json()["id"] for r in responses}) == 1
+    assert sum("idempotent-replayed" in r.headers for r in responses) == 19
+
+    async with AsyncSession(engine) as session:
+        assert await session.scalar(select(func.count()).select_from(Reservation)) == 1
+        assert await session.scalar(select(func.count()).select_from(Table)) == 1
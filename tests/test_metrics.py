@@ -0,0 +1,71 @@
+from datetime import datetime
+
+from app.core.metrics import Histogram, instrument_engine
+
+
+def metric_value(text: str, sample: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(sample + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_histogram_render():
+    """Тест на вывод гистограммы с накопительными корзинами"""
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, "/a")
+
+    lines = histogram.render()
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{route="/a"} 4.05' in lines
+    assert 'latency_seconds_count{route="/a"} 4' in lines
+
+
+async def test_request_metrics(client):
+    """Тест на учет длительности запросов по шаблону маршрута"""
+    sample = (
+        'http_request_duration_seconds_count'
+        '{method="DELETE",route="/tables/{table_id}",status="404"}'
+    )
+    before = metric_value((await client.get("/metrics")).text, sample)
+    await client.delete("/tables/999999")
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert metric_value(response.text, sample) == before + 1
+    assert "http_requests_in_flight 1" in response.text
+    assert 'db_pool_connections{state="idle"}' in response.text
+
+
+async def test_statement_metrics(client, engine):
+    """Тест на учет времени и числа SQL-запросов"""
+    instrument_engine(engine)
+    sample = 'db_statement_duration_seconds_count{operation="INSERT"}'
+    before = metric_value((await client.get("/metrics")).text, sample)
+
+    await client.post("/tables/", json={"name": "Measured", "seats": 2})
+    text = (await client.get("/metrics")).text
+    assert metric_value(text, sample) == before + 1
+
+
+async def test_conflict_metrics(client):
+    """Тест на учет отклоненных из-за конфликта броней"""
+    table = await client.post("/tables/", json={"name": "Busy", "seats": 2})
+    payload = {
+        "customer_name": "John Doe",
+        "table_id": table.json()["id"],
+        "reservation_time": datetime(2030, 1, 1, 19, 0).isoformat(),
+        "duration_minutes": 60,
+    }
+    sample = 'reservation_conflicts_total{source="constraint"}'
+    before = metric_value((await client.get("/metrics")).text, sample)
+
+    assert (await client.post("/reservations/", json=payload)).status_code == 201
+    assert (await client.post("/reservations/", json=payload)).status_code == 409
+    text = (await client.get("/metrics")).text
+    assert metric_value(text, sample) == before + 1
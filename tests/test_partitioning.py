@@ -0,0 +1,138 @@
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, text
+
+from app.repositories.reservation_repo import ReservationRepository
+from app.repositories.table_repo import TableRepository
+
+
+async def create_table(client) -> int:
+    response = await client.post("/tables/", json={"name": "Partitioned", "seats": 2})
+    return response.json()["id"]
+
+
+async def book(client, table_id: int, start: datetime, minutes: int):
+    return await client.post(
+        "/reservations/",
+        json={
+            "customer_name": "John Doe",
+            "table_id": table_id,
+            "reservation_time": start.isoformat(),
+            "duration_minutes": minutes,
+        },
+    )
+
+
+@pytest.fixture
+def scanned_partitions(connection):
+    """
+    Collect the partitions of `reservations` each SELECT actually reads.
+
+    Every SELECT issued through the test connection is re-run with
+    EXPLAIN ANALYZE; partitions pruned at plan or run time do not show up.
+    """
+    issued = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT"):
+            issued.append((statement, parameters))
+
+    sync_engine = connection.sync_connection.engine
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    async def collect() -> list[set[str]]:
+        event.remove(sync_engine, "before_cursor_execute", before_cursor_execute)
+        scanned = []
+        for statement, parameters in issued:
+            result = await connection.exec_driver_sql(
+                f"EXPLAIN (ANALYZE, COSTS OFF, TIMING OFF, SUMMARY OFF) {statement}",
+                parameters,
+            )
+            plan = "\n".join(
+                line for line in result.scalars() if "never executed" not in line
+            )
+            scanned.append(
+                set(re.findall(r" on (reservations_(?:\d{4}_\d{2}|default))\b", plan))
+            )
+        return scanned
+
+    yield collect
+    if event.contains(sync_engine, "before_cursor_execute", before_cursor_execute):
+        event.remove(sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def test_create_partitions_moves_default_rows(client, session_factory):
+    """Тест на создание партиций с переносом броней из партиции по умолчанию"""
+    table_id = await create_table(client)
+    await book(client, table_id, datetime(2030, 1, 15, 19, 0), 60)
+
+    async with session_factory() as session:
+        repo = ReservationRepository(session)
+        assert await repo.create_partitions(datetime(2030, 1, 20), 2) == [
+            "reservations_2030_01",
+            "reservations_2030_02",
+        ]
+        # Повторный вызов ничего не меняет.
+        assert await repo.create_partitions(datetime(2030, 1, 1), 1) == [
+            "reservations_2030_01"
+        ]
+        partition = await session.scalar(
+            text("SELECT tableoid::regclass::text FROM reservations")
+        )
+    assert partition == "reservations_2030_01"
+
+    response = await book(client, table_id, datetime(2030, 1, 15, 19, 30), 60)
+    assert response.status_code == 409
+
+
+@pytest.mark.parametrize("first_start, second_start", [
+    (datetime(2030, 1, 31, 23, 0), datetime(2030, 2, 1, 0, 30)),
+    (datetime(2030, 2, 1, 0, 30), datetime(2030, 1, 31, 23, 0)),
+])
+async def test_overlap_across_month_boundary(
+    client, session_factory, first_start, second_start
+):
+    """Тест на пересечение броней из соседних месячных партиций"""
+    async with session_factory() as session:
+        await ReservationRepository(session).create_partitions(datetime(2030, 1, 1), 2)
+    table_id = await create_table(client)
+
+    first = await book(client, table_id, first_start, 120)
+    assert first.status_code == 201
+    second = await book(client, table_id, second_start, 120)
+    assert second.status_code == 409
+
+    response = await book(client, table_id, datetime(2030, 2, 1, 3, 0), 60)
+    assert response.status_code == 201
+
+
+async def test_duration_limit(client):
+    """Тест на ограничение длительности брони сутками"""
+    table_id = await create_table(client)
+    response = await book(client, table_id, datetime(2030, 1, 1, 12, 0), 24 * 60 + 1)
+    assert response.status_code == 422
+
+
+async def test_conflict_queries_prune_partitions(
+    client, session_factory, scanned_partitions
+):
+    """Тест на чтение проверками конфликтов и свободных слотов только нужных партиций"""
+    async with session_factory() as session:
+        await ReservationRepository(session).create_partitions(datetime(2030, 1, 1), 12)
+    table_id = await create_table(client)
+    start = datetime(2030, 6, 15, 19, 0)
+
+    async with session_factory() as session:
+        repo = ReservationRepository(session)
+        await repo.has_conflict(table_id, start, 60)
+        await repo.find_conflicting([(table_id, start, start + timedelta(hours=1))])
+        await TableRepository(session).get_free_slots(
+            start, start + timedelta(hours=3), party_size=2, slot_minutes=30
+        )
+
+    has_conflict, find_conflicting, free_slots = await scanned_partitions()
+    assert has_conflict == {"reservations_2030_06"}
+    assert find_conflicting == {"reservations_2030_06"}
+    assert free_slots == {"reservations_2030_06"}
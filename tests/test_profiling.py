@@ -0,0 +1,100 @@
+import json
+import logging
+from datetime import datetime
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.middleware import ProfilingMiddleware
+from app.core.profiling import ProfiledStatement, QueryProfile, install_profiler
+from app.main import app
+
+
+RESERVATION = {
+    "customer_name": "John Doe",
+    "reservation_time": datetime(2030, 1, 1, 19, 0).isoformat(),
+    "duration_minutes": 60,
+}
+
+
+async def test_endpoint_query_budgets(client, query_budget):
+    """Тест на бюджет SQL-запросов основных эндпоинтов"""
+    with query_budget(1):
+        table = await client.post("/tables/", json={"name": "Budget", "seats": 2})
+    table_id = table.json()["id"]
+
+    with query_budget(1):
+        reservation = await client.post(
+            "/reservations/", json={**RESERVATION, "table_id": table_id}
+        )
+    reservation_id = reservation.json()["id"]
+
+    with query_budget(2):
+        await client.get("/tables/")
+    with query_budget(2):
+        await client.get("/reservations/")
+    with query_budget(1):
+        await client.get(f"/reservations/{reservation_id}")
+    with query_budget(1):
+        await client.delete(f"/reservations/{reservation_id}")
+    with query_budget(1):
+        await client.delete(f"/tables/{table_id}")
+
+
+async def test_query_budget_exceeded(client, query_budget):
+    """Тест на провал теста при превышении бюджета SQL-запросов"""
+    table = await client.post("/tables/", json={"name": "Budget", "seats": 2})
+
+    with pytest.raises(pytest.fail.Exception, match="budget is 0"):
+        with query_budget(0):
+            await client.delete(f"/tables/{table.json()['id']}")
+
+
+def test_repeated_statements():
+    """Тест на обнаружение N+1: один запрос, выполненный много раз"""
+    profile = QueryProfile()
+    profile.statements = [
+        ProfiledStatement("SELECT * FROM tables", 0.001, 10),
+        *(
+            ProfiledStatement("SELECT * FROM reservations WHERE table_id = $1", 0.001, 1)
+            for _ in range(10)
+        ),
+    ]
+    assert profile.repeated(5) == {
+        "SELECT * FROM reservations WHERE table_id = $1": 10
+    }
+    assert profile.repeated(11) == {}
+
+
+async def test_middleware_logs_over_budget(concurrent_client, engine, caplog):
+    """Тест на запись в лог запроса, превысившего бюджет SQL-запросов"""
+    # Сессия на запрос без SAVEPOINT тестовой транзакции: в профиль
+    # попадают только запросы приложения.
+    install_profiler(engine)
+    profiled = ProfilingMiddleware(app, max_queries=0)
+    async with AsyncClient(
+        transport=ASGITransport(app=profiled), base_url="http://test"
+    ) as profiled_client:
+        with caplog.at_level(logging.WARNING, logger="app.core.middleware"):
+            await profiled_client.post("/tables/", json={"name": "Logged", "seats": 2})
+
+    [record] = caplog.records
+    line = json.loads(record.getMessage())
+    assert line["event"] == "request_over_budget"
+    assert line["problems"] == ["query_count"]
+    assert line["route"] == "/tables/"
+    assert line["status"] == 201
+    assert line["query_count"] == 1
+
+
+async def test_middleware_within_budget(client, engine, caplog):
+    """Тест на отсутствие записи в лог для запроса в пределах бюджета"""
+    install_profiler(engine)
+    profiled = ProfilingMiddleware(app)
+    async with AsyncClient(
+        transport=ASGITransport(app=profiled), base_url="http://test"
+    ) as profiled_client:
+        with caplog.at_level(logging.WARNING, logger="app.core.middleware"):
+            await profiled_client.get("/tables/")
+
+    assert caplog.records == []
@@ -0,0 +1,94 @@
+from datetime import datetime
+
+
+async def create_table(client) -> int:
+    response = await client.post("/tables/", json={"name": "Counted", "seats": 2})
+    return response.json()["id"]
+
+
+async def create_reservation(client, table_id: int) -> int:
+    response = await client.post(
+        "/reservations/",
+        json={
+            "customer_name": "John Doe",
+            "table_id": table_id,
+            "reservation_time": datetime(2030, 1, 1, 19, 0).isoformat(),
+            "duration_minutes": 60,
+        },
+    )
+    return response.json()["id"]
+
+
+async def test_create_table_statements(client, statements):
+    """Тест на число запросов при создании столика: один INSERT ... RETURNING"""
+    await create_table(client)
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT INTO tables")
+    assert "RETURNING" in statements[0]
+
+
+async def test_delete_table_statements(client, statements):
+    """Тест на число запросов при удалении столика: один DELETE ... RETURNING"""
+    table_id = await create_table(client)
+    statements.clear()
+
+    response = await client.delete(f"/tables/{table_id}")
+    assert response.status_code == 204
+    assert len(statements) == 1
+    assert statements[0].startswith("DELETE FROM tables")
+
+
+async def test_create_reservation_statements(client, statements):
+    """Тест на число запросов при создании брони: один INSERT ... RETURNING"""
+    table_id = await create_table(client)
+    statements.clear()
+
+    await create_reservation(client, table_id)
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT INTO reservations")
+
+
+async def test_delete_reservation_statements(client, statements):
+    """Тест на число запросов при удалении брони: один DELETE ... RETURNING"""
+    table_id = await create_table(client)
+    reservation_id = await create_reservation(client, table_id)
+    statements.clear()
+
+    response = await client.delete(f"/reservations/{reservation_id}")
+    assert response.status_code == 204
+    assert len(statements) == 1
+    assert statements[0].startswith("DELETE FROM reservations")
+
+
+async def test_list_statements(client, statements):
+    """Тест на число запросов при получении страниц: версия для ETag и один SELECT"""
+    table_id = await create_table(client)
+    await create_reservation(client, table_id)
+    statements.clear()
+
+    await client.get("/tables/")
+    await client.get("/reservations/")
+    assert len(statements) == 4
+
+
+async def test_delete_table_with_reservations_statements(client, statements):
+    """Тест на число запросов при удалении столика с бронями: каскад выполняет БД"""
+    table_id = await create_table(client)
+    for hour in range(3):
+        await client.post(
+            "/reservations/",
+            json={
+                "customer_name": "John Doe",
+                "table_id": table_id,
+                "reservation_time": datetime(2030, 1, 1, 12 + hour, 0).isoformat(),
+                "duration_minutes": 60,
+            },
+        )
+    statements.clear()
+
+    response = await client.delete(f"/tables/{table_id}")
+    assert response.status_code == 204
+    assert len(statements) == 1
+
+    response = await client.get("/reservations/", params={"table_id": table_id})
+    assert response.json()["items"] == []
@@ -0,0 +1,42 @@
+from starlette.requests import Request
+
+from app.core import database
+from app.core.database import PRIMARY_PIN_COOKIE, get_read_sessionmaker
+
+
+def make_request(headers: list[tuple[bytes, bytes]]) -> Request:
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+def test_reads_go_to_replica(monkeypatch):
+    """Тест на чтение с реплики для клиента без недавних записей"""
+    replica = object()
+    monkeypatch.setattr(database, "replica_session", replica)
+    assert get_read_sessionmaker(make_request([])) is replica
+
+
+def test_pinned_reads_go_to_primary(monkeypatch):
+    """Тест на чтение с основной БД по cookie после записи или по заголовку"""
+    monkeypatch.setattr(database, "replica_session", object())
+    pinned_by_cookie = make_request([(b"cookie", f"{PRIMARY_PIN_COOKIE}=1".encode())])
+    pinned_by_header = make_request([(b"x-read-primary", b"1")])
+    assert get_read_sessionmaker(pinned_by_cookie) is database.async_session
+    assert get_read_sessionmaker(pinned_by_header) is database.async_session
+
+
+async def test_write_pins_client_to_primary(client):
+    """Тест на выдачу cookie закрепления за основной БД после успешной записи"""
+    response = await client.get("/tables/")
+    assert PRIMARY_PIN_COOKIE not in response.cookies
+
+    response = await client.post("/tables/", json={"name": "Pinned", "seats": 2})
+    assert response.status_code == 201
+    assert response.cookies[PRIMARY_PIN_COOKIE] == "1"
+    assert "Max-Age=" in response.headers["set-cookie"]
+
+
+async def test_failed_write_does_not_pin_client(client):
+    """Тест на отсутствие cookie закрепления после неуспешной записи"""
+    response = await client.delete("/tables/999999")
+    assert response.status_code == 404
+    assert PRIMARY_PIN_COOKIE not in response.cookies
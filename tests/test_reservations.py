@@ -1,3 +1,7 @@
+import asyncio
+import csv
+import io
+import json
 from datetime import datetime, timedelta
 
 
@@ -61,7 +65,7 @@ async def test_get_reservations_empty(client):
     """Тест на получение пустого списка бронирований"""
     response = await client.get("/reservations/")
     assert response.status_code == 200
-    assert response.json() == []
+    assert response.json()["items"] == []
 
 
 async def test_get_reservations(client):
@@ -84,8 +88,8 @@ async def test_get_reservations(client):
 
     response = await client.get("/reservations/")
     assert response.status_code == 200
-    assert len(response.json()) == 1
-    assert response.json()[0]["customer_name"] == "John Doe"
+    assert len(response.json()["items"]) == 1
+    assert response.json()["items"][0]["customer_name"] == "John Doe"
 
 
 async def test_delete_reservation_success(client):
@@ -110,10 +114,330 @@ async def test_delete_reservation_success(client):
     assert response.status_code == 204
 
     response = await client.get("/reservations/")
-    assert len(response.json()) == 0
+    assert len(response.json()["items"]) == 0
 
 
 async def test_delete_reservation_not_found(client):
     """Тест на попытку удаления несуществующего бронирования"""
     response = await client.delete("/reservations/9999999")
     assert response.status_code == 404
+
+
+async def test_create_reservation_adjacent_slots(client):
+    """Тест на бронирование встык к существующему (без пересечения)"""
+    response = await client.post(
+        "/tables/", json={"name": "Adjacent Table", "seats": 2, "location": "hall"}
+    )
+    table_id = response.json()["id"]
+
+    reservation_time = datetime(2030, 1, 1, 18, 0)
+
+    response = await client.post(
+        "/reservations/",
+        json={
+            "customer_name": "Alice",
+            "table_id": table_id,
+            "reservation_time": reservation_time.isoformat(),
+            "duration_minutes": 60,
+        },
+    )
+    assert response.status_code == 201
+
+    for start in (
+        reservation_time + timedelta(minutes=60),
+        reservation_time - timedelta(minutes=30),
+    ):
+        response = await client.post(
+            "/reservations/",
+            json={
+                "customer_name": "Bob",
+                "table_id": table_id,
+                "reservation_time": start.isoformat(),
+                "duration_minutes": 30,
+            },
+        )
+        assert response.status_code == 201
+
+
+async def test_create_reservation_conflict_with_earlier_long_reservation(client):
+    """Тест на конфликт с более ранним длинным бронированием и с вложенным"""
+    response = await client.post(
+        "/tables/", json={"name": "Long Table", "seats": 6, "location": "hall"}
+    )
+    table_id = response.json()["id"]
+
+    reservation_time = datetime(2030, 1, 1, 12, 0)
+
+    await client.post(
+        "/reservations/",
+        json={
+            "customer_name": "Banquet",
+            "table_id": table_id,
+            "reservation_time": reservation_time.isoformat(),
+            "duration_minutes": 240,
+        },
+    )
+
+    response = await client.post(
+        "/reservations/",
+        json={
+            "customer_name": "Bob",
+            "table_id": table_id,
+            "reservation_time": (reservation_time + timedelta(hours=3)).isoformat(),
+            "duration_minutes": 30,
+        },
+    )
+    assert response.status_code == 409
+
+    response = await client.post(
+        "/reservations/",
+        json={
+            "customer_name": "Carol",
+            "table_id": table_id,
+            "reservation_time": (reservation_time - timedelta(hours=1)).isoformat(),
+            "duration_minutes": 360,
+        },
+    )
+    assert response.status_code == 409
+
+
+async def test_concurrent_reservations_same_slot(concurrent_client):
+    """Тест на параллельные бронирования одного слота: успешно только одно"""
+    response = await concurrent_client.post(
+        "/tables/", json={"name": "Hot Table", "seats": 2, "location": "window"}
+    )
+    table_id = response.json()["id"]
+
+    reservation_time = datetime(2030, 1, 1, 19, 0)
+
+    async def book(i: int):
+        return await concurrent_client.post(
+            "/reservations/",
+            json={
+                "customer_name": f"Guest {i}",
+                "table_id": table_id,
+                "reservation_time": (
+                    reservation_time + timedelta(minutes=i % 30)
+                ).isoformat(),
+                "duration_minutes": 60,
+            },
+        )
+
+    responses = await asyncio.gather(*(book(i) for i in range(200)))
+    statuses = [r.status_code for r in responses]
+
+    assert statuses.count(201) == 1
+    assert statuses.count(409) == 199
+
+    response = await concurrent_client.get("/reservations/")
+    assert len(response.json()["items"]) == 1
+
+
+async def test_concurrent_reservations_overlapping_slots(concurrent_client):
+    """Тест на параллельные бронирования цепочки пересекающихся слотов: только 201 и 409"""
+    response = await concurrent_client.post(
+        "/tables/", json={"name": "Hot Table", "seats": 2, "location": "window"}
+    )
+    table_id = response.json()["id"]
+
+    reservation_time = datetime(2030, 1, 1, 19, 0)
+
+    async def book(i: int):
+        # Соседние слоты пересекаются, а слоты через один — нет.
+        return await concurrent_client.post(
+            "/reservations/",
+            json={
+                "customer_name": f"Guest {i}",
+                "table_id": table_id,
+                "reservation_time": (
+                    reservation_time + timedelta(minutes=30 * (i % 4))
+                ).isoformat(),
+                "duration_minutes": 60,
+            },
+        )
+
+    responses = await asyncio.gather(*(book(i) for i in range(200)))
+    statuses = [r.status_code for r in responses]
+    assert set(statuses) <= {201, 409}
+
+    response = await concurrent_client.get("/reservations/")
+    starts = sorted(item["reservation_time"] for item in response.json()["items"])
+    assert len(starts) == statuses.count(201)
+    assert len(starts) in (1, 2)
+
+
+async def test_get_reservations_filters_and_pagination(client):
+    """Тест на фильтрацию и постраничное получение бронирований"""
+    table_ids = []
+    for name in ("First", "Second"):
+        response = await client.post("/tables/", json={"name": name, "seats": 2})
+        table_ids.append(response.json()["id"])
+
+    start = datetime(2030, 1, 1, 12, 0)
+    for i in range(6):
+        await client.post(
+            "/reservations/",
+            json={
+                "customer_name": "Alice" if i % 3 else "Bob",
+                "table_id": table_ids[i % 2],
+                "reservation_time": (start + timedelta(hours=i)).isoformat(),
+                "duration_minutes": 60,
+            },
+        )
+
+    response = await client.get("/reservations/", params={"table_id": table_ids[0]})
+    assert [r["table_id"] for r in response.json()["items"]] == [table_ids[0]] * 3
+
+    response = await client.get("/reservations/", params={"customer_name": "Bob"})
+    assert len(response.json()["items"]) == 2
+
+    response = await client.get(
+        "/reservations/",
+        params={
+            "start": (start + timedelta(hours=1)).isoformat(),
+            "end": (start + timedelta(hours=4)).isoformat(),
+            "limit": 2,
+        },
+    )
+    page = response.json()
+    assert [r["reservation_time"] for r in page["items"]] == [
+        "2030-01-01T13:00:00",
+        "2030-01-01T14:00:00",
+    ]
+    assert page["next_cursor"] is not None
+
+    response = await client.get(
+        "/reservations/",
+        params={
+            "start": (start + timedelta(hours=1)).isoformat(),
+            "end": (start + timedelta(hours=4)).isoformat(),
+            "limit": 2,
+            "cursor": page["next_cursor"],
+        },
+    )
+    page = response.json()
+    assert [r["reservation_time"] for r in page["items"]] == ["2030-01-01T15:00:00"]
+    assert page["next_cursor"] is None
+
+
+async def test_export_reservations(client):
+    """Тест на потоковую выгрузку бронирований в NDJSON и CSV"""
+    response = await client.post("/tables/", json={"name": "Export", "seats": 2})
+    table_id = response.json()["id"]
+
+    start = datetime(2030, 1, 1, 12, 0)
+    for i in range(3):
+        await client.post(
+            "/reservations/",
+            json={
+                "customer_name": f"Гость {i}",
+                "table_id": table_id,
+                "reservation_time": (start + timedelta(hours=i)).isoformat(),
+                "duration_minutes": 60,
+            },
+        )
+
+    response = await client.get("/reservations/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["customer_name"] for line in lines] == ["Гость 0", "Гость 1", "Гость 2"]
+    assert lines[0]["reservation_time"] == "2030-01-01T12:00:00"
+
+    response = await client.get("/reservations/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == [
+        "id",
+        "customer_name",
+        "table_id",
+        "reservation_time",
+        "duration_minutes",
+    ]
+    assert rows[1][1:] == ["Гость 0", str(table_id), "2030-01-01T12:00:00", "60"]
+    assert len(rows) == 4
+
+
+async def test_create_reservations_bulk_partial(client):
+    """Тест на пакетное создание броней с частичным принятием"""
+    response = await client.post("/tables/", json={"name": "Bulk", "seats": 4})
+    table_id = response.json()["id"]
+
+    start = datetime(2030, 1, 1, 12, 0)
+    await client.post(
+        "/reservations/",
+        json={
+            "customer_name": "Existing",
+            "table_id": table_id,
+            "reservation_time": start.isoformat(),
+            "duration_minutes": 60,
+        },
+    )
+
+    def item(name: str, offset_minutes: int) -> dict:
+        return {
+            "customer_name": name,
+            "table_id": table_id,
+            "reservation_time": (start + timedelta(minutes=offset_minutes)).isoformat(),
+            "duration_minutes": 60,
+        }
+
+    response = await client.post(
+        "/reservations/bulk",
+        json={
+            "mode": "partial",
+            "items": [
+                item("Clash with existing", 30),
+                item("Late", 180),
+                item("Early", 60),
+                item("Clash with early", 90),
+            ],
+        },
+    )
+    assert response.status_code == 201
+    data = response.json()
+    assert data["created"] == 2
+    assert [r["status"] for r in data["results"]] == [
+        "conflict",
+        "created",
+        "created",
+        "conflict",
+    ]
+    assert data["results"][1]["reservation"]["customer_name"] == "Late"
+
+    response = await client.get("/reservations/", params={"table_id": table_id})
+    assert len(response.json()["items"]) == 3
+
+
+async def test_create_reservations_bulk_all_or_nothing(client):
+    """Тест на пакетное создание броней в режиме «все или ничего»"""
+    response = await client.post("/tables/", json={"name": "Atomic", "seats": 4})
+    table_id = response.json()["id"]
+
+    start = datetime(2030, 1, 1, 12, 0)
+    items = [
+        {
+            "customer_name": f"Guest {i}",
+            "table_id": table_id,
+            "reservation_time": (start + timedelta(minutes=45 * i)).isoformat(),
+            "duration_minutes": 60,
+        }
+        for i in range(3)
+    ]
+
+    response = await client.post("/reservations/bulk", json={"items": items})
+    assert response.status_code == 409
+    assert [r["status"] for r in response.json()["results"]] == [
+        "skipped",
+        "conflict",
+        "skipped",
+    ]
+
+    response = await client.get("/reservations/", params={"table_id": table_id})
+    assert response.json()["items"] == []
+
+    items[1]["reservation_time"] = (start + timedelta(hours=5)).isoformat()
+    response = await client.post("/reservations/bulk", json={"items": items})
+    assert response.status_code == 201
+    assert response.json()["created"] == 3
@@ -0,0 +1,149 @@
+from datetime import datetime
+
+from app.repositories.reservation_archive_repo import ReservationArchiveRepository
+from app.services.reservation_archive_service import ReservationArchiveService
+
+
+async def create_table(client, name: str) -> int:
+    response = await client.post("/tables/", json={"name": name, "seats": 4})
+    return response.json()["id"]
+
+
+async def book(client, table_id: int, start: datetime, minutes: int) -> int:
+    response = await client.post(
+        "/reservations/",
+        json={
+            "customer_name": "John Doe",
+            "table_id": table_id,
+            "reservation_time": start.isoformat(),
+            "duration_minutes": minutes,
+        },
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+async def occupancy(client, start: str, end: str, **params) -> list[dict]:
+    response = await client.get(
+        "/stats/occupancy", params={"from": start, "to": end, **params}
+    )
+    assert response.status_code == 200
+    return response.json()["items"]
+
+
+def hours(**values: int) -> list[int]:
+    """24 часовых значения: h19=30 задает 30 для часа 19:00."""
+    result = [0] * 24
+    for name, value in values.items():
+        result[int(name[1:])] = value
+    return result
+
+
+async def test_occupancy_follows_bookings(client):
+    """Тест на обновление сводки загрузки при создании и отмене броней"""
+    first = await create_table(client, "First")
+    second = await create_table(client, "Second")
+    await book(client, first, datetime(2030, 1, 1, 19, 30), 90)
+    late_id = await book(client, first, datetime(2030, 1, 1, 23, 30), 60)
+    await book(client, second, datetime(2030, 1, 2, 12, 0), 45)
+
+    items = await occupancy(client, "2030-01-01", "2030-01-02")
+    assert [(i["day"], i["table_id"]) for i in items] == [
+        ("2030-01-01", first),
+        ("2030-01-02", first),
+        ("2030-01-02", second),
+    ]
+    assert items[0]["reservations"] == 2
+    assert items[0]["booked_minutes"] == 120
+    assert items[0]["hourly_reservations"] == hours(h19=1, h20=1, h23=1)
+    assert items[0]["hourly_minutes"] == hours(h19=30, h20=60, h23=30)
+    # Бронь через полночь занимает и первые полчаса следующего дня.
+    assert items[1]["reservations"] == 0
+    assert items[1]["hourly_minutes"] == hours(h0=30)
+    assert items[2]["hourly_minutes"] == hours(h12=45)
+
+    assert await occupancy(client, "2030-01-02", "2030-01-02", table_id=second) == [
+        items[2]
+    ]
+
+    response = await client.delete(f"/reservations/{late_id}")
+    assert response.status_code == 204
+    items = await occupancy(client, "2030-01-01", "2030-01-02")
+    assert [(i["day"], i["table_id"]) for i in items] == [
+        ("2030-01-01", first),
+        ("2030-01-02", second),
+    ]
+    assert items[0]["reservations"] == 1
+    assert items[0]["hourly_minutes"] == hours(h19=30, h20=60)
+
+
+async def test_occupancy_counts_bulk_and_keeps_archived(client, session_factory):
+    """Тест на учет пакетного создания и сохранение архивных броней в сводке"""
+    table_id = await create_table(client, "Bulk")
+    items = [
+        {
+            "customer_name": f"Guest {i}",
+            "table_id": table_id,
+            "reservation_time": datetime(2030, 1, 1, 12 + i, 0).isoformat(),
+            "duration_minutes": 60,
+        }
+        for i in range(3)
+    ]
+    response = await client.post("/reservations/bulk", json={"items": items})
+    assert response.status_code == 201
+
+    expected = await occupancy(client, "2030-01-01", "2030-01-01")
+    assert expected[0]["reservations"] == 3
+    assert expected[0]["hourly_reservations"] == hours(h12=1, h13=1, h14=1)
+
+    async with session_factory() as session:
+        service = ReservationArchiveService(ReservationArchiveRepository(session))
+        assert await service.archive(datetime(2030, 2, 1), 100, 0, 1) == 3
+    assert await occupancy(client, "2030-01-01", "2030-01-01") == expected
+
+
+async def test_occupancy_rejects_invalid_period(client):
+    """Тест на отказ в отчете за перевернутый или слишком длинный период"""
+    response = await client.get(
+        "/stats/occupancy", params={"from": "2030-01-02", "to": "2030-01-01"}
+    )
+    assert response.status_code == 400
+    response = await client.get(
+        "/stats/occupancy", params={"from": "2030-01-01", "to": "2031-06-01"}
+    )
+    assert response.status_code == 400
+    response = await client.get("/stats/occupancy", params={"from": "2030-01-01"})
+    assert response.status_code == 422
+
+
+async def test_heatmap_spreads_bookings_over_weekday_buckets(client):
+    """Тест на тепловую карту загрузки по дням недели и 15-минутным интервалам"""
+    busy = await create_table(client, "Busy")
+    idle = await create_table(client, "Idle")
+    # 2030-01-07 — понедельник.
+    await book(client, busy, datetime(2030, 1, 7, 19, 0), 90)
+    await book(client, busy, datetime(2030, 1, 8, 12, 10), 20)
+    # Началась до периода: учитываются только первые полчаса понедельника.
+    await book(client, busy, datetime(2030, 1, 6, 23, 30), 60)
+
+    response = await client.get(
+        "/stats/heatmap", params={"from": "2030-01-07", "to": "2030-01-20"}
+    )
+    assert response.status_code == 200
+    heatmap = response.json()
+    assert heatmap["bucket_minutes"] == 15
+    assert heatmap["weekday_counts"] == [2] * 7
+    assert heatmap["table_ids"] == [busy, idle]
+
+    monday, tuesday = heatmap["occupancy"][0][:2]
+    # Бронь была только в один из двух понедельников периода.
+    assert [i for i, value in enumerate(monday) if value] == [0, 1, *range(76, 82)]
+    assert monday[76] == 0.5
+    assert tuesday[48:50] == [0.1667, 0.5]
+    assert sum(map(sum, heatmap["occupancy"][0][2:])) == 0
+    assert sum(map(sum, heatmap["occupancy"][1])) == 0
+
+    response = await client.get(
+        "/stats/heatmap", params={"from": "2030-01-07", "to": "2031-01-08"}
+    )
+    assert response.status_code == 400
@@ -0,0 +1,168 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from app.core.cache import MISSING, TTLCache
+from app.dependencies.services import get_table_cache
+from app.main import app
+from app.models.table import Table
+from app.services.table_cache import TableCache
+
+
+def make_table_cache(max_size: int = 100) -> TableCache:
+    return TableCache(
+        TTLCache(max_size=max_size, ttl_seconds=60),
+        check_seconds=60,
+        list_backend=TTLCache(max_size=1, ttl_seconds=60),
+    )
+
+
+@pytest.fixture
+def table_cache():
+    """Enable a fresh table cache for the app."""
+    cache = make_table_cache()
+    app.dependency_overrides[get_table_cache] = lambda: cache
+    return cache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Тест на вытеснение записи, к которой дольше всего не обращались"""
+    cache = TTLCache(max_size=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    """Тест на истечение срока жизни записи"""
+    cache = TTLCache(max_size=10, ttl_seconds=5)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.set("a", None)
+    assert cache.get("a") is None
+    monkeypatch.setattr(time, "monotonic", lambda: now + 5)
+    assert cache.get("a") is MISSING
+
+
+async def test_table_list_outlives_per_table_eviction(client, statements):
+    """Тест на выдачу списка из кэша, когда столиков больше размера кэша"""
+    cache = make_table_cache(max_size=2)
+    app.dependency_overrides[get_table_cache] = lambda: cache
+    table_ids = [
+        (await client.post("/tables/", json={"name": f"Many {i}", "seats": 2})).json()["id"]
+        for i in range(5)
+    ]
+
+    first = await client.get("/tables/")
+    assert len(cache.backend) == 2
+    statements.clear()
+    second = await client.get("/tables/")
+    assert statements == []
+    assert [t["id"] for t in second.json()["items"]] == table_ids
+    assert second.json() == first.json()
+
+
+async def test_table_list_served_from_cache(client, table_cache, statements):
+    """Тест на выдачу списка столиков из кэша без запросов к БД"""
+    for i in range(3):
+        await client.post("/tables/", json={"name": f"Cached {i}", "seats": 2})
+
+    first = await client.get("/tables/", params={"limit": 2})
+    statements.clear()
+    second = await client.get("/tables/", params={"limit": 2})
+    assert statements == []
+    assert second.json() == first.json()
+
+    next_page = await client.get(
+        "/tables/", params={"limit": 2, "cursor": first.json()["next_cursor"]}
+    )
+    assert [t["name"] for t in next_page.json()["items"]] == ["Cached 2"]
+    assert next_page.json()["next_cursor"] is None
+
+
+async def test_table_writes_invalidate_cache(client, table_cache):
+    """Тест на сброс кэша при создании и удалении столика"""
+    assert (await client.get("/tables/")).json()["items"] == []
+
+    response = await client.post("/tables/", json={"name": "New", "seats": 2})
+    table_id = response.json()["id"]
+    assert [t["id"] for t in (await client.get("/tables/")).json()["items"]] == [
+        table_id
+    ]
+
+    await client.delete(f"/tables/{table_id}")
+    assert (await client.get("/tables/")).json()["items"] == []
+
+
+async def test_cache_follows_generation_of_other_workers(
+    client, table_cache, session_factory
+):
+    """Тест на сброс кэша по поколению, измененному другим воркером"""
+    assert (await client.get("/tables/")).json()["items"] == []
+
+    # Столик создается в обход сервиса, как это сделал бы другой воркер.
+    async with session_factory() as session:
+        session.add(Table(name="Elsewhere", seats=2))
+        await session.commit()
+
+    assert (await client.get("/tables/")).json()["items"] == []
+    table_cache.check_seconds = 0
+    items = (await client.get("/tables/")).json()["items"]
+    assert [t["name"] for t in items] == ["Elsewhere"]
+
+
+async def test_reservation_checks_table_in_cache(client, table_cache, statements):
+    """Тест на проверку table_id брони по кэшу без запроса к столикам"""
+    response = await client.post("/tables/", json={"name": "Booked", "seats": 2})
+    table_id = response.json()["id"]
+    await client.get("/tables/")
+    statements.clear()
+
+    response = await client.post(
+        "/reservations/",
+        json={
+            "customer_name": "John Doe",
+            "table_id": table_id,
+            "reservation_time": datetime(2030, 1, 1, 19, 0).isoformat(),
+            "duration_minutes": 60,
+        },
+    )
+    assert response.status_code == 201
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT INTO reservations")
+
+
+@pytest.mark.parametrize("cached", [True, False])
+async def test_reservation_for_unknown_table(client, cached):
+    """Тест на создание брони для несуществующего столика (с кэшем и без)"""
+    if cached:
+        cache = make_table_cache()
+        app.dependency_overrides[get_table_cache] = lambda: cache
+
+    payload = {
+        "customer_name": "John Doe",
+        "table_id": 999999,
+        "reservation_time": datetime(2030, 1, 1, 19, 0).isoformat(),
+        "duration_minutes": 60,
+    }
+    response = await client.post("/reservations/", json=payload)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Table not found"
+
+    response = await client.post("/reservations/bulk", json={"items": [payload]})
+    assert response.status_code == 404
+
+
+async def test_cached_list_etag_changes_after_write(client, table_cache):
+    """Тест на смену ETag закэшированного списка столиков после записи"""
+    etag = (await client.get("/tables/")).headers["ETag"]
+    await client.post("/tables/", json={"name": "Fresh", "seats": 2})
+
+    response = await client.get("/tables/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [t["name"] for t in response.json()["items"]] == ["Fresh"]
@@ -23,7 +23,7 @@ async def test_get_tables(client):
 
     response = await client.get("/tables/")
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
     assert len(data) > 0
     assert any(table["name"] == "Test Table 1" for table in data)
     assert any(table["name"] == "Test Table 2" for table in data)
@@ -40,7 +40,7 @@ async def test_delete_table(client):
     assert response.status_code == 204
 
     response = await client.get(f"/tables/{table_id}")
-    assert response.status_code == 405  # Столик не найден
+    assert response.status_code == 404  # Столик не найден
 
 
 async def test_delete_non_existent_table(client):
@@ -68,4 +68,90 @@ async def test_get_empty_table_list(client):
     """Тест на получение пустого списка столиков"""
     response = await client.get("/tables/")
     assert response.status_code == 200
-    assert response.json() == []
+    assert response.json()["items"] == []
+
+
+async def test_get_tables_availability(client):
+    """Тест на поиск свободных слотов по столикам"""
+    response = await client.post("/tables/", json={"name": "Small", "seats": 2})
+    small_id = response.json()["id"]
+    response = await client.post("/tables/", json={"name": "Big", "seats": 6})
+    big_id = response.json()["id"]
+    response = await client.post("/tables/", json={"name": "Busy", "seats": 4})
+    busy_id = response.json()["id"]
+
+    await client.post(
+        "/reservations/",
+        json={
+            "customer_name": "Alice",
+            "table_id": big_id,
+            "reservation_time": "2030-01-01T18:30:00",
+            "duration_minutes": 45,
+        },
+    )
+    await client.post(
+        "/reservations/",
+        json={
+            "customer_name": "Bob",
+            "table_id": busy_id,
+            "reservation_time": "2030-01-01T17:00:00",
+            "duration_minutes": 240,
+        },
+    )
+
+    response = await client.get(
+        "/tables/availability",
+        params={
+            "start": "2030-01-01T18:00:00",
+            "end": "2030-01-01T20:00:00",
+            "party_size": 3,
+            "slot_minutes": 30,
+        },
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [table["id"] for table in data] == [big_id]
+    assert small_id not in [table["id"] for table in data]
+    assert [slot["start"] for slot in data[0]["free_slots"]] == [
+        "2030-01-01T18:00:00",
+        "2030-01-01T19:30:00",
+    ]
+    assert data[0]["free_slots"][0]["end"] == "2030-01-01T18:30:00"
+
+
+async def test_get_tables_availability_invalid_window(client):
+    """Тест на поиск свободных слотов с некорректным окном"""
+    response = await client.get(
+        "/tables/availability",
+        params={"start": "2030-01-01T20:00:00", "end": "2030-01-01T18:00:00"},
+    )
+    assert response.status_code == 422
+
+
+async def test_get_tables_pagination(client):
+    """Тест на постраничное получение столиков по курсору"""
+    for i in range(5):
+        await client.post("/tables/", json={"name": f"Paged {i}", "seats": 2})
+
+    names = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/tables/", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 2
+        names += [table["name"] for table in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert names == [f"Paged {i}" for i in range(5)]
+
+
+async def test_get_tables_invalid_cursor(client):
+    """Тест на получение столиков с поврежденным курсором"""
+    response = await client.get("/tables/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
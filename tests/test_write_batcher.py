@@ -0,0 +1,168 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import DBAPIError
+
+from app.dependencies.services import get_reservation_batcher
+from app.main import app
+from app.models.reservation import Reservation
+from app.repositories.reservation_repo import ReservationRepository
+from app.services.reservation_batcher import ReservationWriteBatcher
+from app.services.reservation_service import (
+    BULK_CREATE_ATTEMPTS,
+    DEADLOCK_DETECTED,
+    ReservationService,
+)
+
+
+BOOKING_TIME = datetime(2030, 1, 1, 19, 0)
+
+
+@pytest.fixture
+async def batcher(client, session_factory):
+    """Route POST /reservations/ through a write batcher on the test transaction."""
+    batcher = ReservationWriteBatcher(
+        session_factory,
+        lambda session: ReservationService(ReservationRepository(session)),
+        max_batch_size=50,
+        max_delay_seconds=0.05,
+    )
+    app.dependency_overrides[get_reservation_batcher] = lambda: batcher
+    yield batcher
+    await batcher.close()
+
+
+@pytest.fixture
+def deadlocking_inserts(monkeypatch):
+    """Make every multi-row INSERT fail with a deadlock; return the attempt log."""
+    attempts = []
+
+    class Deadlock(Exception):
+        sqlstate = DEADLOCK_DETECTED
+
+    async def create_many(self, values):
+        attempts.append(len(values))
+        raise DBAPIError("INSERT INTO reservations", None, Deadlock())
+
+    monkeypatch.setattr(ReservationRepository, "create_many", create_many)
+    return attempts
+
+
+async def create_table(client, name: str) -> int:
+    response = await client.post("/tables/", json={"name": name, "seats": 2})
+    return response.json()["id"]
+
+
+async def book(client, table_id: int, start: datetime):
+    return await client.post(
+        "/reservations/",
+        json={
+            "customer_name": "John Doe",
+            "table_id": table_id,
+            "reservation_time": start.isoformat(),
+            "duration_minutes": 60,
+        },
+    )
+
+
+async def test_concurrent_bookings_share_one_insert(client, batcher, statements):
+    """Тест на создание одновременных броней одной пачкой со своим ответом каждой"""
+    table_ids = [await create_table(client, f"Batch {i}") for i in range(5)]
+    statements.clear()
+
+    responses = await asyncio.gather(
+        *(book(client, table_id, BOOKING_TIME) for table_id in table_ids),
+        # Пересекается с бронью первого столика.
+        book(client, table_ids[0], BOOKING_TIME + timedelta(minutes=30)),
+    )
+    # Запросы доходят до очереди в произвольном порядке, поэтому какая из
+    # двух броней первого столика создается, заранее неизвестно.
+    first_table = [responses[0], responses[-1]]
+    assert sorted(r.status_code for r in first_table) == [201, 409]
+    assert [r.status_code for r in responses[1:5]] == [201] * 4
+    created = [r.json() for r in responses if r.status_code == 201]
+    assert sorted(r["table_id"] for r in created) == table_ids
+    assert len({r["id"] for r in created}) == 5
+    assert sum(s.startswith("INSERT INTO reservations") for s in statements) == 1
+
+    response = await client.get("/reservations/")
+    assert len(response.json()["items"]) == 5
+
+
+async def test_batch_conflicts_with_existing_booking(client, batcher):
+    """Тест на отказ брони пачки, пересекающейся с уже созданной"""
+    table_id = await create_table(client, "Busy")
+    assert (await book(client, table_id, BOOKING_TIME)).status_code == 201
+
+    first, second = await asyncio.gather(
+        book(client, table_id, BOOKING_TIME + timedelta(minutes=30)),
+        book(client, table_id, BOOKING_TIME + timedelta(hours=1)),
+    )
+    assert (first.status_code, second.status_code) == (409, 201)
+
+
+async def test_missing_table_does_not_reject_batch(client, batcher):
+    """Тест на пачку с броней на несуществующий столик: остальные создаются"""
+    table_id = await create_table(client, "Existing")
+    existing, missing = await asyncio.gather(
+        book(client, table_id, BOOKING_TIME),
+        book(client, 999_999, BOOKING_TIME),
+    )
+    assert (existing.status_code, missing.status_code) == (201, 404)
+
+
+async def test_batch_overlap_goes_to_earlier_request(client, batcher):
+    """Тест на создание из пересекающихся броней пачки пришедшей раньше, а не начинающейся раньше"""
+    table_id = await create_table(client, "Queue")
+
+    def reservation(start: datetime) -> Reservation:
+        return Reservation(
+            customer_name="John Doe",
+            table_id=table_id,
+            reservation_time=start,
+            duration_minutes=60,
+        )
+
+    first, second = await asyncio.gather(
+        batcher.submit(reservation(BOOKING_TIME + timedelta(minutes=30))),
+        batcher.submit(reservation(BOOKING_TIME)),
+    )
+    assert first is not None
+    assert first.reservation_time == BOOKING_TIME + timedelta(minutes=30)
+    assert second is None
+
+
+async def test_batch_falls_back_to_single_inserts_after_retries(
+    client, batcher, deadlocking_inserts
+):
+    """Тест на создание броней по одной, если все вставки пачки прерваны взаимной блокировкой"""
+    table_ids = [await create_table(client, f"Retry {i}") for i in range(2)]
+
+    responses = await asyncio.gather(
+        *(book(client, table_id, BOOKING_TIME) for table_id in table_ids)
+    )
+    assert [r.status_code for r in responses] == [201, 201]
+    assert deadlocking_inserts == [2] * BULK_CREATE_ATTEMPTS
+
+
+async def test_bulk_returns_503_after_retries(client, deadlocking_inserts):
+    """Тест на ответ 503, а не 409, если все вставки пачки прерваны взаимной блокировкой"""
+    table_id = await create_table(client, "Bulk retry")
+    response = await client.post(
+        "/reservations/bulk",
+        json={
+            "mode": "partial",
+            "items": [
+                {
+                    "customer_name": "John Doe",
+                    "table_id": table_id,
+                    "reservation_time": BOOKING_TIME.isoformat(),
+                    "duration_minutes": 60,
+                }
+            ],
+        },
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert len(deadlocking_inserts) == BULK_CREATE_ATTEMPTS